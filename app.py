@@ -1,9 +1,27 @@
 import streamlit as st
-import requests
+import csv
+import io
 import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 from pathlib import Path
 
+from backend_api.utils.http_client import fetch, stream_lines
+
 API_BASE_URL = "http://localhost:8000"
+# Gemini generations can take tens of seconds; fail instead of hanging forever.
+API_TIMEOUT_SECONDS = 120
+# Identical requests within the TTL are answered from the memo, not the backend.
+API_CACHE_TTL_SECONDS = 600
+API_CACHE_MAX_ENTRIES = 128
+# Last result per page, so it survives reruns and app restarts.
+RESULTS_DIR = Path(".cache/ui_results")
+JOB_POLL_SECONDS = 2
+# Dashboard results: this many days up to the latest row, against the period before
+RESULTS_WINDOW_DAYS = 30
+RESULTS_ROLLING_DAYS = 7
 
 st.set_page_config(
     page_title="AI Marketing & SEO Suite",
@@ -19,30 +37,284 @@ PAGES = [
     "Content Calendar Automation",
 ]
 
-def call_api(endpoint: str, payload: dict | None = None, method: str = "post"):
+class APIError(Exception):
+    pass
+
+def _request(endpoint: str, payload: dict | None = None, method: str = "post",
+             params: dict | None = None, expect: int = 200):
+    """Raw call through the pooled client; raises APIError instead of touching the UI."""
     url = f"{API_BASE_URL}{endpoint}"
     try:
         if method.lower() == "post":
-            resp = requests.post(url, json=payload or {})
+            resp = fetch(url, method="POST", json=payload or {}, params=params,
+                         timeout=API_TIMEOUT_SECONDS, max_bytes=None)
         else:
-            resp = requests.get(url, params=payload or {})
-        if resp.status_code != 200:
-            st.error(f"API error {resp.status_code}: {resp.text}")
+            resp = fetch(url, method=method.upper(), params={**(payload or {}), **(params or {})},
+                         timeout=API_TIMEOUT_SECONDS, max_bytes=None)
+    except Exception as e:
+        raise APIError(f"Failed to reach backend: {e}") from e
+    if resp.status_code != expect:
+        raise APIError(f"API error {resp.status_code}: {resp.text}")
+    return resp.json()
+
+@st.cache_data(ttl=API_CACHE_TTL_SECONDS, max_entries=API_CACHE_MAX_ENTRIES, show_spinner=False)
+def _cached_request(endpoint: str, payload_json: str, method: str):
+    # Keyed on the canonical JSON of the payload; errors raise and are not cached.
+    return _request(endpoint, json.loads(payload_json), method)
+
+def call_api(endpoint: str, payload: dict | None = None, method: str = "post", cached: bool = True):
+    try:
+        if cached:
+            return _cached_request(endpoint, json.dumps(payload or {}, sort_keys=True), method)
+        return _request(endpoint, payload, method)
+    except APIError as e:
+        st.error(str(e))
+        return None
+
+def save_result(name: str, payload: dict, data) -> None:
+    record = {"payload": payload, "result": data, "saved_at": time.time()}
+    st.session_state.setdefault("results", {})[name] = record
+    try:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        (RESULTS_DIR / f"{name}.json").write_text(json.dumps(record), encoding="utf-8")
+    except OSError:
+        pass
+
+def load_result(name: str):
+    """Last saved {"payload", "result", "saved_at"} for a page, from the session or disk."""
+    results = st.session_state.setdefault("results", {})
+    if name not in results:
+        path = RESULTS_DIR / f"{name}.json"
+        try:
+            results[name] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
             return None
-        return resp.json()
+    return results[name]
+
+def saved_caption(record: dict) -> None:
+    saved = time.strftime("%Y-%m-%d %H:%M", time.localtime(record["saved_at"]))
+    st.caption(f"Last result from {saved}.")
+
+# -------------------------
+# Background jobs (?async=true on the backend)
+# -------------------------
+
+def submit_job(name: str, endpoint: str, payload: dict) -> None:
+    """Queue the request on the backend and return at once; job_progress polls it."""
+    jobs = st.session_state.setdefault("jobs", {})
+    if name in jobs:
+        st.warning("A request is already running for this page.")
+        return
+    try:
+        job = _request(endpoint, payload, params={"async": "true"}, expect=202)
+    except APIError as e:
+        st.error(str(e))
+        return
+    jobs[name] = {"job_id": job["job_id"], "payload": payload, "submitted_at": time.time()}
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def job_progress(name: str, label: str) -> None:
+    """
+    Reruns on its own every JOB_POLL_SECONDS while a job is pending; once it
+    finishes the result is saved and the page reruns to show it.
+    """
+    jobs = st.session_state.get("jobs", {})
+    job = jobs.get(name)
+    if job is None:
+        return
+    try:
+        status = _request(f"/api/jobs/{job['job_id']}", method="get")
+    except APIError as e:
+        st.error(str(e))
+        jobs.pop(name, None)
+        return
+
+    if status["status"] == "done":
+        jobs.pop(name, None)
+        save_result(name, job["payload"], status["result"])
+        st.rerun()
+    elif status["status"] in ("failed", "cancelled"):
+        jobs.pop(name, None)
+        st.error(f"{label} {status['status']}: {status.get('error') or ''}")
+    else:
+        elapsed = int(time.time() - job["submitted_at"])
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.info(f"{label} {status['status']}... {elapsed}s (you can keep using the app)")
+        with col2:
+            if st.button("Cancel", key=f"cancel_{name}"):
+                try:
+                    _request(f"/api/jobs/{job['job_id']}", method="delete")
+                except APIError as e:
+                    st.error(str(e))
+                jobs.pop(name, None)
+                st.rerun()
+
+def stream_api(endpoint: str, payload: dict):
+    """Yield events from an NDJSON streaming endpoint as they arrive."""
+    url = f"{API_BASE_URL}{endpoint}"
+    try:
+        for line in stream_lines(url, json=payload, timeout=API_TIMEOUT_SECONDS):
+            yield json.loads(line)
     except Exception as e:
         st.error(f"Failed to reach backend: {e}")
+
+def section_title(key: str) -> str:
+    # "3_ad_copywriting" -> "3. Ad Copywriting"
+    number, _, name = key.partition("_")
+    if number.isdigit():
+        return f"{number}. {name.replace('_', ' ').title()}"
+    return key.replace("_", " ").title()
+
+def calendar_csv(calendar: dict) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["week", "day", "platform", "title", "description", "suggested_format"])
+    for week in calendar.get("weeks", []):
+        for post in week.get("posts", []):
+            writer.writerow([week.get("week_number"), post.get("day"), post.get("platform"), post.get("title"),
+                             post.get("description"), post.get("suggested_format")])
+    return buf.getvalue()
+
+DASHBOARD_SOURCES = {
+    "health": "/api/health",
+    "stats": "/api/stats",
+    "jobs": "/api/jobs",
+    "results": "/api/results",
+}
+
+def _fetch_dashboard(sources: dict = DASHBOARD_SOURCES) -> dict:
+    """All dashboard sources fetched in parallel; a failed source maps to None."""
+    def _get(endpoint):
+        try:
+            if isinstance(endpoint, tuple):
+                return _request(endpoint[0], endpoint[1], method="get")
+            return _request(endpoint, method="get")
+        except APIError:
+            return None
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        futures = {name: pool.submit(_get, ep) for name, ep in sources.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+def upload_results() -> None:
+    with st.expander("Upload campaign results (CSV or JSON export)"):
+        client = st.text_input("Client name", key="results_client")
+        uploaded = st.file_uploader(
+            "Rows of date, platform, spend, impressions, clicks, conversions (campaign optional)",
+            type=["csv", "json"],
+        )
+        if st.button("Store Results"):
+            if not client.strip() or uploaded is None:
+                st.warning("Enter a client name and choose a file.")
+                return
+            text = uploaded.getvalue().decode("utf-8-sig")
+            try:
+                payload = {"rows": json.loads(text)} if uploaded.name.endswith(".json") else {"csv": text}
+                summary = _request(f"/api/results/{client.strip()}", payload)
+            except (APIError, ValueError) as e:
+                st.error(str(e))
+                return
+            st.success(f"Stored {summary['rows']} rows for {summary['client']} "
+                       f"({summary['replaced']} replaced) in {', '.join(summary['months'])}.")
+
+def _totals(aggregate) -> dict:
+    groups = (aggregate or {}).get("groups") or []
+    return groups[0] if groups else {}
+
+def _delta(current, previous):
+    if current is None or not previous:
         return None
+    return f"{(current - previous) / previous:+.0%}"
+
+def results_panel(clients: list) -> None:
+    """Last RESULTS_WINDOW_DAYS days of a client's results against the days before."""
+    st.subheader("Campaign Results")
+    upload_results()
+    if not clients:
+        st.info("No campaign results stored yet. Upload an export to track spend, conversions and CPA here.")
+        return
+    info = st.selectbox("Client", clients, format_func=lambda c: c["client"])
+    end = date.fromisoformat(info["last_date"])
+    start = end - timedelta(days=RESULTS_WINDOW_DAYS - 1)
+    before = start - timedelta(days=1)
+    window = {"client": info["client"], "start": start.isoformat(), "end": end.isoformat()}
+    data = _fetch_dashboard({
+        "current": ("/api/results/aggregate", {**window, "group_by": ""}),
+        "previous": ("/api/results/aggregate", {
+            "client": info["client"], "group_by": "",
+            "start": (before - timedelta(days=RESULTS_WINDOW_DAYS - 1)).isoformat(),
+            "end": before.isoformat()}),
+        "platforms": ("/api/results/aggregate", {**window, "group_by": "platform"}),
+        "rolling": ("/api/results/rolling", {
+            "client": info["client"], "window": RESULTS_ROLLING_DAYS,
+            "start": (end - timedelta(days=3 * RESULTS_WINDOW_DAYS - 1)).isoformat(),
+            "end": end.isoformat()}),
+    })
+    current, previous = _totals(data["current"]), _totals(data["previous"])
+    st.caption(f"{start:%b %d} – {end:%b %d, %Y}, compared with the previous {RESULTS_WINDOW_DAYS} days")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Spend", f"${current.get('spend', 0):,.0f}",
+                  _delta(current.get("spend"), previous.get("spend")))
+    with col2:
+        st.metric("Clicks", f"{current.get('clicks', 0):,}",
+                  _delta(current.get("clicks"), previous.get("clicks")))
+    with col3:
+        st.metric("Conversions", f"{current.get('conversions', 0):,.0f}",
+                  _delta(current.get("conversions"), previous.get("conversions")))
+    with col4:
+        cpa = current.get("cpa")
+        st.metric("CPA", "—" if cpa is None else f"${cpa:,.2f}",
+                  _delta(cpa, previous.get("cpa")), delta_color="inverse")
+
+    rolling = data["rolling"] or {}
+    if rolling.get("dates"):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.caption(f"Conversions, trailing {RESULTS_ROLLING_DAYS} days")
+            st.line_chart({"date": rolling["dates"], "conversions": rolling["conversions"]}, x="date")
+        with col2:
+            st.caption(f"CPA, trailing {RESULTS_ROLLING_DAYS} days")
+            st.line_chart({"date": rolling["dates"], "cpa": rolling["cpa"]}, x="date")
+    rows = (data["platforms"] or {}).get("groups") or []
+    if rows:
+        st.table([{k: row.get(k) for k in ("platform", "spend", "clicks", "conversions", "ctr", "cpc", "cpa")}
+                  for row in rows])
 
 def dashboard_page():
     st.title("📊 AI Marketing & SEO Suite – Dashboard")
     st.markdown("Quick overview of your campaigns, SEO health, and forecasts.")
+    data = _fetch_dashboard()
+    if data["health"] is None:
+        st.error("Backend is not reachable.")
+        return
+
+    stats = data["stats"] or {}
+    jobs = (data["jobs"] or {}).get("jobs", [])
+    cache = stats.get("gemini_cache") or {}
+    serp = stats.get("serpapi") or {}
+    active = sum(1 for job in jobs if job["status"] in ("queued", "running"))
     col1, col2, col3, col4 = st.columns(4)
-    for c, label in zip((col1,col2,col3,col4),
-                        ("Active Campaigns","Average CTR","Avg Conversion Rate","Estimated ROI")):
-        with c:
-            st.metric(label, "—")
-    st.info("Analytics wiring is stubbed. Connect to a DB or analytics service to make this live.")
+    with col1:
+        st.metric("Active Jobs", active)
+    with col2:
+        st.metric("Finished Jobs", sum(1 for job in jobs if job["status"] == "done"))
+    with col3:
+        st.metric("Gemini Cache Hit Rate", f"{cache.get('hit_rate', 0):.0%}" if cache else "—")
+    with col4:
+        remaining = serp.get("quota_remaining")
+        st.metric("SerpAPI Quota Left", "∞" if remaining is None else remaining)
+
+    audit = load_result("seo")
+    if audit:
+        report = audit["result"].get("seo_report", {})
+        st.metric("Last SEO Score", report.get("rules", {}).get("score", "—"),
+                  help=report.get("basic_info", {}).get("url"))
+    results_panel((data["results"] or {}).get("clients", []))
+    if jobs:
+        st.subheader("Recent Jobs")
+        st.table([{k: job.get(k) for k in ("kind", "status", "created_at", "finished_at")}
+                  for job in jobs[:10]])
 
 def campaign_builder_page():
     st.title("🚀 AI Campaign Builder")
@@ -69,56 +341,80 @@ def campaign_builder_page():
             language = st.text_input("Language", "English")
         submit = st.form_submit_button("Generate Campaign")
 
+    data = None
     if submit:
         if not product.strip():
             st.warning("Please describe your product/service.")
             return
         payload = {
-            "goal": goal,
-            "product_description": product,
-            "target_audience": target_audience,
+            "business_info": product,
+            "campaign_goal": goal,
+            "product_info": product,
+            "audience": target_audience,
             "platforms": platforms,
             "tone": tone,
             "language": language,
         }
-        with st.spinner("Generating campaign with AI..."):
-            data = call_api("/api/generate_campaign", payload)
+        status = st.empty()
+        status.info("Generating campaign with AI... sections appear as soon as they are ready.")
+        for event in stream_api("/api/generate_campaign/stream", payload):
+            if event["event"] == "section":
+                with st.expander(section_title(event["key"]), expanded=True):
+                    st.json(event["value"])
+            elif event["event"] == "done":
+                data = event["result"]
+            elif event["event"] == "error":
+                st.error(event["error"])
+        status.empty()
         if data:
+            if "error" in data:
+                st.error(data["error"])
+                return
+            save_result("campaign", payload, data)
             st.success("Campaign generated!")
-            st.subheader("Campaign Overview")
-            st.write(data.get("summary", ""))
-
-            st.subheader("Assets")
-            tabs = st.tabs(["Ad Copy", "Emails", "Social Posts", "Landing Page"])
-            ad_copy = data.get("ad_copy", {})
-            emails = data.get("emails", [])
-            social_posts = data.get("social_posts", [])
-            landing_page = data.get("landing_page", {})
-
-            with tabs[0]:
-                for platform, text in ad_copy.items():
-                    st.markdown(f"#### {platform}")
-                    st.write(text)
-            with tabs[1]:
-                for i, email in enumerate(emails, start=1):
-                    st.markdown(f"#### Email #{i}")
-                    st.write(email)
-            with tabs[2]:
-                for i, post in enumerate(social_posts, start=1):
-                    st.markdown(f"#### Post #{i}")
-                    st.write(post)
-            with tabs[3]:
-                st.markdown("### Landing Page Content")
-                st.write(landing_page.get("headline",""))
-                st.write(landing_page.get("subheadline",""))
-                st.write(landing_page.get("sections",""))
-
-            st.download_button(
-                "Download JSON",
-                data=json.dumps(data, indent=2),
-                file_name="campaign.json",
-                mime="application/json",
-            )
+    else:
+        record = load_result("campaign")
+        if record:
+            saved_caption(record)
+            data = record["result"]
+            for key, value in data.items():
+                with st.expander(section_title(key)):
+                    st.json(value)
+    if data and "error" not in data:
+        st.download_button(
+            "Download JSON",
+            data=json.dumps(data, indent=2),
+            file_name="campaign.json",
+            mime="application/json",
+        )
+
+def render_seo_report(report: dict):
+    ai = report.get("ai_analysis", {})
+    rules = report.get("rules", {})
+    if "error" in ai:
+        st.error(ai["error"])
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Score", ai.get("high_level_score", rules.get("score", "—")))
+    with col2:
+        st.metric("Rule Checks Score", rules.get("score", "—"))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("### Issues")
+        for issue in ai.get("issues", []):
+            st.write(f"- {issue}")
+    with col2:
+        st.markdown("### Recommendations")
+        for rec in ai.get("recommendations", []):
+            st.write(f"- {rec}")
+    if ai.get("suggested_title") or ai.get("suggested_meta_description"):
+        st.markdown("### Suggestions")
+        st.write(f"**Title:** {ai.get('suggested_title', '')}")
+        st.write(f"**Meta description:** {ai.get('suggested_meta_description', '')}")
+
+    st.markdown("### Detailed Findings")
+    st.json({k: v for k, v in report.items() if k not in ("ai_analysis", "rules")}, expanded=False)
 
 def seo_analyzer_page():
     st.title("🕵️ SEO Analyzer")
@@ -128,26 +424,13 @@ def seo_analyzer_page():
         if not url.strip():
             st.warning("Please enter a URL")
             return
-        payload = {"url": url, "depth": depth}
-        with st.spinner("Running SEO audit..."):
-            data = call_api("/api/seo_analyze", payload)
-        if data:
-            st.success("SEO audit complete!")
-            st.subheader("Summary")
-            st.write(data.get("summary",""))
-
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown("### Technical Issues")
-                for issue in data.get("technical_issues", []):
-                    st.write(f"- {issue}")
-            with col2:
-                st.markdown("### Content Issues")
-                for issue in data.get("content_issues", []):
-                    st.write(f"- {issue}")
-
-            st.markdown("### Detailed Findings")
-            st.json(data.get("details", {}))
+        submit_job("seo", "/api/seo_analyze", {"url": url, "depth": depth})
+    job_progress("seo", "SEO audit")
+
+    record = load_result("seo")
+    if record:
+        saved_caption(record)
+        render_seo_report(record["result"].get("seo_report", {}))
 
 def keyword_page():
     st.title("🔎 Keyword & Competitor Research")
@@ -171,44 +454,107 @@ def keyword_page():
         with st.spinner("Querying search data via SerpAPI..."):
             data = call_api("/api/keyword_research", payload)
         if data:
+            save_result("keywords", payload, data)
             st.success("Research complete!")
-            st.subheader("Keyword Suggestions")
-            st.table(data.get("keywords", []))
 
-            st.subheader("Keyword Gaps")
-            st.table(data.get("keyword_gaps", []))
+    record = load_result("keywords")
+    if record:
+        data = record["result"]
+        saved_caption(record)
+        st.subheader("Keyword Suggestions")
+        st.table(data.get("keywords", []))
+
+        st.subheader("Keyword Gaps")
+        st.table(data.get("keyword_gaps", []))
+
+        st.subheader("Competitor Rankings")
+        st.table(data.get("competitors", []))
 
-            st.subheader("Competitor Rankings")
-            st.table(data.get("competitors", []))
+def render_forecast(forecast: dict):
+    st.write(forecast.get("summary", ""))
+    totals = forecast.get("forecast", {}).get("totals", {})
+    col1, col2, col3 = st.columns(3)
+    for col, (label, key, fmt) in zip(
+        (col1, col2, col3),
+        (("Clicks", "clicks", "{:,.0f}"), ("Conversions", "conversions", "{:,.0f}"), ("CPA", "cpa", "${:,.2f}")),
+    ):
+        band = totals.get(key) or {}
+        with col:
+            if band.get("p50") is None:
+                st.metric(label, "—")
+            else:
+                low = "—" if band.get("p10") is None else fmt.format(band["p10"])
+                high = "—" if band.get("p90") is None else fmt.format(band["p90"])
+                st.metric(label, fmt.format(band["p50"]), help=f"80% range {low} – {high}")
+    for caveat in forecast.get("caveats", []):
+        st.markdown(f"- {caveat}")
+    history = forecast.get("history") or {}
+    if history.get("platforms"):
+        st.caption("Grounded in past results")
+        st.table([{"platform": name, "history": h["matched"], "weeks": h["weeks"],
+                   "ctr": h["ctr"], "cpc": h["cpc"], "cvr": h["cvr"]}
+                  for name, h in history["platforms"].items()])
+    with st.expander("Full forecast"):
+        st.json(forecast)
 
 def performance_page():
     st.title("📈 Performance Predictor")
-    st.markdown("Paste or upload your campaign JSON to estimate CTR, conversions, and ROI.")
-
-    uploaded = st.file_uploader("Upload campaign.json", type=["json"])
-    raw = st.text_area("Or paste campaign JSON")
-    payload_campaign = None
+    st.markdown("Simulate clicks, conversions and cost ranges for a campaign. "
+                "Pick a client to ground the forecast in their stored results.")
+    try:
+        clients = [c["client"] for c in _request("/api/results", method="get")["clients"]]
+    except APIError:
+        clients = []
 
-    if uploaded is not None:
-        try:
-            payload_campaign = json.load(uploaded)
-        except Exception as e:
-            st.error(f"Invalid JSON file: {e}")
-    elif raw.strip():
-        try:
-            payload_campaign = json.loads(raw)
-        except Exception as e:
-            st.error(f"Invalid JSON in text: {e}")
+    with st.form("forecast_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            goal = st.selectbox(
+                "Campaign Goal",
+                ["Drive Sales", "Increase Website Traffic", "Generate Leads", "Boost Brand Awareness"],
+            )
+            business_info = st.text_area("Product / Service Description", height=120)
+            client = st.selectbox("Client results", ["None (industry benchmarks)"] + clients)
+        with col2:
+            platforms = st.multiselect(
+                "Platforms",
+                ["Facebook Ads", "Google Ads", "Instagram", "Email", "LinkedIn", "TikTok", "Blog"],
+                default=["Facebook Ads", "Instagram", "Email"],
+            )
+            budget = st.number_input("Monthly ad budget (USD)", min_value=0.0, value=1000.0, step=100.0)
+            duration_weeks = st.slider("Duration (weeks)", 1, 26, 4)
+            posts_per_week = st.slider("Organic posts per week", 0, 14, 3)
+            narrative = st.checkbox("Let Gemini write the summary")
+        submit = st.form_submit_button("Predict Performance")
 
-    if st.button("Predict Performance"):
-        if not payload_campaign:
-            st.warning("Please provide a valid campaign JSON.")
+    if submit:
+        if not platforms:
+            st.warning("Pick at least one platform.")
             return
-        with st.spinner("Predicting performance using AI..."):
-            data = call_api("/api/predict_performance", {"campaign": payload_campaign})
+        payload = {
+            "business_info": business_info,
+            "campaign_goal": goal,
+            "platforms": platforms,
+            "budget": budget,
+            "duration_weeks": duration_weeks,
+            "posts_per_week": posts_per_week,
+            "client": client if client in clients else None,
+            "narrative": narrative,
+        }
+        with st.spinner("Simulating performance..."):
+            data = call_api("/api/performance_forecast", payload)
         if data:
-            st.success("Prediction ready!")
-            st.json(data)
+            save_result("forecast", payload, data)
+            st.success("Forecast ready!")
+
+    record = load_result("forecast")
+    if record:
+        saved_caption(record)
+        forecast = record["result"].get("performance_forecast")
+        if forecast:
+            render_forecast(forecast)
+        else:
+            st.json(record["result"])
 
 def calendar_page():
     st.title("🗓 Content Calendar Automation")
@@ -216,26 +562,63 @@ def calendar_page():
     audience = st.text_input("Target audience", "Solo founders and small business owners")
     topics = st.text_area("Core topics (comma separated)", "ai marketing, seo, automation")
     duration = st.slider("Number of days", 7, 60, 30)
+    platforms = st.multiselect(
+        "Platforms",
+        ["Facebook", "Instagram", "LinkedIn", "X / Twitter", "Email", "Blog"],
+        default=["Instagram", "LinkedIn", "Blog"],
+    )
+    posts_per_week = st.slider("Posts per week", 1, 14, 3)
 
+    data = None
     if st.button("Generate Calendar"):
+        topic_list = [t.strip() for t in topics.split(",") if t.strip()]
         payload = {
-            "goal": goal,
+            "business_info": ", ".join(topic_list),
+            "campaign_goal": goal,
+            "product_info": ", ".join(topic_list),
             "audience": audience,
-            "topics": [t.strip() for t in topics.split(",") if t.strip()],
-            "days": duration,
+            "platforms": platforms,
+            "duration_weeks": max(1, math.ceil(duration / 7)),
+            "posts_per_week": posts_per_week,
         }
-        with st.spinner("Generating calendar with Gemini..."):
-            data = call_api("/api/content_calendar", payload)
+        status = st.empty()
+        status.info("Generating calendar with Gemini... weeks appear as soon as they are ready.")
+        for event in stream_api("/api/content_calendar/stream", payload):
+            if event["event"] == "section" and event["key"] == "overview":
+                st.subheader("Overview")
+                st.write(event["value"])
+            elif event["event"] == "item" and event["key"] == "weeks":
+                week = event["value"]
+                st.markdown(f"#### Week {week.get('week_number', event['index'] + 1)}")
+                st.table(week.get("posts", []))
+            elif event["event"] == "done":
+                data = event["result"]
+            elif event["event"] == "error":
+                st.error(event["error"])
+        status.empty()
         if data:
+            if "error" in data:
+                st.error(data["error"])
+                return
+            save_result("calendar", payload, data)
             st.success("Calendar generated!")
-            st.subheader("Preview")
-            st.table(data.get("calendar", []))
-            st.download_button(
-                "Download CSV",
-                data=data.get("csv",""),
-                file_name="content_calendar.csv",
-                mime="text/csv",
-            )
+    else:
+        record = load_result("calendar")
+        if record:
+            saved_caption(record)
+            data = record["result"]
+            st.subheader("Overview")
+            st.write(data.get("overview", ""))
+            for index, week in enumerate(data.get("weeks", [])):
+                st.markdown(f"#### Week {week.get('week_number', index + 1)}")
+                st.table(week.get("posts", []))
+    if data and "error" not in data:
+        st.download_button(
+            "Download CSV",
+            data=calendar_csv(data),
+            file_name="content_calendar.csv",
+            mime="text/csv",
+        )
 
 def main():
     st.sidebar.title("AI Marketing & SEO Suite")
@@ -0,0 +1,131 @@
+# backend_api/batch.py
+
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .campaign_builder import run_campaign_builder_async
+from .utils.gemini_client import track_usage
+from .utils.response_cache import make_cache_key
+
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+BATCH_MAX_BRIEFS = int(os.getenv("BATCH_MAX_BRIEFS", "100"))
+# upper bound for a request's max_concurrency
+BATCH_CONCURRENCY_LIMIT = 16
+
+
+def _brief_key(payload: Dict[str, Any]) -> str:
+    return make_cache_key("campaign-brief", payload)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _summary(items: List[Dict[str, Any]], total: int, unique: int, started: float) -> Dict[str, Any]:
+    unique_items = [item for item in items if item["duplicate_of_index"] is None]
+    latencies = [item["latency_ms"] for item in unique_items]
+    elapsed = time.perf_counter() - started
+    tokens = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    for item in unique_items:
+        for name in tokens:
+            tokens[name] += item["usage"][name]
+    return {
+        "briefs": total,
+        "unique_briefs": unique,
+        "completed": len(items),
+        "failed": sum(1 for item in items if item["status"] == "error"),
+        "elapsed_seconds": round(elapsed, 3),
+        "briefs_per_second": round(len(items) / elapsed, 3) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 1),
+            "p95": round(_percentile(latencies, 95), 1),
+            "max": round(max(latencies), 1) if latencies else 0.0,
+        },
+        "usage": tokens,
+    }
+
+
+async def stream_campaign_batch(briefs: List[Dict[str, Any]],
+                                max_concurrency: int = BATCH_MAX_CONCURRENCY) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Generate many campaign briefs, yielding an "item" event per brief as it
+    completes and a final "summary" event. Identical briefs are generated
+    once and fanned back out to every index that asked for them. Gemini
+    calls additionally go through gemini_client's process-wide limiter.
+    Closing the stream early (client disconnect) cancels unfinished briefs.
+    """
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    groups: Dict[str, List[int]] = {}
+    for index, payload in enumerate(briefs):
+        groups.setdefault(_brief_key(payload), []).append(index)
+
+    async def _run(indices: List[int]) -> Dict[str, Any]:
+        payload = briefs[indices[0]]
+        async with semaphore:
+            t0 = time.perf_counter()
+            with track_usage() as usage:
+                try:
+                    campaign = await run_campaign_builder_async(payload)
+                    status = "error" if "error" in campaign else "ok"
+                except Exception as exc:
+                    campaign, status = {"error": str(exc)}, "error"
+        return {
+            "indices": indices,
+            "status": status,
+            "campaign": campaign,
+            "latency_ms": round((time.perf_counter() - t0) * 1000, 1),
+            "usage": usage,
+        }
+
+    items: List[Dict[str, Any]] = []
+    tasks = [asyncio.create_task(_run(indices)) for indices in groups.values()]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            outcome = await next_done
+            first, *duplicates = outcome["indices"]
+            for index in [first] + duplicates:
+                item = {
+                    "event": "item",
+                    "index": index,
+                    "status": outcome["status"],
+                    "campaign": outcome["campaign"],
+                    "latency_ms": outcome["latency_ms"],
+                    "usage": outcome["usage"],
+                    "duplicate_of_index": first if index != first else None,
+                }
+                items.append(item)
+                yield item
+    finally:
+        # a disconnected client closes the stream; stop paying for its briefs
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    yield {"event": "summary", **_summary(items, len(briefs), len(groups), started)}
+
+
+# ----------------------------------------------------
+# QUEUED JOBS
+# ----------------------------------------------------
+async def collect_campaign_batch(briefs: List[Dict[str, Any]],
+                                 max_concurrency: int = BATCH_MAX_CONCURRENCY) -> Dict[str, Any]:
+    """
+    The whole batch as one result for the job queue (jobs.py): items in
+    completion order plus the summary.
+    """
+    items: List[Dict[str, Any]] = []
+    summary: Optional[Dict[str, Any]] = None
+    async for event in stream_campaign_batch(briefs, max_concurrency):
+        if event["event"] == "item":
+            items.append(event)
+        else:
+            summary = event
+    return {"total": len(briefs), "items": items, "summary": summary}
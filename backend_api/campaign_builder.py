@@ -1,19 +1,65 @@
 # backend_api/campaign_builder.py
 
-from typing import Dict, Any
+import json
+from typing import Dict, Any, AsyncIterator, Tuple
 
 # Import the generate_json that already includes:
 # - WORKFLOW_SYSTEM_PROMPT
 # - WORKFLOW_JSON_TEMPLATE
-from backend_api.utils.gemini_client import generate_json
+from backend_api.utils.gemini_client import (
+    WORKFLOW_JSON_TEMPLATE,
+    generate_json,
+    generate_json_async,
+    stream_json_async,
+)
+from backend_api.utils.task_graph import run_dag, run_dag_async
 
+# ----------------------------------------------------
+# SECTIONED MODE: one Gemini call per workflow step
+# ----------------------------------------------------
+# section -> (depends on, max_tokens). Strategy feeds ad copy, calendar
+# and the final recommendations; everything else only needs the brief,
+# so the critical path is two calls deep.
+SECTION_PLAN: Dict[str, Tuple[Tuple[str, ...], int]] = {
+    "1_business_understanding": ((), 512),
+    "2_campaign_strategy": ((), 768),
+    "3_ad_copywriting": (("2_campaign_strategy",), 1536),
+    "4_content_calendar": (("2_campaign_strategy",), 1536),
+    "5_seo_research": ((), 768),
+    "6_performance_prediction": ((), 512),
+    "7_final_recommendations": (("2_campaign_strategy", "6_performance_prediction"), 768),
+}
+SECTION_CONCURRENCY = 4
+SECTION_RETRIES = 1
 
-def run_campaign_builder(payload: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Build a full 7-step marketing workflow using Gemini JSON mode.
-    This follows the workflow template defined inside gemini_client.py
-    """
+SECTION_SYSTEM_PROMPT = """
+You are an AI Marketing Workflow Generator.
+Always respond ONLY in valid JSON.
+
+You are producing ONE step of a 7-step marketing workflow: {step}.
+Earlier steps you depend on are provided as context; stay consistent with them.
+
+Rules:
+- Do NOT add markdown.
+- Do NOT add backticks.
+- Do NOT add explanations.
+- Only output JSON.
+"""
 
+
+# what each step covers; the full prompt lists all seven, a section call only its own
+STEP_DESCRIPTIONS = {
+    "1_business_understanding": "Business Understanding",
+    "2_campaign_strategy": "Campaign Strategy",
+    "3_ad_copywriting": "Ad Copywriting (platform-specific)",
+    "4_content_calendar": "Content Calendar (4 weeks)",
+    "5_seo_research": "SEO Research (keywords + difficulty)",
+    "6_performance_prediction": "Performance Prediction (reach, clicks, conversions)",
+    "7_final_recommendations": "Final Recommendations (budget split, platform priority, risks, next steps)",
+}
+
+
+def _brief(payload: Dict[str, Any]) -> str:
     # Extract user inputs
     business = payload.get("business_info", "")
     goal = payload.get("campaign_goal", "")
@@ -25,8 +71,7 @@ def run_campaign_builder(payload: Dict[str, Any]) -> Dict[str, Any]:
     budget = payload.get("budget")
     website_url = payload.get("website_url")
 
-    # The user prompt sent to Gemini
-    user_msg = f"""
+    return f"""
 Business Information: {business}
 Campaign Goal: {goal}
 Product/Service: {product}
@@ -37,23 +82,139 @@ Campaign Duration (weeks): {duration_weeks}
 Posts per Week: {posts_per_week}
 Monthly Budget: {budget}
 Website URL: {website_url}
+""".strip()
+
+
+def _build_user_prompt(payload: Dict[str, Any]) -> str:
+    # The user prompt sent to Gemini
+    steps = "\n".join(f"{i}. {text}" for i, text in enumerate(STEP_DESCRIPTIONS.values(), 1))
+    return f"""
+{_brief(payload)}
 
 Generate a full 7-step marketing workflow including:
-1. Business Understanding
-2. Campaign Strategy
-3. Ad Copywriting (platform-specific)
-4. Content Calendar (4 weeks)
-5. SEO Research (keywords + difficulty)
-6. Performance Prediction (reach, clicks, conversions)
-7. Final Recommendations (budget split, platform priority, risks, next steps)
+{steps}
+
+Follow the JSON format EXACTLY like the template.
+""".strip()
+
+
+def _build_section_prompt(payload: Dict[str, Any], section: str) -> str:
+    """The brief plus the one step this call generates, never the full workflow."""
+    number = section.split("_", 1)[0]
+    return f"""
+{_brief(payload)}
+
+Generate ONLY step {number} of the workflow: {STEP_DESCRIPTIONS[section]}.
+Do not include any other step.
 
 Follow the JSON format EXACTLY like the template.
 """.strip()
 
+
+def run_campaign_builder(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a full 7-step marketing workflow using Gemini JSON mode.
+    This follows the workflow template defined inside gemini_client.py
+    """
+
+    if payload.get("sectioned"):
+        return run_campaign_builder_sectioned(payload)
+
     # ---- IMPORTANT ----
     # The JSON template + system prompt are already inside generate_json()
     # so you only pass the user message:
-    
-    result = generate_json(user_prompt=user_msg)
+
+    result = generate_json(
+        user_prompt=_build_user_prompt(payload),
+        endpoint="campaign",
+        bypass_cache=bool(payload.get("bypass_cache")),
+    )
 
     return result
+
+
+async def run_campaign_builder_async(payload: Dict[str, Any]) -> Dict[str, Any]:
+    if payload.get("sectioned"):
+        return await run_campaign_builder_sectioned_async(payload)
+
+    return await generate_json_async(
+        user_prompt=_build_user_prompt(payload),
+        endpoint="campaign",
+        bypass_cache=bool(payload.get("bypass_cache")),
+    )
+
+
+def stream_campaign_builder(payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Same workflow, streamed: one "section" event per workflow step
+    (e.g. 3_ad_copywriting) as soon as Gemini closes it.
+    """
+    return stream_json_async(
+        user_prompt=_build_user_prompt(payload),
+        endpoint="campaign",
+        bypass_cache=bool(payload.get("bypass_cache")),
+    )
+
+
+def _section_request(payload: Dict[str, Any],
+                     section: str,
+                     dep_results: Dict[str, Any]) -> Dict[str, Any]:
+    user_msg = _build_section_prompt(payload, section)
+    if dep_results:
+        user_msg += "\n\nContext from earlier steps:\n" + json.dumps(dep_results, indent=2)
+    step = section.split("_", 1)[1].replace("_", " ").title()
+    return {
+        "user_prompt": user_msg,
+        "system_prompt": SECTION_SYSTEM_PROMPT.format(step=step),
+        "json_template": {section: WORKFLOW_JSON_TEMPLATE[section]},
+        "max_tokens": SECTION_PLAN[section][1],
+        "endpoint": "campaign",
+        "bypass_cache": bool(payload.get("bypass_cache")),
+    }
+
+
+def _unwrap(section: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    # The model sometimes returns the sub-object without the wrapping key.
+    if "error" in result:
+        return result
+    return result.get(section, result)
+
+
+def _merge_sections(results: Dict[str, Any], errors: Dict[str, str]) -> Dict[str, Any]:
+    merged = {}
+    for section in SECTION_PLAN:
+        merged[section] = results[section] if section in results else {"error": errors[section]}
+    return merged
+
+
+def _is_failure(result: Dict[str, Any]) -> bool:
+    return "error" in result
+
+
+def run_campaign_builder_sectioned(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate each workflow step as its own call with its own sub-template
+    and token budget, respecting SECTION_PLAN dependencies. Failed steps
+    are retried on their own; the output has the same shape as
+    run_campaign_builder(), with {"error": ...} in any step that still fails.
+    """
+    def _task(section: str):
+        def _fn(dep_results: Dict[str, Any]) -> Dict[str, Any]:
+            return _unwrap(section, generate_json(**_section_request(payload, section, dep_results)))
+        return _fn
+
+    tasks = {section: (deps, _task(section)) for section, (deps, _) in SECTION_PLAN.items()}
+    results, errors = run_dag(tasks, SECTION_CONCURRENCY, SECTION_RETRIES, _is_failure)
+    return _merge_sections(results, errors)
+
+
+async def run_campaign_builder_sectioned_async(payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _task(section: str):
+        async def _fn(dep_results: Dict[str, Any]) -> Dict[str, Any]:
+            result = await generate_json_async(**_section_request(payload, section, dep_results))
+            return _unwrap(section, result)
+        return _fn
+
+    tasks = {section: (deps, _task(section)) for section, (deps, _) in SECTION_PLAN.items()}
+    results, errors = await run_dag_async(tasks, SECTION_CONCURRENCY, SECTION_RETRIES, _is_failure)
+    return _merge_sections(results, errors)
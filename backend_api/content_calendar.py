@@ -1,59 +1,383 @@
 # backend_api/content_calendar.py
 
-from typing import Dict, Any, List
+import asyncio
+import math
+import os
+import re
+from typing import Dict, Any, AsyncIterator, List, Tuple
 
-from .utils.gemini_client import generate_json
+from .utils.gemini_client import GeminiUnavailable, generate_json, generate_json_async
+from .utils.task_graph import run_dag
 
+# Week (or slot batch) prompts in flight at once; the shared Gemini limiter still applies
+CALENDAR_CONCURRENCY = int(os.getenv("CALENDAR_CONCURRENCY", "8"))
+# Weeks with more slots than this are split into several calls
+CALENDAR_SLOTS_PER_CALL = int(os.getenv("CALENDAR_SLOTS_PER_CALL", "12"))
+CALENDAR_TOKENS_PER_SLOT = 160
+CALENDAR_RETRIES = 1
 
-def run_content_calendar(payload: Dict[str, Any]) -> Dict[str, Any]:
-    business = payload.get("business_info", "")
-    goal = payload.get("campaign_goal", "")
-    product = payload.get("product_info", "")
-    audience = payload.get("audience", "")
-    platforms: List[str] = payload.get("platforms", []) or []
-    duration_weeks = payload.get("duration_weeks", 4)
-    posts_per_week = payload.get("posts_per_week", 3)
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# platform -> (posting days as indexes into DAYS, max posts per week, formats to rotate)
+PLATFORM_CADENCE: Dict[str, Tuple[Tuple[int, ...], int, Tuple[str, ...]]] = {
+    "instagram": ((0, 1, 2, 3, 4, 5, 6), 7, ("Reel", "Carousel", "Single image", "Story")),
+    "facebook": ((0, 1, 2, 3, 4, 5, 6), 7, ("Image post", "Video", "Link post")),
+    "linkedin": ((0, 1, 2, 3, 4), 5, ("Text post", "Document carousel", "Article")),
+    "twitter": ((0, 1, 2, 3, 4, 5, 6), 14, ("Thread", "Single post", "Poll")),
+    "tiktok": ((0, 1, 2, 3, 4, 5, 6), 7, ("Short video",)),
+    "youtube": ((2, 5), 2, ("Long-form video", "Short")),
+    "pinterest": ((0, 1, 2, 3, 4, 5, 6), 7, ("Pin", "Idea pin")),
+    "email": ((1, 3), 2, ("Newsletter", "Promotional email")),
+    "blog": ((0, 2, 4), 3, ("How-to article", "Listicle", "Case study")),
+}
+PLATFORM_ALIASES = {"x": "twitter", "ig": "instagram", "fb": "facebook", "newsletter": "email"}
+DEFAULT_CADENCE = ((0, 1, 2, 3, 4), 5, ("Post",))
+
+# campaign arc: each week's share of the run decides its focus
+PHASES = (
+    ("awareness", "introduce the problem and the brand"),
+    ("consideration", "show how the product solves it, with proof"),
+    ("conversion", "drive sign-ups and purchases with clear offers"),
+)
 
-    system_msg = """
-You are an AI content strategist creating a posting calendar.
+SYSTEM_MSG = """
+You are an AI content strategist writing the posts for one week of a
+posting calendar. The schedule is fixed: you receive numbered slots
+(day, platform, format) and write the copy for each of them.
 
 Return ONLY JSON with:
-- overview: short description
-- weeks: list of week objects
-Each week object:
-  - week_number (int)
-  - posts: list of posts, where each post has:
-        - platform
-        - title
-        - description
-        - suggested_format
+- theme: the week's theme in a few words
+- posts: one entry per slot, in slot order, each with:
+    - slot (the slot number you were given)
+    - title
+    - description
 """
 
+JSON_TEMPLATE = {
+    "theme": "",
+    "posts": [
+        {
+            "slot": 1,
+            "title": "",
+            "description": "",
+        }
+    ],
+}
+
+
+# ----------------------------------------------------
+# SKELETON (deterministic, no LLM)
+# ----------------------------------------------------
+def _cadence(platform: str) -> Tuple[Tuple[int, ...], int, Tuple[str, ...]]:
+    for word in re.findall(r"[a-z]+", platform.lower()):
+        key = PLATFORM_ALIASES.get(word, word)
+        if key in PLATFORM_CADENCE:
+            return PLATFORM_CADENCE[key]
+    return DEFAULT_CADENCE
+
+
+def _allocate(platforms: List[str], posts_per_week: int, week: int) -> List[int]:
+    """
+    Posts per platform for one week: dealt round-robin up to each
+    platform's weekly cap, starting one platform later every week so
+    remainders rotate instead of always landing on the first platform.
+    """
+    caps = [_cadence(p)[1] for p in platforms]
+    counts = [0] * len(platforms)
+    remaining = min(posts_per_week, sum(caps))
+    index = (week - 1) % len(platforms)
+    while remaining:
+        if counts[index] < caps[index]:
+            counts[index] += 1
+            remaining -= 1
+        index = (index + 1) % len(platforms)
+    return counts
+
+
+def _spread(days: Tuple[int, ...], count: int, offset: int) -> List[int]:
+    """
+    `count` posting days spread evenly over `days` (repeating days past
+    one a day); `offset` staggers platforms so they don't all open on Monday.
+    """
+    if count <= len(days):
+        return sorted(days[((i * len(days)) // count + offset) % len(days)] for i in range(count))
+    return sorted(days[(i + offset) % len(days)] for i in range(count))
+
+
+def build_skeleton(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    week x day x platform slots for the whole campaign. The same payload
+    always yields the same skeleton, so week prompts (and their cached
+    replies) are stable across runs.
+    """
+    platforms: List[str] = payload.get("platforms") or ["General"]
+    duration_weeks = max(1, int(payload.get("duration_weeks") or 4))
+    posts_per_week = max(1, int(payload.get("posts_per_week") or 3))
+
+    weeks = []
+    for week in range(1, duration_weeks + 1):
+        slots = []
+        for order, (platform, count) in enumerate(zip(platforms, _allocate(platforms, posts_per_week, week))):
+            days, _, formats = _cadence(platform)
+            for k, day in enumerate(_spread(days, count, order)):
+                slots.append({
+                    "day": DAYS[day],
+                    "platform": platform,
+                    "suggested_format": formats[(week - 1 + k) % len(formats)],
+                    "_order": (day, order, k),
+                })
+        slots.sort(key=lambda s: s["_order"])
+        for number, slot in enumerate(slots, 1):
+            del slot["_order"]
+            slot["slot"] = number
+        phase, focus = PHASES[min(len(PHASES) - 1, (week - 1) * len(PHASES) // duration_weeks)]
+        weeks.append({"week_number": week, "phase": phase, "focus": focus, "slots": slots})
+    return weeks
+
+
+def _overview(payload: Dict[str, Any], skeleton: List[Dict[str, Any]]) -> str:
+    per_platform = {platform: 0 for platform in payload.get("platforms") or ["General"]}
+    for week in skeleton:
+        for slot in week["slots"]:
+            per_platform[slot["platform"]] += 1
+    total = sum(per_platform.values())
+    spread = ", ".join(f"{platform} ({count})" for platform, count in per_platform.items())
+    phases: Dict[str, List[int]] = {}
+    for week in skeleton:
+        phases.setdefault(week["phase"], []).append(week["week_number"])
+    arc = "; ".join(
+        f"week {weeks[0]}: {phase}" if len(weeks) == 1 else f"weeks {weeks[0]}-{weeks[-1]}: {phase}"
+        for phase, weeks in phases.items()
+    )
+    goal = payload.get("campaign_goal") or "the campaign goal"
+    return (f"{len(skeleton)}-week calendar towards {goal}: {total} posts across {spread}. "
+            f"Arc: {arc}.")
+
+
+# ----------------------------------------------------
+# COPY (one bounded call per week or slot batch)
+# ----------------------------------------------------
+def _chunks(skeleton: List[Dict[str, Any]]) -> Dict[str, Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """chunk name -> (week, its slots); weeks over CALENDAR_SLOTS_PER_CALL are split."""
+    size = max(1, CALENDAR_SLOTS_PER_CALL)
+    chunks = {}
+    for week in skeleton:
+        parts = max(1, math.ceil(len(week["slots"]) / size))
+        for part in range(parts):
+            chunks[f"{week['week_number']}.{part}"] = (week, week["slots"][part * size:(part + 1) * size])
+    return chunks
+
+
+def _chunk_request(payload: Dict[str, Any], week: Dict[str, Any], total_weeks: int,
+                   slots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    listing = "\n".join(
+        f"{slot['slot']}. {slot['day']} - {slot['platform']} - {slot['suggested_format']}"
+        for slot in slots
+    )
     user_msg = f"""
-Business: {business}
-Goal: {goal}
-Product: {product}
-Audience: {audience}
-Platforms: {", ".join(platforms)}
-Duration (weeks): {duration_weeks}
-Posts per week: {posts_per_week}
+Business: {payload.get("business_info", "")}
+Goal: {payload.get("campaign_goal", "")}
+Product: {payload.get("product_info", "")}
+Audience: {payload.get("audience", "")}
+
+Campaign length: {total_weeks} weeks. This is week {week["week_number"]}, phase: {week["phase"]} ({week["focus"]}).
+Make the copy specific to this week so it does not repeat other weeks.
+
+Slots:
+{listing}
 """
+    return {
+        "system_prompt": SYSTEM_MSG,
+        "user_prompt": user_msg,
+        "json_template": JSON_TEMPLATE,
+        "max_tokens": min(2048, 256 + CALENDAR_TOKENS_PER_SLOT * len(slots)),
+        "endpoint": "calendar",
+        "bypass_cache": bool(payload.get("bypass_cache")),
+    }
+
+
+def _read_chunk(slots: List[Dict[str, Any]],
+                result: Dict[str, Any]) -> Tuple[Dict[int, Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    (slot number -> copy, slots the reply missed). Entries are matched by
+    their "slot" number; entries with a missing or repeated number fill
+    the next open slot in order.
+    """
+    wanted = [slot["slot"] for slot in slots]
+    filled: Dict[int, Dict[str, Any]] = {}
+    for entry in result.get("posts") or []:
+        if not isinstance(entry, dict):
+            continue
+        number = entry.get("slot")
+        if number not in wanted or number in filled:
+            number = next((n for n in wanted if n not in filled), None)
+            if number is None:
+                break
+        filled[number] = {"title": str(entry.get("title") or ""),
+                          "description": str(entry.get("description") or "")}
+    return filled, [slot for slot in slots if slot["slot"] not in filled]
+
 
-    json_template = {
-        "overview": "",
-        "weeks": [
-            {
-                "week_number": 1,
-                "posts": [
-                    {
-                        "platform": "",
-                        "title": "",
-                        "description": "",
-                        "suggested_format": "",
-                    }
-                ],
-            }
-        ],
+def _chunk_outcome(theme: Any, filled: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    if not filled:
+        return {"error": "No posts in the reply"}
+    return {"theme": str(theme or ""), "posts": filled}
+
+
+def _is_failure(result: Dict[str, Any]) -> bool:
+    return "error" in result
+
+
+def _generate_chunk(payload: Dict[str, Any], week: Dict[str, Any], total_weeks: int,
+                    slots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    result = generate_json(**_chunk_request(payload, week, total_weeks, slots))
+    if "error" in result:
+        return result
+    filled, missing = _read_chunk(slots, result)
+    if filled and missing:
+        # one follow-up for the slots a partial reply left out
+        retry = generate_json(**_chunk_request(payload, week, total_weeks, missing))
+        if "error" not in retry:
+            filled.update(_read_chunk(missing, retry)[0])
+    return _chunk_outcome(result.get("theme"), filled)
+
+
+async def _generate_chunk_async(payload: Dict[str, Any], week: Dict[str, Any], total_weeks: int,
+                                slots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    result = await generate_json_async(**_chunk_request(payload, week, total_weeks, slots))
+    if "error" in result:
+        return result
+    filled, missing = _read_chunk(slots, result)
+    if filled and missing:
+        retry = await generate_json_async(**_chunk_request(payload, week, total_weeks, missing))
+        if "error" not in retry:
+            filled.update(_read_chunk(missing, retry)[0])
+    return _chunk_outcome(result.get("theme"), filled)
+
+
+def _assemble_week(week: Dict[str, Any], outcomes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The existing week shape, with slots a failed call left blank and the error noted."""
+    filled: Dict[int, Dict[str, Any]] = {}
+    themes, errors = [], []
+    for outcome in outcomes:
+        if "error" in outcome:
+            errors.append(str(outcome["error"]))
+            continue
+        filled.update(outcome["posts"])
+        themes.append(outcome["theme"])
+    posts = []
+    for slot in week["slots"]:
+        copy = filled.get(slot["slot"], {"title": "", "description": ""})
+        posts.append({
+            "day": slot["day"],
+            "platform": slot["platform"],
+            "title": copy["title"],
+            "description": copy["description"],
+            "suggested_format": slot["suggested_format"],
+        })
+    assembled = {
+        "week_number": week["week_number"],
+        "theme": next((t for t in themes if t), ""),
+        "phase": week["phase"],
+        "posts": posts,
     }
+    missing = sum(1 for slot in week["slots"] if slot["slot"] not in filled)
+    if missing:
+        assembled["error"] = f"{missing} post(s) could not be generated: " + "; ".join(errors or ["missing from reply"])
+    return assembled
+
+
+def _calendar(overview: str, weeks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    if all("error" in week and not any(p["title"] for p in week["posts"]) for week in weeks):
+        return {"error": weeks[0]["error"] if weeks else "Empty calendar"}
+    return {"overview": overview, "weeks": weeks}
+
+
+def run_content_calendar(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the slot skeleton locally (build_skeleton), then write each
+    week's copy in its own bounded Gemini call, CALENDAR_CONCURRENCY at a
+    time. Wall time follows the slowest week rather than the campaign
+    length, and no single reply is large enough to hit the token cap.
+    Raises GeminiUnavailable if any call finds Gemini unavailable.
+    """
+    skeleton = build_skeleton(payload)
+    chunks = _chunks(skeleton)
+    # like the streamed path, an outage fails the whole calendar (503) instead of blank weeks
+    unavailable: List[GeminiUnavailable] = []
+
+    def _task(week: Dict[str, Any], slots: List[Dict[str, Any]]):
+        def _run(_: Dict[str, Any]) -> Dict[str, Any]:
+            if unavailable:
+                raise unavailable[0]
+            try:
+                return _generate_chunk(payload, week, len(skeleton), slots)
+            except GeminiUnavailable as exc:
+                unavailable.append(exc)
+                raise
+        return _run
+
+    tasks = {name: ((), _task(week, slots)) for name, (week, slots) in chunks.items()}
+    results, errors = run_dag(tasks, CALENDAR_CONCURRENCY, CALENDAR_RETRIES, _is_failure)
+    if unavailable:
+        raise unavailable[0]
+
+    weeks = []
+    for week in skeleton:
+        names = [name for name, (w, _) in chunks.items() if w is week]
+        outcomes = [results.get(name) or {"error": errors.get(name, "failed")} for name in names]
+        weeks.append(_assemble_week(week, outcomes))
+    return _calendar(_overview(payload, skeleton), weeks)
+
+
+async def stream_content_calendar(payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streamed calendar: the "overview" section right away, then an "item"
+    event per week in week order as soon as its calls return, the "weeks"
+    section and a final "done" (same events the single-call stream used).
+    """
+    skeleton = build_skeleton(payload)
+    chunks = _chunks(skeleton)
+    semaphore = asyncio.Semaphore(max(1, CALENDAR_CONCURRENCY))
+
+    async def _run(week: Dict[str, Any], slots: List[Dict[str, Any]]) -> Dict[str, Any]:
+        outcome: Dict[str, Any] = {}
+        for _ in range(CALENDAR_RETRIES + 1):
+            try:
+                async with semaphore:
+                    outcome = await _generate_chunk_async(payload, week, len(skeleton), slots)
+            except GeminiUnavailable:
+                raise
+            except Exception as exc:
+                outcome = {"error": str(exc)}
+            if not _is_failure(outcome):
+                break
+        return outcome
+
+    overview = _overview(payload, skeleton)
+    yield {"event": "section", "key": "overview", "value": overview}
+
+    tasks = {name: asyncio.ensure_future(_run(week, slots)) for name, (week, slots) in chunks.items()}
+    weeks = []
+    try:
+        for index, week in enumerate(skeleton):
+            names = [name for name, (w, _) in chunks.items() if w is week]
+            outcomes = [await tasks[name] for name in names]
+            weeks.append(_assemble_week(week, outcomes))
+            yield {"event": "item", "key": "weeks", "index": index, "value": weeks[-1]}
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        # collect the siblings' outcomes so an outage is not logged once per week
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    yield {"event": "section", "key": "weeks", "value": weeks}
+    yield {"event": "done", "result": _calendar(overview, weeks), "cached": False}
+
 
-    return generate_json(system_msg, user_msg, json_template)
+async def run_content_calendar_async(payload: Dict[str, Any]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    async for event in stream_content_calendar(payload):
+        if event["event"] == "done":
+            result = event["result"]
+    return result
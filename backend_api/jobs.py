@@ -0,0 +1,72 @@
+# backend_api/jobs.py
+
+import asyncio
+from typing import Any, Dict
+
+from .batch import BATCH_MAX_CONCURRENCY, collect_campaign_batch
+from .campaign_builder import run_campaign_builder
+from .seo_analyzer import run_seo_analyzer
+from .keyword_research import run_keyword_research
+from .performance_predictor import run_performance_forecast
+from .content_calendar import run_content_calendar
+from .utils.job_queue import JobQueue
+
+# Workers are threads, so handlers use the blocking run_* variants; each
+# returns the same body its inline endpoint would.
+
+
+def _campaign(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {"campaign": run_campaign_builder(payload)}
+
+
+def _seo(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "seo_report": run_seo_analyzer(
+            payload["url"],
+            payload.get("target_keywords"),
+            bypass_cache=bool(payload.get("bypass_cache")),
+            depth=payload.get("depth", 1),
+            max_pages=payload.get("max_pages", 50),
+            incremental=payload.get("incremental", True),
+            llm=payload.get("llm", "auto"),
+        )
+    }
+
+
+def _keywords(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "keyword_research": run_keyword_research(
+            business_info=payload["business_info"],
+            product_info=payload["product_info"],
+            audience=payload["audience"],
+            seed_keywords=payload.get("seed_keywords"),
+            bypass_cache=bool(payload.get("bypass_cache")),
+            competitor_domains=payload.get("competitor_domains"),
+            fan_out=bool(payload.get("fan_out")),
+            seed_from_index=bool(payload.get("seed_from_index")),
+        )
+    }
+
+
+def _forecast(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {"performance_forecast": run_performance_forecast(payload)}
+
+
+def _calendar(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {"content_calendar": run_content_calendar(payload)}
+
+
+def _campaign_batch(payload: Dict[str, Any]) -> Dict[str, Any]:
+    # the batch fans out on its own loop inside this worker thread
+    return asyncio.run(collect_campaign_batch(
+        payload["briefs"], payload.get("max_concurrency", BATCH_MAX_CONCURRENCY)))
+
+
+# the SQLite file is opened on first use, not at import
+job_queue = JobQueue()
+job_queue.register("campaign", _campaign)
+job_queue.register("seo", _seo)
+job_queue.register("keywords", _keywords)
+job_queue.register("forecast", _forecast)
+job_queue.register("calendar", _calendar)
+job_queue.register("campaign_batch", _campaign_batch)
@@ -1,26 +1,114 @@
 # backend_api/keyword_research.py
 
-from typing import Dict, Any, List, Optional
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 
-from .utils.serp_client import google_search_news
-from .utils.gemini_client import generate_json
+from .utils.serp_client import google_search_news, google_search_news_async
+from .utils.gemini_client import generate_json, generate_json_async
+from .utils.keyword_index import get_keyword_index
 
+SERP_FAN_OUT_CONCURRENCY = int(os.getenv("SERP_FAN_OUT_CONCURRENCY", "4"))
+SERP_RESULTS_PER_QUERY = 5
+# Known keywords pulled from the index into the prompt with seed_from_index
+KEYWORD_INDEX_SEED_LIMIT = int(os.getenv("KEYWORD_INDEX_SEED_LIMIT", "30"))
+# ...and how many must be found before the SerpAPI lookup is skipped
+KEYWORD_INDEX_MIN_KNOWN = int(os.getenv("KEYWORD_INDEX_MIN_KNOWN", "10"))
 
-def run_keyword_research(business_info: str,
-                         product_info: str,
-                         audience: str,
-                         seed_keywords: Optional[List[str]] = None) -> Dict[str, Any]:
+
+def _fan_out_queries(product_info: str,
+                     audience: str,
+                     seed_keywords: List[str],
+                     competitor_domains: List[str]) -> List[str]:
     """
-    Combine SerpAPI (if available) + Gemini suggestions.
+    One SERP query for the product/audience pair, one per seed keyword and
+    one per competitor domain. Duplicates (case-insensitive) are dropped.
     """
-    seed_keywords = seed_keywords or []
+    candidates = [f"{product_info} {audience}"]
+    candidates += seed_keywords
+    candidates += [f"site:{domain} {product_info}" for domain in competitor_domains]
+
+    queries: List[str] = []
+    seen = set()
+    for query in candidates:
+        query = " ".join(query.split())
+        if query and query.lower() not in seen:
+            seen.add(query.lower())
+            queries.append(query)
+    return queries
+
+
+def _merge_serp_results(queries: List[str],
+                        results_per_query: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Deduplicate organic results across queries by link (title as fallback),
+    keeping first-seen order and recording which queries surfaced each one.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for query, results in zip(queries, results_per_query):
+        for r in results:
+            key = (r.get("link") or r.get("title") or "").rstrip("/").lower()
+            if not key:
+                continue
+            if key not in merged:
+                merged[key] = {**r, "matched_queries": []}
+            merged[key]["matched_queries"].append(query)
+    return list(merged.values())
+
+
+def _cluster_research(seed_keywords: List[str],
+                      ai_keywords: Dict[str, Any],
+                      serp_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Topic clusters over the seeds and Gemini's core/long-tail keywords;
+    fan-out SERP results link queries that share organic results.
+    """
+    # SciPy is only imported once research actually runs (keeps startup fast)
+    from .utils.keyword_clusters import cluster_keywords
+
+    keywords = list(seed_keywords)
+    for key in ("core_keywords", "long_tail_keywords"):
+        keywords += [k for k in ai_keywords.get(key) or [] if isinstance(k, str)]
+
+    serp_urls: Dict[str, List[str]] = {}
+    for result in serp_results:
+        for query in result.get("matched_queries", []):
+            if result.get("link"):
+                serp_urls.setdefault(query, []).append(result["link"])
+    return cluster_keywords(keywords, serp_urls)
+
+
+def _index_context(product_info: str, seed_keywords: List[str]) -> Dict[str, Any]:
+    """
+    Keywords from past research runs related to the product and seeds.
+    When enough are known, their stored SERP results stand in for a fresh
+    SerpAPI lookup ("serp_source": "index").
+    """
+    context = get_keyword_index().seed_context([product_info] + seed_keywords,
+                                               KEYWORD_INDEX_SEED_LIMIT,
+                                               serp_limit=SERP_RESULTS_PER_QUERY * 2)
+    covered = len(context["keywords"]) >= KEYWORD_INDEX_MIN_KNOWN
+    context["serp_source"] = "index" if covered else "serpapi"
+    return context
+
+
+def _record_research(business_info: str, product_info: str, audience: str,
+                     seed_keywords: List[str], report: Dict[str, Any]) -> None:
+    """Add a successful run to the keyword index; index-sourced SERP rows are not re-stored."""
+    if "error" in report["ai_keywords"]:
+        return
+    serp_results = [r for r in report["serp_samples"] if r.get("source") != "keyword_index"]
+    get_keyword_index().ingest(business_info, product_info, audience, seed_keywords,
+                               report["ai_keywords"], serp_results)
 
-    # Get some competitor / SERP context if SerpAPI key is present
-    serp_results = google_search_news(
-        query=f"{product_info} {audience}",
-        num_results=5,
-    )
 
+def _build_prompts(business_info: str,
+                   product_info: str,
+                   audience: str,
+                   seed_keywords: List[str],
+                   serp_results: List[Dict[str, Any]],
+                   known_keywords: Optional[List[str]] = None) -> Tuple[str, str, Dict[str, Any]]:
     system_msg = """
 You are an SEO keyword strategist.
 
@@ -40,6 +128,7 @@ Business: {business_info}
 Product: {product_info}
 Audience: {audience}
 Seed keywords: {", ".join(seed_keywords)}
+Known related keywords from past research: {", ".join(known_keywords or [])}
 
 Top SERP snippets:
 {chr(10).join(serp_snippets)}
@@ -51,9 +140,135 @@ Top SERP snippets:
         "competitor_themes": [],
     }
 
-    ai_keywords = generate_json(system_msg, user_msg, json_template)
+    return system_msg, user_msg, json_template
+
+
+def run_keyword_research(business_info: str,
+                         product_info: str,
+                         audience: str,
+                         seed_keywords: Optional[List[str]] = None,
+                         bypass_cache: bool = False,
+                         competitor_domains: Optional[List[str]] = None,
+                         fan_out: bool = False,
+                         seed_from_index: bool = False) -> Dict[str, Any]:
+    """
+    Combine SerpAPI (if available) + Gemini suggestions.
+
+    With fan_out=True every seed keyword and competitor domain gets its own
+    SERP query; the queries run in a small thread pool and their merged
+    results feed a single Gemini call.
+
+    The keywords are then deduplicated and grouped into topic clusters
+    locally (see utils/keyword_clusters) under "keyword_clusters".
+
+    Every successful run is added to the local keyword index. With
+    seed_from_index=True related keywords from earlier runs go into the
+    prompt, and their stored SERP results replace the SerpAPI lookup when
+    the index already covers the topic (see _index_context).
+    """
+    seed_keywords = seed_keywords or []
+    context = _index_context(product_info, seed_keywords) if seed_from_index else None
+
+    # Get some competitor / SERP context if SerpAPI key is present
+    if context is not None and context["serp_source"] == "index":
+        serp_results = context["serp_results"]
+    elif fan_out:
+        queries = _fan_out_queries(product_info, audience, seed_keywords,
+                                   competitor_domains or [])
+        with ThreadPoolExecutor(max_workers=SERP_FAN_OUT_CONCURRENCY) as pool:
+            per_query = list(pool.map(
+                lambda q: google_search_news(query=q, num_results=SERP_RESULTS_PER_QUERY),
+                queries,
+            ))
+        serp_results = _merge_serp_results(queries, per_query)
+    else:
+        serp_results = google_search_news(
+            query=f"{product_info} {audience}",
+            num_results=SERP_RESULTS_PER_QUERY,
+        )
+
+    known_keywords = [k["keyword"] for k in context["keywords"]] if context else []
+    system_msg, user_msg, json_template = _build_prompts(
+        business_info, product_info, audience, seed_keywords, serp_results, known_keywords
+    )
+    ai_keywords = generate_json(
+        system_msg,
+        user_msg,
+        json_template,
+        endpoint="keywords",
+        bypass_cache=bypass_cache,
+    )
+
+    report = {
+        "serp_samples": serp_results,
+        "ai_keywords": ai_keywords,
+    }
+    if context is not None:
+        report["keyword_index"] = {"known_keywords": known_keywords,
+                                   "serp_source": context["serp_source"]}
+    if "error" not in ai_keywords:
+        report["keyword_clusters"] = _cluster_research(seed_keywords, ai_keywords, serp_results)
+    _record_research(business_info, product_info, audience, seed_keywords, report)
+    return report
+
+
+async def run_keyword_research_async(business_info: str,
+                                     product_info: str,
+                                     audience: str,
+                                     seed_keywords: Optional[List[str]] = None,
+                                     bypass_cache: bool = False,
+                                     competitor_domains: Optional[List[str]] = None,
+                                     fan_out: bool = False,
+                                     seed_from_index: bool = False) -> Dict[str, Any]:
+    seed_keywords = seed_keywords or []
+    # the keyword index is SQLite; its reads and writes run on worker threads
+    context = (await asyncio.to_thread(_index_context, product_info, seed_keywords)
+               if seed_from_index else None)
+
+    if context is not None and context["serp_source"] == "index":
+        serp_results = context["serp_results"]
+    elif fan_out:
+        queries = _fan_out_queries(product_info, audience, seed_keywords,
+                                   competitor_domains or [])
+        semaphore = asyncio.Semaphore(SERP_FAN_OUT_CONCURRENCY)
+
+        async def _search(query: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await google_search_news_async(
+                    query=query, num_results=SERP_RESULTS_PER_QUERY
+                )
+
+        per_query = await asyncio.gather(*(_search(q) for q in queries))
+        serp_results = _merge_serp_results(queries, per_query)
+    else:
+        serp_results = await google_search_news_async(
+            query=f"{product_info} {audience}",
+            num_results=SERP_RESULTS_PER_QUERY,
+        )
+
+    known_keywords = [k["keyword"] for k in context["keywords"]] if context else []
+    system_msg, user_msg, json_template = _build_prompts(
+        business_info, product_info, audience, seed_keywords, serp_results, known_keywords
+    )
+    ai_keywords = await generate_json_async(
+        system_msg,
+        user_msg,
+        json_template,
+        endpoint="keywords",
+        bypass_cache=bypass_cache,
+    )
 
-    return {
+    report = {
         "serp_samples": serp_results,
         "ai_keywords": ai_keywords,
     }
+    if context is not None:
+        report["keyword_index"] = {"known_keywords": known_keywords,
+                                   "serp_source": context["serp_source"]}
+    if "error" not in ai_keywords:
+        # SciPy clustering is CPU-bound; keep it off the event loop
+        report["keyword_clusters"] = await asyncio.to_thread(
+            _cluster_research, seed_keywords, ai_keywords, serp_results)
+    await asyncio.to_thread(_record_research, business_info, product_info, audience,
+                            seed_keywords, report)
+    return report
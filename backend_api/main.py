@@ -1,17 +1,32 @@
 # backend_api/main.py
 
-from typing import List, Optional, Dict, Any
+import asyncio
+import json
+import time
+from typing import Annotated, AsyncIterator, List, Literal, Optional, Dict, Any
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
 
 # Correct imports
-from .campaign_builder import run_campaign_builder
-from .seo_analyzer import run_seo_analyzer
-from .keyword_research import run_keyword_research
-from .performance_predictor import run_performance_forecast
-from .content_calendar import run_content_calendar
+from .campaign_builder import run_campaign_builder_async, stream_campaign_builder
+from .seo_analyzer import run_seo_analyzer_async
+from .seo_bulk import SEO_BULK_BATCH_SIZE, SEO_BULK_MAX_BATCH_SIZE, SEO_BULK_MAX_URLS, stream_seo_bulk_audit
+from .keyword_research import run_keyword_research_async
+from .performance_predictor import run_forecast_grid, run_performance_forecast_async
+from .content_calendar import run_content_calendar_async, stream_content_calendar
+from .batch import BATCH_CONCURRENCY_LIMIT, BATCH_MAX_BRIEFS, BATCH_MAX_CONCURRENCY, stream_campaign_batch
+from .jobs import job_queue
+from .utils.gemini_client import GeminiUnavailable, gemini_call_stats, get_cache, preload_model
+from .utils.json_repair import repair_stats
+from .utils.keyword_index import get_keyword_index
+from .utils.crawler import CRAWL_MAX_DEPTH, CRAWL_MAX_PAGES
+from .utils.forecast import FORECAST_MAX_SCENARIOS
+from .utils.results_store import columns_from_rows, get_results_store, parse_results
+from .utils.serp_client import serp_stats
+from .utils.telemetry import API_REQUEST_SECONDS, CONTENT_TYPE, render_metrics
 
 app = FastAPI(title="AI Marketing & SEO Suite API")
 
@@ -24,10 +39,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # label by route template (/api/jobs/{job_id}), not the raw path
+        route = request.scope.get("route")
+        API_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            path=getattr(route, "path", "unmatched"),
+            method=request.method,
+            status=str(status),
+        )
+
+
+# Gemini outages surface as 503 instead of a 200 with an error payload
+@app.exception_handler(GeminiUnavailable)
+async def gemini_unavailable_handler(request: Request, exc: GeminiUnavailable):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+    )
+
+
 # -------------------------
 # Request Models
 # -------------------------
 
+# one year at most; longer runs would fan out into hundreds of week prompts
+DurationWeeks = Annotated[int, Field(ge=1, le=52)]
+
+
 class CampaignRequest(BaseModel):
     business_info: str
     campaign_goal: str
@@ -35,15 +84,33 @@ class CampaignRequest(BaseModel):
     audience: str
     platforms: List[str]
     website_url: Optional[str] = None
-    duration_weeks: Optional[int] = 4
+    duration_weeks: Optional[DurationWeeks] = 4
     posts_per_week: Optional[int] = 3
     budget: Optional[float] = None
     seed_keywords: Optional[List[str]] = None
+    sectioned: bool = False
+    bypass_cache: bool = False
 
 
 class SEORequest(BaseModel):
     url: str
     target_keywords: Optional[List[str]] = None
+    depth: int = Field(1, ge=1, le=CRAWL_MAX_DEPTH)
+    max_pages: int = Field(min(50, CRAWL_MAX_PAGES), ge=1, le=CRAWL_MAX_PAGES)
+    incremental: bool = True
+    llm: Literal["auto", "always", "never"] = "auto"
+    bypass_cache: bool = False
+
+
+class SEOBulkRequest(BaseModel):
+    urls: List[str] = []
+    sitemap_url: Optional[str] = None
+    target_keywords: Optional[List[str]] = None
+    max_urls: int = SEO_BULK_MAX_URLS
+    batch_size: int = Field(SEO_BULK_BATCH_SIZE, ge=1, le=SEO_BULK_MAX_BATCH_SIZE)
+    incremental: bool = True
+    llm: Literal["auto", "always", "never"] = "auto"
+    bypass_cache: bool = False
 
 
 class KeywordRequest(BaseModel):
@@ -51,6 +118,10 @@ class KeywordRequest(BaseModel):
     product_info: str
     audience: str
     seed_keywords: Optional[List[str]] = None
+    competitor_domains: Optional[List[str]] = None
+    fan_out: bool = False
+    seed_from_index: bool = False
+    bypass_cache: bool = False
 
 
 class PerformanceRequest(BaseModel):
@@ -58,14 +129,104 @@ class PerformanceRequest(BaseModel):
     campaign_goal: str
     platforms: List[str]
     budget: Optional[float] = None
-    duration_weeks: Optional[int] = 4
+    duration_weeks: Optional[DurationWeeks] = 4
     posts_per_week: Optional[int] = 3
+    platform_mix: Optional[Dict[str, float]] = None
+    simulations: Optional[int] = None
+    client: Optional[str] = None  # ground the forecast in this client's results
+    narrative: bool = False  # let Gemini write the summary and caveats
+    bypass_cache: bool = False
+
+
+class ForecastGridRequest(BaseModel):
+    business_info: str = ""
+    campaign_goal: str = ""
+    platforms: List[str]
+    budgets: List[float] = Field(max_length=FORECAST_MAX_SCENARIOS)
+    platform_mixes: Optional[List[Dict[str, float]]] = Field(None, max_length=FORECAST_MAX_SCENARIOS)
+    duration_weeks: List[DurationWeeks] = Field([4], max_length=FORECAST_MAX_SCENARIOS)
+    posts_per_week: int = 3
+    simulations: Optional[int] = None
+    client: Optional[str] = None
 
 
 class CalendarRequest(CampaignRequest):
     pass
 
 
+class BatchCampaignRequest(BaseModel):
+    briefs: List[CampaignRequest] = Field(min_length=1, max_length=BATCH_MAX_BRIEFS)
+    max_concurrency: int = Field(BATCH_MAX_CONCURRENCY, ge=1, le=BATCH_CONCURRENCY_LIMIT)
+    mode: Literal["stream", "job"] = "stream"  # NDJSON/SSE, or a job to poll by id
+
+
+# -------------------------
+# Streaming helpers
+# -------------------------
+
+async def _encode_events(events: AsyncIterator[Dict[str, Any]], fmt: str) -> AsyncIterator[str]:
+    try:
+        async for event in events:
+            data = json.dumps(event, ensure_ascii=False)
+            if fmt == "sse":
+                yield f"event: {event['event']}\ndata: {data}\n\n"
+            else:
+                yield data + "\n"
+    except Exception as exc:
+        error = json.dumps({"event": "error", "error": str(exc)})
+        yield f"event: error\ndata: {error}\n\n" if fmt == "sse" else error + "\n"
+
+
+def _stream_response(events: AsyncIterator[Dict[str, Any]], fmt: str) -> StreamingResponse:
+    """
+    NDJSON by default; `?format=sse` switches to Server-Sent Events.
+    """
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        _encode_events(events, fmt),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# -------------------------
+# Background jobs
+# -------------------------
+
+AsyncMode = Query(False, alias="async", description="Queue the work and return a job id")
+IdempotencyKey = Header(None, alias="Idempotency-Key")
+
+
+async def _submit_job(kind: str, payload: Dict[str, Any], idempotency_key: Optional[str]) -> JSONResponse:
+    # the insert (and purge) commits to SQLite, so it runs off the event loop
+    job, created = await asyncio.to_thread(job_queue.submit, kind, payload, idempotency_key)
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job["job_id"], "status": job["status"], "created": created},
+        headers={"Location": f"/api/jobs/{job['job_id']}"},
+    )
+
+
+def _job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in job.items() if k not in ("payload", "idempotency_key", "owner", "lease_expires")}
+
+
+@app.on_event("startup")
+def start_job_queue():
+    job_queue.start()
+
+
+@app.on_event("startup")
+def warm_gemini_model():
+    # Startup returns immediately; the SDK import happens in the background.
+    preload_model()
+
+
+@app.on_event("shutdown")
+def stop_job_queue():
+    job_queue.shutdown()
+
+
 # -------------------------
 # API Endpoints
 # -------------------------
@@ -75,33 +236,236 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/api/stats")
+def stats():
+    cache = get_cache()
+    return {
+        "gemini_cache": cache.stats() if cache is not None else None,
+        "gemini_calls": gemini_call_stats(),
+        "json_parsing": repair_stats(),
+        "keyword_index": get_keyword_index().stats(),
+        "results_store": get_results_store().stats(),
+        "serpapi": serp_stats(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+
 @app.post("/api/generate_campaign")
-def generate_campaign(req: CampaignRequest):
-    return {"campaign": run_campaign_builder(req.dict())}
+async def generate_campaign(req: CampaignRequest, run_async: bool = AsyncMode,
+                            idempotency_key: Optional[str] = IdempotencyKey):
+    if run_async:
+        return await _submit_job("campaign", req.dict(), idempotency_key)
+    return {"campaign": await run_campaign_builder_async(req.dict())}
+
+
+@app.post("/api/generate_campaign/stream")
+async def generate_campaign_stream(req: CampaignRequest, format: str = "ndjson"):
+    return _stream_response(stream_campaign_builder(req.dict()), format)
+
+
+@app.post("/api/generate_campaign/batch")
+async def generate_campaign_batch(req: BatchCampaignRequest, format: str = "ndjson",
+                                  idempotency_key: Optional[str] = IdempotencyKey):
+    briefs = [brief.dict() for brief in req.briefs]
+    if req.mode == "job":
+        payload = {"briefs": briefs, "max_concurrency": req.max_concurrency}
+        return await _submit_job("campaign_batch", payload, idempotency_key)
+    return _stream_response(stream_campaign_batch(briefs, req.max_concurrency), format)
+
+
+@app.get("/api/generate_campaign/batch/{job_id}")
+def generate_campaign_batch_status(job_id: str):
+    """Alias of GET /api/jobs/{job_id} for batch jobs."""
+    job = job_queue.get(job_id)
+    if job is None or job["kind"] != "campaign_batch":
+        raise HTTPException(status_code=404, detail="Unknown batch job")
+    return _job_view(job)
 
 
 @app.post("/api/seo_analyze")
-def seo_analyze(req: SEORequest):
-    return {"seo_report": run_seo_analyzer(req.url, req.target_keywords)}
+async def seo_analyze(req: SEORequest, run_async: bool = AsyncMode,
+                      idempotency_key: Optional[str] = IdempotencyKey):
+    if run_async:
+        return await _submit_job("seo", req.dict(), idempotency_key)
+    return {
+        "seo_report": await run_seo_analyzer_async(
+            req.url,
+            req.target_keywords,
+            bypass_cache=req.bypass_cache,
+            depth=req.depth,
+            max_pages=req.max_pages,
+            incremental=req.incremental,
+            llm=req.llm,
+        )
+    }
+
+
+@app.post("/api/seo_analyze/bulk")
+async def seo_analyze_bulk(req: SEOBulkRequest, format: str = "ndjson"):
+    if not req.urls and not req.sitemap_url:
+        raise HTTPException(status_code=400, detail="Provide urls or sitemap_url")
+    return _stream_response(stream_seo_bulk_audit(
+        req.urls,
+        sitemap_url=req.sitemap_url,
+        target_keywords=req.target_keywords,
+        max_urls=req.max_urls,
+        batch_size=req.batch_size,
+        incremental=req.incremental,
+        llm=req.llm,
+        bypass_cache=req.bypass_cache,
+    ), format)
 
 
 @app.post("/api/keyword_research")
-def keyword_research(req: KeywordRequest):
+async def keyword_research(req: KeywordRequest, run_async: bool = AsyncMode,
+                           idempotency_key: Optional[str] = IdempotencyKey):
+    if run_async:
+        return await _submit_job("keywords", req.dict(), idempotency_key)
     return {
-        "keyword_research": run_keyword_research(
+        "keyword_research": await run_keyword_research_async(
             business_info=req.business_info,
             product_info=req.product_info,
             audience=req.audience,
             seed_keywords=req.seed_keywords,
+            bypass_cache=req.bypass_cache,
+            competitor_domains=req.competitor_domains,
+            fan_out=req.fan_out,
+            seed_from_index=req.seed_from_index,
         )
     }
 
 
+@app.get("/api/keywords/lookup")
+def keyword_lookup(q: str = Query(..., min_length=1), limit: int = Query(20, ge=1, le=200)):
+    """Known keywords from past research: prefix matches, then fuzzy (trigram) matches."""
+    return get_keyword_index().lookup(q, limit)
+
+
 @app.post("/api/performance_forecast")
-def performance_forecast(req: PerformanceRequest):
-    return {"performance_forecast": run_performance_forecast(req.dict())}
+async def performance_forecast(req: PerformanceRequest, run_async: bool = AsyncMode,
+                               idempotency_key: Optional[str] = IdempotencyKey):
+    if run_async:
+        return await _submit_job("forecast", req.dict(), idempotency_key)
+    try:
+        return {"performance_forecast": await run_performance_forecast_async(req.dict())}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/api/performance_forecast/grid")
+async def performance_forecast_grid(req: ForecastGridRequest):
+    if not req.budgets:
+        raise HTTPException(status_code=400, detail="Provide at least one budget")
+    try:
+        return {"forecast_grid": await asyncio.to_thread(run_forecast_grid, req.dict())}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _parse_results_body(body: str, content_type: str):
+    if content_type.startswith("text/csv"):
+        return parse_results(body)
+    data = json.loads(body or "null")
+    if isinstance(data, dict):
+        data = data.get("rows") if data.get("rows") is not None else data.get("csv")
+    if isinstance(data, str):
+        return parse_results(data)
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise ValueError('Send a CSV body, a JSON list of rows, or {"rows": [...]} / {"csv": "..."}')
+    return columns_from_rows(data)
+
+
+@app.post("/api/results/{client}")
+async def ingest_results(client: str, request: Request):
+    """
+    Load a campaign results export (date, platform, spend, impressions,
+    clicks, conversions, optional campaign) for a client: a CSV body
+    (Content-Type: text/csv) or JSON. Rows already stored for the same
+    date, platform and campaign are replaced.
+    """
+    body = (await request.body()).decode("utf-8-sig")
+    try:
+        columns = await asyncio.to_thread(_parse_results_body, body, request.headers.get("content-type", ""))
+        return await asyncio.to_thread(get_results_store().ingest, client, columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/results")
+def list_results():
+    return {"clients": get_results_store().summary()}
+
+
+@app.get("/api/results/aggregate")
+def aggregate_results(client: Optional[str] = None, group_by: str = "platform",
+                      start: Optional[str] = None, end: Optional[str] = None,
+                      platforms: Optional[str] = None):
+    """
+    Totals and rates per group. group_by is a comma-separated list of
+    client, month, week, date, platform, campaign (empty for one total);
+    start/end are inclusive ISO dates; platforms filters by name.
+    """
+    try:
+        return get_results_store().aggregate(
+            client, [key for key in group_by.split(",") if key], start, end,
+            platforms.split(",") if platforms else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/results/rolling")
+def rolling_results(client: Optional[str] = None, window: int = Query(7, ge=1, le=365),
+                    start: Optional[str] = None, end: Optional[str] = None,
+                    platforms: Optional[str] = None):
+    """Trailing `window`-day totals and rates for every day in range."""
+    try:
+        return get_results_store().rolling(client, window, start, end,
+                                           platforms.split(",") if platforms else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.post("/api/content_calendar")
-def content_calendar(req: CalendarRequest):
-    return {"content_calendar": run_content_calendar(req.dict())}
+async def content_calendar(req: CalendarRequest, run_async: bool = AsyncMode,
+                           idempotency_key: Optional[str] = IdempotencyKey):
+    if run_async:
+        return await _submit_job("calendar", req.dict(), idempotency_key)
+    return {"content_calendar": await run_content_calendar_async(req.dict())}
+
+
+@app.post("/api/content_calendar/stream")
+async def content_calendar_stream(req: CalendarRequest, format: str = "ndjson"):
+    return _stream_response(stream_content_calendar(req.dict()), format)
+
+
+@app.get("/api/jobs")
+def list_jobs(status: Optional[str] = None, limit: int = 50):
+    return {"jobs": [_job_view(job) for job in job_queue.store.list(status, limit)]}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = Query(0, ge=0, le=60)):
+    """
+    Poll a job. With `?wait=N` the request blocks for up to N seconds until
+    the job finishes (long-poll subscription).
+    """
+    if wait:
+        job = await asyncio.to_thread(job_queue.wait, job_id, wait)
+    else:
+        job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return _job_view(job)
+
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str):
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return _job_view(job)
@@ -1,48 +1,303 @@
 # backend_api/performance_predictor.py
 
-from typing import Dict, Any, List
+import asyncio
+import itertools
+import time
+from typing import Dict, Any, List, Optional, Tuple
 
-from .utils.gemini_client import generate_json
+import numpy as np
 
+from .utils.forecast import (
+    FORECAST_MAX_SCENARIOS,
+    FORECAST_SIMULATIONS,
+    PERCENTILES,
+    band,
+    draw_count,
+    load_priors,
+    percentile_bands,
+    prior_for,
+    simulate,
+    stable_seed,
+    summarise,
+)
+from .utils.gemini_client import generate_json, generate_json_async
+from .utils.results_store import RESULTS_BENCHMARK_DAYS, get_results_store
 
-def run_performance_forecast(payload: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Rough performance forecast using Gemini.
-    This is qualitative + simple numeric ranges.
-    """
-    business = payload.get("business_info", "")
-    goal = payload.get("campaign_goal", "")
-    platforms: List[str] = payload.get("platforms", []) or []
-    budget = payload.get("budget")
-    duration_weeks = payload.get("duration_weeks")
-    posts_per_week = payload.get("posts_per_week")
-
-    system_msg = """
+NARRATIVE_SYSTEM_MSG = """
 You are a cautious performance marketer.
 
+You receive a simulated forecast (percentile bands from a Monte Carlo run
+over platform benchmarks, or over the account's own results where
+available). Do not change or invent numbers.
+
 You must output ONLY JSON with:
-- summary: short explanation
-- ctr_estimate: object with min/max percentage
-- cpc_estimate: object with min/max in USD
-- conversions_estimate: object with min/max integers
+- summary: short explanation of the expected outcome
 - caveats: list of bullets explaining uncertainty
 """
 
+NARRATIVE_TEMPLATE = {"summary": "", "caveats": []}
+
+
+def _inputs(payload: Dict[str, Any]) -> Tuple[List[str], float, int, int, np.ndarray]:
+    platforms: List[str] = payload.get("platforms") or ["General"]
+    budget = float(payload.get("budget") or 0)
+    duration_weeks = max(1, int(payload.get("duration_weeks") or 4))
+    posts_per_week = max(0, int(payload.get("posts_per_week") or 0))
+    return platforms, budget, duration_weeks, posts_per_week, _mix(platforms, payload.get("platform_mix"))
+
+
+def _mix(platforms: List[str], weights: Optional[Dict[str, float]]) -> np.ndarray:
+    """Share per platform; missing or empty weights mean an even split."""
+    if not weights:
+        return np.full(len(platforms), 1 / len(platforms))
+    lowered = {name.lower(): float(value) for name, value in weights.items()}
+    mix = np.array([max(0.0, lowered.get(name.lower(), 0.0)) for name in platforms])
+    return mix / mix.sum() if mix.sum() > 0 else np.full(len(platforms), 1 / len(platforms))
+
+
+def _history(payload: Dict[str, Any], platforms: List[str]) -> Tuple[Dict[str, Dict[str, Any]],
+                                                                    Optional[Dict[str, Any]]]:
+    """
+    Priors from the client's own results (utils/results_store.py): each
+    platform with enough weeks of history forecasts from its observed weekly
+    ctr/cpc/cvr ranges instead of the benchmark ones; organic reach and
+    delivery keep their benchmark priors. A platform matches a history row
+    by name, or by mapping to the same benchmark ("FB" and "Facebook Ads").
+    Returns (simulate overrides, what was used for the report).
+    """
+    client = payload.get("client")
+    if not client:
+        return {}, None
+    try:
+        observed = get_results_store().benchmarks(client)
+    except ValueError:
+        observed = {}
+    priors = load_priors()
+    overrides, used = {}, {}
+    for name in platforms:
+        key = prior_for(name, priors)
+        matches = [hist for hist in observed
+                   if hist.lower() == name.lower() or (key and prior_for(hist, priors) == key)]
+        if not matches:
+            continue
+        hist = max(matches, key=lambda h: (h.lower() == name.lower(), observed[h]["clicks"]))
+        ranges = {rate: bounds for rate, bounds in observed[hist]["ranges"].items() if bounds}
+        if not ranges:
+            continue
+        overrides[name] = {**priors[key or "default"], **ranges}
+        used[name] = {"matched": hist, **{k: v for k, v in observed[hist].items() if k != "ranges"},
+                      "ranges": ranges}
+    return overrides, {"client": client, "days": RESULTS_BENCHMARK_DAYS,
+                       "has_results": bool(observed), "platforms": used}
+
+
+def _range(band: Dict[str, Any], scale: float = 1.0, digits: int = 2) -> Dict[str, float]:
+    return {"min": round(band["p10"] * scale, digits), "max": round(band["p90"] * scale, digits)}
+
+
+def _local_narrative(platforms: List[str], budget: float, duration_weeks: int,
+                     posts_per_week: int, totals: Dict[str, Any],
+                     history: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    priors = load_priors()
+    clicks, conversions, spend = totals["clicks"], totals["conversions"], totals["spend"]
+    sources = []
+    if budget:
+        sources.append(f"about ${spend['p50']:,.0f} of ad spend")
+    if posts_per_week:
+        sources.append(f"{posts_per_week * duration_weeks} organic posts")
+    summary = (
+        f"Over {duration_weeks} weeks, {' and '.join(sources) or 'the campaign'} should bring "
+        f"{clicks['p50']:,.0f} clicks (80% range {clicks['p10']:,.0f}-{clicks['p90']:,.0f}) and "
+        f"{conversions['p50']:,.0f} conversions ({conversions['p10']:,.0f}-{conversions['p90']:,.0f})."
+    )
+    grounded = list(history["platforms"]) if history else []
+    benchmarked = [name for name in platforms if name not in grounded]
+    if grounded:
+        caveats = [f"Rates for {', '.join(grounded)} come from {history['client']}'s own results "
+                   f"(last {history['days']} days)."]
+        if benchmarked:
+            caveats.append(f"Industry benchmark priors are used for {', '.join(benchmarked)}.")
+    elif history and not history["has_results"]:
+        caveats = [f"No results on file for {history['client']}; ranges come from industry benchmark priors."]
+    elif history:
+        caveats = [f"Not enough history for these platforms in {history['client']}'s results; "
+                   "ranges come from industry benchmark priors."]
+    else:
+        caveats = ["Ranges come from industry benchmark priors, not this account's history."]
+    generic = [name for name in benchmarked if prior_for(name, priors) is None]
+    if generic:
+        caveats.append(f"No specific benchmarks for {', '.join(generic)}; generic rates were used.")
+    paid_history = {name for name in grounded if "cpc" in history["platforms"][name]["ranges"]}
+    unpaid = [name for name in platforms
+              if name not in paid_history and not priors[prior_for(name, priors) or "default"]["cpc"]]
+    if budget and unpaid:
+        caveats.append(f"No paid placements on {', '.join(unpaid)}; the budget is split across the other platforms.")
+    if not budget:
+        caveats.append("No budget given, so only organic reach is forecast.")
+    if conversions["p10"] == 0:
+        caveats.append("Low volume: zero conversions is within the likely range.")
+    return {"summary": summary, "caveats": caveats}
+
+
+def _history_brief(history: Optional[Dict[str, Any]]) -> str:
+    if not history or not history["platforms"]:
+        return "none (benchmark priors only)"
+    return "; ".join(
+        f"{name}: {h['weeks']} weeks, ctr {h['ctr']}, cvr {h['cvr']}"
+        + (f", cpc {h['cpc']}, cpa {h['cpa']}" if h["spend"] else ", organic only")
+        for name, h in history["platforms"].items())
+
+
+def _narrative_request(payload: Dict[str, Any], forecast: Dict[str, Any]) -> Dict[str, Any]:
     user_msg = f"""
-Business: {business}
-Goal: {goal}
-Platforms: {", ".join(platforms)}
-Budget per month: {budget}
-Duration (weeks): {duration_weeks}
-Posts per week: {posts_per_week}
+Business: {payload.get("business_info", "")}
+Goal: {payload.get("campaign_goal", "")}
+Inputs: {forecast["inputs"]}
+Simulated totals (p10/p50/p90): {forecast["forecast"]["totals"]}
+Account history used: {_history_brief(forecast.get("history"))}
 """
+    return {
+        "system_prompt": NARRATIVE_SYSTEM_MSG,
+        "user_prompt": user_msg,
+        "json_template": NARRATIVE_TEMPLATE,
+        "max_tokens": 512,
+        "endpoint": "forecast",
+        "bypass_cache": bool(payload.get("bypass_cache")),
+    }
+
+
+def _apply_narrative(report: Dict[str, Any], narrative: Dict[str, Any]) -> Dict[str, Any]:
+    # the local text stays when Gemini fails or leaves a field out
+    if "error" not in narrative:
+        if narrative.get("summary"):
+            report["summary"] = narrative["summary"]
+        if narrative.get("caveats"):
+            report["caveats"] = narrative["caveats"]
+        report["narrative_source"] = "gemini"
+    return report
 
-    json_template = {
-        "summary": "",
-        "ctr_estimate": {"min": 0.0, "max": 0.0},
-        "cpc_estimate": {"min": 0.0, "max": 0.0},
-        "conversions_estimate": {"min": 0, "max": 0},
-        "caveats": [],
+
+def forecast_locally(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Monte Carlo forecast from per-platform priors (utils/forecast.py):
+    FORECAST_SIMULATIONS draws in one vectorised pass, seeded from the
+    inputs so the same request always returns the same bands. Keeps the
+    ctr/cpc/conversions_estimate ranges (p10-p90) of the Gemini forecast.
+    With a `client`, platforms that have results on file use them as
+    priors (see _history).
+    """
+    started = time.perf_counter()
+    platforms, budget, duration_weeks, posts_per_week, mix = _inputs(payload)
+    simulations = draw_count(payload.get("simulations") or FORECAST_SIMULATIONS, len(platforms))
+    inputs = {"platforms": platforms, "budget": budget, "duration_weeks": duration_weeks,
+              "posts_per_week": posts_per_week,
+              "platform_mix": dict(zip(platforms, np.round(mix, 4).tolist()))}
+
+    overrides, history = _history(payload, platforms)
+    draws = simulate(platforms, np.array([budget]), mix[None], np.array([duration_weeks]),
+                     np.array([posts_per_week]), simulations, stable_seed(inputs, simulations),
+                     overrides=overrides)
+    forecast = summarise(draws, 0, platforms)
+    totals = forecast["totals"]
+    return {
+        **_local_narrative(platforms, budget, duration_weeks, posts_per_week, totals, history),
+        "ctr_estimate": _range(totals["ctr"], scale=100, digits=3),
+        "cpc_estimate": _range(totals["cpc"]),
+        "conversions_estimate": {"min": int(totals["conversions"]["p10"]),
+                                 "max": int(totals["conversions"]["p90"])},
+        "inputs": inputs,
+        "forecast": forecast,
+        "history": history,
+        "simulations": simulations,
+        "narrative_source": "local",
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
     }
 
-    return generate_json(system_msg, user_msg, json_template)
+
+def run_performance_forecast(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Numeric forecast from the local Monte Carlo engine. With
+    `"narrative": true` Gemini rewrites only the summary and caveats.
+    """
+    report = forecast_locally(payload)
+    if payload.get("narrative"):
+        report = _apply_narrative(report, generate_json(**_narrative_request(payload, report)))
+    return report
+
+
+async def run_performance_forecast_async(payload: Dict[str, Any]) -> Dict[str, Any]:
+    # NumPy releases the GIL for most of the simulation; keep it off the event loop
+    report = await asyncio.to_thread(forecast_locally, payload)
+    if payload.get("narrative"):
+        narrative = await generate_json_async(**_narrative_request(payload, report))
+        report = _apply_narrative(report, narrative)
+    return report
+
+
+# ----------------------------------------------------
+# SCENARIO GRID
+# ----------------------------------------------------
+def run_forecast_grid(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Sweep budgets x platform mixes x durations in one simulation. All
+    scenarios share the same platform draws, so their differences come
+    from the inputs, not sampling noise. Scenarios are returned in sweep
+    order with their bands, plus the best by median conversions and by
+    median cost per acquisition.
+    """
+    started = time.perf_counter()
+    platforms: List[str] = payload.get("platforms") or ["General"]
+    budgets = [float(b) for b in payload.get("budgets") or [0.0]]
+    mixes = payload.get("platform_mixes") or [None]
+    durations = [max(1, int(w)) for w in payload.get("duration_weeks") or [4]]
+    posts_per_week = max(0, int(payload.get("posts_per_week") or 0))
+    scenarios = len(budgets) * len(mixes) * len(durations)
+    if scenarios > FORECAST_MAX_SCENARIOS:
+        raise ValueError(f"{scenarios} scenarios requested; the limit is {FORECAST_MAX_SCENARIOS}")
+    simulations = draw_count(payload.get("simulations") or FORECAST_SIMULATIONS // 4,
+                             scenarios * len(platforms))
+
+    overrides, history = _history(payload, platforms)
+    grid = list(itertools.product(budgets, range(len(mixes)), durations))
+    mix_rows = np.stack([_mix(platforms, mix) for mix in mixes])
+
+    draws = simulate(
+        platforms,
+        np.array([budget for budget, _, _ in grid]),
+        mix_rows[[mix for _, mix, _ in grid]],
+        np.array([weeks for _, _, weeks in grid], dtype=float),
+        np.full(len(grid), posts_per_week, dtype=float),
+        simulations,
+        stable_seed(platforms, budgets, mixes, durations, posts_per_week, simulations),
+        overrides=overrides,
+    )
+    # totals over platforms, then every (scenario, metric) series in one percentile pass
+    totals = {metric: values.sum(axis=2) for metric, values in draws.items()}    # (S, N)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        totals["cpa"] = np.where(totals["conversions"] > 0,
+                                 totals["spend"] / totals["conversions"], np.inf)
+    metrics = list(totals)
+    qs, means = percentile_bands(np.concatenate([totals[metric] for metric in metrics]))
+    bands = {metric: (qs[:, i * len(grid):(i + 1) * len(grid)], means[i * len(grid):(i + 1) * len(grid)])
+             for i, metric in enumerate(metrics)}
+
+    scenarios = []
+    for index, (budget, mix, weeks) in enumerate(grid):
+        scenarios.append({
+            "budget": budget,
+            "platform_mix": dict(zip(platforms, np.round(mix_rows[mix], 4).tolist())),
+            "duration_weeks": weeks,
+            "totals": {metric: band(q[:, index], m[index]) for metric, (q, m) in bands.items()},
+        })
+    median = PERCENTILES.index(50)
+    cpa_median = bands["cpa"][0][median]
+    return {
+        "platforms": platforms,
+        "posts_per_week": posts_per_week,
+        "simulations": simulations,
+        "history": history,
+        "scenarios": scenarios,
+        "best_by_conversions": int(np.argmax(bands["conversions"][0][median])),
+        "best_by_cpa": int(np.argmin(cpa_median)) if np.isfinite(cpa_median).any() else None,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
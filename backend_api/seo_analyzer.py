@@ -1,44 +1,65 @@
 # backend_api/seo_analyzer.py
 
-from typing import Dict, Any, List, Optional
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 
-from .utils.gemini_client import generate_json
+from .utils.audit_store import AuditStore, content_hash, get_audit_store
+from .utils.crawler import CRAWL_MAX_PAGES, crawl_site
+from .utils.gemini_client import generate_json, generate_json_async
+from .utils.html_extract import extract_seo_signals
+from .utils.http_client import fetch, fetch_async
+from .utils.seo_rules import evaluate_page, rules_analysis, wants_llm
 
+PAGE_FIELDS = ("title", "meta_description", "h1")
+# AI suggestion that has to be redone when an on-page field changes
+FIELD_SUGGESTIONS = {
+    "title": "suggested_title",
+    "meta_description": "suggested_meta_description",
+}
 
-def _fetch_html(url: str) -> Optional[str]:
+
+def _fetch_html(url: str) -> Tuple[Optional[str], Optional[str]]:
+    """(html or None, content hash)"""
+    try:
+        res = fetch(url, conditional=True)
+        res.raise_for_status()
+        return res.text, content_hash(res.content)
+    except Exception:
+        return None, None
+
+
+async def _fetch_html_async(url: str) -> Tuple[Optional[str], Optional[str]]:
     try:
-        res = requests.get(url, timeout=15, headers={"User-Agent": "Mozilla/5.0"})
+        res = await fetch_async(url, conditional=True)
         res.raise_for_status()
-        return res.text
+        return res.text, content_hash(res.content)
     except Exception:
-        return None
+        return None, None
 
 
-def run_seo_analyzer(url: str, target_keywords: Optional[List[str]] = None) -> Dict[str, Any]:
-    html = _fetch_html(url)
+def _extract_page_info(html: Optional[str]) -> Dict[str, str]:
+    # Only head fields + first H1 are needed, so the extractor stops early.
+    signals = extract_seo_signals(html or "", fields=("title", "meta", "h1"))
 
-    basic_info = {
-        "url": url,
-        "has_html": bool(html),
+    return {
+        "title": signals["title"],
+        "meta_description": signals["meta_description"],
+        "h1": signals["h1"],
     }
 
-    title = ""
-    meta_desc = ""
-    h1 = ""
-
-    if html:
-        soup = BeautifulSoup(html, "html.parser")
-        if soup.title and soup.title.string:
-            title = soup.title.string.strip()
-        desc_tag = soup.find("meta", attrs={"name": "description"})
-        if desc_tag and desc_tag.get("content"):
-            meta_desc = desc_tag["content"].strip()
-        h1_tag = soup.find("h1")
-        if h1_tag:
-            h1 = h1_tag.get_text(strip=True)
 
+def _page_info(html: Optional[str], digest: Optional[str],
+               snapshot: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    # Same bytes as the last audit: reuse its fields instead of re-parsing.
+    if snapshot is not None and digest and snapshot["content_hash"] == digest:
+        return dict(snapshot["page_info"])
+    return _extract_page_info(html)
+
+
+def _build_prompts(url: str,
+                   page_info: Dict[str, str],
+                   target_keywords: Optional[List[str]]) -> Tuple[str, str, Dict[str, Any]]:
     system_msg = """
 You are an SEO expert. You will receive:
 - Basic on-page info (title, meta description, H1)
@@ -55,9 +76,9 @@ Return ONLY JSON with:
     user_msg = f"""
 Page URL: {url}
 
-Current title: {title}
-Meta description: {meta_desc}
-H1: {h1}
+Current title: {page_info["title"]}
+Meta description: {page_info["meta_description"]}
+H1: {page_info["h1"]}
 
 Target keywords: {", ".join(target_keywords or [])}
 """
@@ -70,14 +91,357 @@ Target keywords: {", ".join(target_keywords or [])}
         "suggested_meta_description": "",
     }
 
-    ai_analysis = generate_json(system_msg, user_msg, json_template)
+    return system_msg, user_msg, json_template
+
+
+def _build_delta_prompts(url: str,
+                         page_info: Dict[str, str],
+                         target_keywords: Optional[List[str]],
+                         previous: Dict[str, Any],
+                         changed: Dict[str, Dict[str, str]]) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    Prompts for re-auditing a page whose on-page fields partly changed:
+    only the score, issues, recommendations and the suggestions tied to
+    the changed fields are regenerated.
+    """
+    system_msg = """
+You are an SEO expert updating an earlier audit of the same page.
+Only the fields listed under CHANGED differ from the last audit.
+
+Return ONLY JSON with:
+- high_level_score (0-100) for the page as it is now
+- issues (list of strings), revised for the change
+- recommendations (list of strings), revised for the change
+- a new suggestion for each changed field that has one in the structure
+"""
+
+    changes = "\n".join(
+        f"- {field}: {diff['before']!r} -> {diff['after']!r}" for field, diff in changed.items()
+    )
+    user_msg = f"""
+Page URL: {url}
+
+Current title: {page_info["title"]}
+Meta description: {page_info["meta_description"]}
+H1: {page_info["h1"]}
+
+CHANGED:
+{changes}
 
+Previous score: {previous.get("high_level_score")}
+Previous issues: {previous.get("issues", [])}
+Previous recommendations: {previous.get("recommendations", [])}
+
+Target keywords: {", ".join(target_keywords or [])}
+"""
+
+    json_template: Dict[str, Any] = {
+        "high_level_score": 0,
+        "issues": [],
+        "recommendations": [],
+    }
+    for field in changed:
+        if field in FIELD_SUGGESTIONS:
+            json_template[FIELD_SUGGESTIONS[field]] = ""
+
+    return system_msg, user_msg, json_template
+
+
+def _changed_fields(before: Dict[str, str], after: Dict[str, str]) -> Dict[str, Dict[str, str]]:
     return {
-        "page_info": {
-            "title": title,
-            "meta_description": meta_desc,
-            "h1": h1,
-        },
+        field: {"before": before.get(field, ""), "after": after.get(field, "")}
+        for field in PAGE_FIELDS
+        if before.get(field, "") != after.get(field, "")
+    }
+
+
+def _plan_analysis(snapshot: Optional[Dict[str, Any]],
+                   page_info: Dict[str, str],
+                   target_keywords: Optional[List[str]],
+                   bypass_cache: bool) -> Tuple[str, Dict[str, Dict[str, str]]]:
+    """
+    "reuse" the last AI analysis, redo only the "delta", or run a "full"
+    analysis; the second value lists the changed fields.
+    """
+    if (snapshot is None or bypass_cache
+            or sorted(snapshot["target_keywords"]) != sorted(target_keywords or [])
+            or "error" in snapshot["ai_analysis"]
+            or snapshot["ai_analysis"].get("source") == "rules"):
+        return "full", {}
+    changed = _changed_fields(snapshot["page_info"], page_info)
+    return ("delta" if changed else "reuse"), changed
+
+
+def _merge_delta(previous: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    if "error" in update:
+        return update
+    merged = dict(previous)
+    merged.update(update)
+    return merged
+
+
+def _list_changes(before: List[Any], after: List[Any]) -> Dict[str, List[Any]]:
+    return {
+        "added": [item for item in after if item not in before],
+        "removed": [item for item in before if item not in after],
+    }
+
+
+def _audit_diff(snapshot: Optional[Dict[str, Any]],
+                mode: str,
+                changed: Dict[str, Dict[str, str]],
+                digest: Optional[str],
+                ai_analysis: Dict[str, Any],
+                crawl: Optional[Dict[str, Any]],
+                previous_pages: Optional[Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    if snapshot is None:
+        return {"previous_audited_at": None, "mode": mode}
+
+    before = snapshot["ai_analysis"]
+    analysis_changes: Dict[str, Any] = {}
+    if before.get("high_level_score") != ai_analysis.get("high_level_score"):
+        analysis_changes["high_level_score"] = {
+            "before": before.get("high_level_score"),
+            "after": ai_analysis.get("high_level_score"),
+        }
+    for key in ("issues", "recommendations"):
+        lists = _list_changes(before.get(key) or [], ai_analysis.get(key) or [])
+        if lists["added"] or lists["removed"]:
+            analysis_changes[key] = lists
+    for key in FIELD_SUGGESTIONS.values():
+        if before.get(key) != ai_analysis.get(key):
+            analysis_changes[key] = {"before": before.get(key), "after": ai_analysis.get(key)}
+
+    diff = {
+        "previous_audited_at": snapshot["audited_at"],
+        "mode": mode,
+        "content_changed": digest != snapshot["content_hash"],
+        "changed_fields": changed,
+        "analysis_changes": analysis_changes,
+    }
+    if crawl is not None and previous_pages is not None:
+        current = {p["url"]: p.get("content_hash") for p in crawl["pages"] if p.get("has_html")}
+        diff["pages"] = {
+            "added": sorted(set(current) - set(previous_pages)),
+            "removed": sorted(set(previous_pages) - set(current)),
+            "changed": sorted(url for url, h in current.items()
+                              if url in previous_pages and previous_pages[url]["content_hash"] != h),
+        }
+    return diff
+
+
+def _load_previous(store: Optional[AuditStore], url: str,
+                   depth: int) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """(last audit snapshot, stored crawl pages) of `url`, both None without a store."""
+    if store is None:
+        return None, None
+    return store.get(url), store.crawl_pages(url) if depth > 1 else None
+
+
+def _record_audit(store: AuditStore,
+                  url: str,
+                  target_keywords: Optional[List[str]],
+                  digest: Optional[str],
+                  page_info: Dict[str, str],
+                  ai_analysis: Dict[str, Any],
+                  crawl: Optional[Dict[str, Any]]) -> None:
+    if crawl is not None and "snapshots" in crawl:
+        store.put_crawl_pages(url, crawl.pop("snapshots"))
+    # no digest means the page was not fetched; keep the last good snapshot
+    if "error" not in ai_analysis and digest:
+        store.put(url, target_keywords or [], digest, page_info, ai_analysis)
+
+
+def _stale_report(url: str,
+                  snapshot: Dict[str, Any],
+                  target_keywords: Optional[List[str]],
+                  crawl: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    The page could not be fetched: return the last audit flagged stale
+    instead of analysing an empty page. Nothing is sent to Gemini and
+    nothing is written to the store.
+    """
+    if crawl is not None:
+        crawl.pop("snapshots", None)
+    page_info = dict(snapshot["page_info"])
+    report = _assemble_report(url, page_info, snapshot["ai_analysis"], False, crawl)
+    report["rules"] = _apply_rules(page_info, True, target_keywords)
+    report["stale"] = True
+    report["fetch_error"] = f"Could not fetch {url}; showing the last stored audit"
+    report["audit_diff"] = {"previous_audited_at": snapshot["audited_at"], "mode": "stale"}
+    return report
+
+
+def _crawl_blocking(url: str, **kwargs: Any) -> Dict[str, Any]:
+    """crawl_site from sync code; in a thread when this one already runs a loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(crawl_site(url, **kwargs))
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, crawl_site(url, **kwargs)).result()
+
+
+def _apply_rules(page_info: Dict[str, str],
+                 has_html: bool,
+                 target_keywords: Optional[List[str]]) -> Dict[str, Any]:
+    """Rule-based score for the audited page (crawled pages are scored by the crawler)."""
+    return evaluate_page({**page_info, "has_html": has_html}, target_keywords)
+
+
+def _start_page(crawl: Dict[str, Any]) -> Tuple[Dict[str, str], bool, Optional[str]]:
+    start = crawl["pages"][0] if crawl["pages"] else {}
+    page_info = {
+        "title": start.get("title", ""),
+        "meta_description": start.get("meta_description", ""),
+        "h1": start.get("h1", ""),
+    }
+    return page_info, bool(start.get("has_html")), start.get("content_hash")
+
+
+def _assemble_report(url: str,
+                     page_info: Dict[str, str],
+                     ai_analysis: Dict[str, Any],
+                     has_html: bool,
+                     crawl: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    report = {
+        "page_info": page_info,
         "ai_analysis": ai_analysis,
-        "basic_info": basic_info,
+        "basic_info": {
+            "url": url,
+            "has_html": has_html,
+        },
     }
+    if crawl is not None:
+        report["crawl"] = crawl
+    return report
+
+
+def run_seo_analyzer(url: str,
+                     target_keywords: Optional[List[str]] = None,
+                     bypass_cache: bool = False,
+                     depth: int = 1,
+                     max_pages: int = CRAWL_MAX_PAGES,
+                     incremental: bool = True,
+                     llm: str = "auto") -> Dict[str, Any]:
+    """
+    Audit `url`, diffing it against the last stored snapshot. With
+    depth > 1 the site is crawled first and the report gains per-page and
+    site-level findings under "crawl".
+
+    With `incremental`, the last audit of the URL is reused: unchanged
+    content skips parsing and the AI call, changed on-page fields are
+    re-analysed on their own, and the report gains an "audit_diff". If
+    the page cannot be fetched, the last audit is returned flagged
+    "stale" and the snapshot is left as it was.
+
+    Rule checks (utils/seo_rules) always run and are reported under
+    "rules". `llm` decides when Gemini is called: "always", "never" (the
+    rules result becomes ai_analysis) or "auto", only when a failed rule
+    calls for rewritten copy.
+    """
+    store = get_audit_store() if incremental else None
+    snapshot, previous_pages = _load_previous(store, url, depth)
+
+    crawl = None
+    if depth > 1:
+        crawl = _crawl_blocking(url, depth=depth, max_pages=max_pages, previous=previous_pages,
+                                target_keywords=target_keywords)
+        page_info, has_html, digest = _start_page(crawl)
+    else:
+        html, digest = _fetch_html(url)
+        page_info = _page_info(html, digest, snapshot)
+        has_html = bool(html)
+    if not has_html and snapshot is not None:
+        return _stale_report(url, snapshot, target_keywords, crawl)
+
+    rules = _apply_rules(page_info, has_html, target_keywords)
+    if wants_llm(rules, llm):
+        mode, changed = _plan_analysis(snapshot, page_info, target_keywords, bypass_cache)
+    else:
+        mode, changed = "rules", {}
+
+    if mode == "rules":
+        ai_analysis = rules_analysis(rules)
+    elif mode == "reuse":
+        ai_analysis = snapshot["ai_analysis"]
+    elif mode == "delta":
+        system_msg, user_msg, json_template = _build_delta_prompts(
+            url, page_info, target_keywords, snapshot["ai_analysis"], changed)
+        ai_analysis = _merge_delta(snapshot["ai_analysis"], generate_json(
+            system_msg, user_msg, json_template, endpoint="seo", bypass_cache=bypass_cache))
+    else:
+        system_msg, user_msg, json_template = _build_prompts(url, page_info, target_keywords)
+        ai_analysis = generate_json(
+            system_msg,
+            user_msg,
+            json_template,
+            endpoint="seo",
+            bypass_cache=bypass_cache,
+        )
+
+    report = _assemble_report(url, page_info, ai_analysis, has_html, crawl)
+    report["rules"] = rules
+    if store is not None:
+        report["audit_diff"] = _audit_diff(snapshot, mode, changed, digest, ai_analysis,
+                                           crawl, previous_pages)
+        _record_audit(store, url, target_keywords, digest, page_info, ai_analysis, crawl)
+    return report
+
+
+async def run_seo_analyzer_async(url: str,
+                                 target_keywords: Optional[List[str]] = None,
+                                 bypass_cache: bool = False,
+                                 depth: int = 1,
+                                 max_pages: int = CRAWL_MAX_PAGES,
+                                 incremental: bool = True,
+                                 llm: str = "auto") -> Dict[str, Any]:
+    # the audit store is SQLite: open, read and write it on worker threads
+    store = await asyncio.to_thread(get_audit_store) if incremental else None
+    snapshot, previous_pages = await asyncio.to_thread(_load_previous, store, url, depth)
+
+    crawl = None
+    if depth > 1:
+        crawl = await crawl_site(url, depth=depth, max_pages=max_pages, previous=previous_pages,
+                                 target_keywords=target_keywords)
+        page_info, has_html, digest = _start_page(crawl)
+    else:
+        html, digest = await _fetch_html_async(url)
+        page_info = _page_info(html, digest, snapshot)
+        has_html = bool(html)
+    if not has_html and snapshot is not None:
+        return _stale_report(url, snapshot, target_keywords, crawl)
+
+    rules = _apply_rules(page_info, has_html, target_keywords)
+    if wants_llm(rules, llm):
+        mode, changed = _plan_analysis(snapshot, page_info, target_keywords, bypass_cache)
+    else:
+        mode, changed = "rules", {}
+
+    if mode == "rules":
+        ai_analysis = rules_analysis(rules)
+    elif mode == "reuse":
+        ai_analysis = snapshot["ai_analysis"]
+    elif mode == "delta":
+        system_msg, user_msg, json_template = _build_delta_prompts(
+            url, page_info, target_keywords, snapshot["ai_analysis"], changed)
+        ai_analysis = _merge_delta(snapshot["ai_analysis"], await generate_json_async(
+            system_msg, user_msg, json_template, endpoint="seo", bypass_cache=bypass_cache))
+    else:
+        system_msg, user_msg, json_template = _build_prompts(url, page_info, target_keywords)
+        ai_analysis = await generate_json_async(
+            system_msg,
+            user_msg,
+            json_template,
+            endpoint="seo",
+            bypass_cache=bypass_cache,
+        )
+
+    report = _assemble_report(url, page_info, ai_analysis, has_html, crawl)
+    report["rules"] = rules
+    if store is not None:
+        report["audit_diff"] = _audit_diff(snapshot, mode, changed, digest, ai_analysis,
+                                           crawl, previous_pages)
+        await asyncio.to_thread(_record_audit, store, url, target_keywords, digest,
+                                page_info, ai_analysis, crawl)
+    return report
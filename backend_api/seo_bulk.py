@@ -0,0 +1,297 @@
+# backend_api/seo_bulk.py
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from .seo_analyzer import _extract_page_info
+from .utils.audit_store import content_hash, get_audit_store
+from .utils.crawler import CRAWL_CONCURRENCY, CRAWL_READ_TIMEOUT, HostPoliteness
+from .utils.gemini_client import generate_json_async, track_usage
+from .utils.http_client import fetch_async
+from .utils.seo_rules import evaluate_pages, rules_analysis, wants_llm
+from .utils.sitemap import load_sitemap
+
+SEO_BULK_MAX_URLS = int(os.getenv("SEO_BULK_MAX_URLS", "1000"))
+SEO_BULK_BATCH_SIZE = int(os.getenv("SEO_BULK_BATCH_SIZE", "20"))
+SEO_BULK_MAX_BATCH_SIZE = 50
+# Output budget per batched prompt: a base plus room for one full entry
+# (issues, recommendations, suggestions) per page, so a batch is not cut
+# off at the default 2048 tokens
+SEO_BULK_BASE_TOKENS = 512
+SEO_BULK_TOKENS_PER_PAGE = int(os.getenv("SEO_BULK_TOKENS_PER_PAGE", "400"))
+SEO_BULK_LLM_CONCURRENCY = int(os.getenv("SEO_BULK_LLM_CONCURRENCY", "4"))
+# Long titles/descriptions are cut before they go into a batched prompt
+FIELD_MAX_CHARS = 300
+
+SYSTEM_MSG = """
+You are an SEO expert auditing many pages at once. You will receive a JSON
+array of pages, each with its URL, title, meta description and H1, plus
+optional target keywords that apply to every page.
+
+Return ONLY JSON with a "pages" array holding one entry per input page,
+with its exact "url" and:
+- high_level_score (0-100)
+- issues (list of strings)
+- recommendations (list of strings)
+- suggested_title
+- suggested_meta_description
+"""
+
+JSON_TEMPLATE = {
+    "pages": [
+        {
+            "url": "",
+            "high_level_score": 0,
+            "issues": [],
+            "recommendations": [],
+            "suggested_title": "",
+            "suggested_meta_description": "",
+        }
+    ]
+}
+
+
+def _url_key(url: str) -> str:
+    return url.strip().rstrip("/")
+
+
+def _batch_max_tokens(pages: int) -> int:
+    return SEO_BULK_BASE_TOKENS + SEO_BULK_TOKENS_PER_PAGE * pages
+
+
+def _build_batch_prompt(pages: List[Dict[str, Any]], target_keywords: Optional[List[str]]) -> str:
+    listing = [
+        {"url": page["url"], **{k: v[:FIELD_MAX_CHARS] for k, v in page["page_info"].items()}}
+        for page in pages
+    ]
+    return (
+        f"Target keywords: {', '.join(target_keywords or [])}\n\n"
+        f"Pages:\n{json.dumps(listing, ensure_ascii=False)}\n"
+    )
+
+
+async def _analyse_batch(pages: List[Dict[str, Any]],
+                         target_keywords: Optional[List[str]],
+                         bypass_cache: bool) -> Dict[str, Dict[str, Any]]:
+    """url -> analysis for the pages the reply covered (may be partial)."""
+    result = await generate_json_async(
+        SYSTEM_MSG,
+        _build_batch_prompt(pages, target_keywords),
+        JSON_TEMPLATE,
+        max_tokens=_batch_max_tokens(len(pages)),
+        endpoint="seo_bulk",
+        bypass_cache=bypass_cache,
+    )
+    if "error" in result:
+        raise RuntimeError(result["error"])
+
+    wanted = {_url_key(page["url"]): page["url"] for page in pages}
+    analyses: Dict[str, Dict[str, Any]] = {}
+    for entry in result.get("pages") or []:
+        if not isinstance(entry, dict):
+            continue
+        url = wanted.get(_url_key(str(entry.get("url", ""))))
+        if url is not None:
+            analyses[url] = {k: v for k, v in entry.items() if k != "url"}
+    return analyses
+
+
+async def _fetch_page(url: str, politeness: HostPoliteness,
+                      semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    page: Dict[str, Any] = {"url": url, "status": None, "has_html": False}
+    try:
+        host = urlsplit(url).netloc
+    except ValueError as exc:
+        page["error"] = f"Invalid URL: {exc}"
+        return page
+    async with semaphore:
+        await politeness.acquire(host)
+        try:
+            res = await fetch_async(url, conditional=True, timeout=CRAWL_READ_TIMEOUT)
+        except (httpx.HTTPError, httpx.InvalidURL, ValueError) as exc:
+            # a malformed URL only fails its own page, not the stream
+            page["error"] = str(exc) or type(exc).__name__
+            return page
+        finally:
+            politeness.release(host)
+
+    page["status"] = res.status_code
+    if res.ok and "html" in res.headers.get("content-type", "html"):
+        page["content_hash"] = content_hash(res.content)
+        page["page_info"] = await asyncio.to_thread(_extract_page_info, res.text)
+        page["has_html"] = True
+    return page
+
+
+async def resolve_urls(urls: List[str], sitemap_url: Optional[str],
+                       limit: int) -> Tuple[List[str], List[Dict[str, str]]]:
+    """
+    Explicit URLs first, then the sitemap's, deduplicated and capped at
+    `limit`; plus the sitemaps that failed to load.
+    """
+    found = list(urls)
+    failed: List[Dict[str, str]] = []
+    if sitemap_url and len(found) < limit:
+        pages, failed = await load_sitemap(sitemap_url, limit - len(found))
+        found.extend(pages)
+    return list(dict.fromkeys(u.strip() for u in found if u.strip()))[:limit], failed
+
+
+async def stream_seo_bulk_audit(urls: List[str],
+                                sitemap_url: Optional[str] = None,
+                                target_keywords: Optional[List[str]] = None,
+                                max_urls: int = SEO_BULK_MAX_URLS,
+                                batch_size: int = SEO_BULK_BATCH_SIZE,
+                                incremental: bool = True,
+                                llm: str = "auto",
+                                bypass_cache: bool = False) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Audit many pages: fetch them concurrently, extract title/meta/H1
+    locally and score them `batch_size` pages per Gemini prompt, so the
+    system prompt and template are paid once per batch instead of once per
+    page. Yields a "start" event, a "page" event per URL as soon as its
+    batch returns, and a final "summary". Pages a reply left out are
+    retried once in a follow-up batch. With `incremental`, pages whose
+    content and keywords match their last audit reuse it without a call.
+
+    Fetched pages are rule-checked in vectorised groups first; with
+    llm="auto" only pages whose failed rules call for rewritten copy go
+    to Gemini, the rest are answered from the rules ("never" skips Gemini
+    entirely, "always" sends every page).
+    """
+    started = time.perf_counter()
+    targets, sitemap_errors = await resolve_urls(urls, sitemap_url, min(max_urls, SEO_BULK_MAX_URLS))
+    batch_size = min(max(1, batch_size), SEO_BULK_MAX_BATCH_SIZE)
+    yield {"event": "start", "urls": len(targets), "batch_size": batch_size,
+           "sitemap_errors": sitemap_errors}
+
+    store = get_audit_store() if incremental else None
+    events: asyncio.Queue = asyncio.Queue()
+    counts = {"analysed": 0, "rules_only": 0, "reused": 0, "failed": 0, "fetch_failed": 0,
+              "batches": 0}
+    usage_box: Dict[str, Any] = {}
+
+    def _emit(page: Dict[str, Any], status: str, ai_analysis: Optional[Dict[str, Any]],
+              source: Optional[str] = None, error: Optional[str] = None) -> None:
+        event = {
+            "event": "page",
+            "url": page["url"],
+            "status": status,
+            "http_status": page["status"],
+            "page_info": page.get("page_info"),
+            "rules": page.get("rules"),
+            "ai_analysis": ai_analysis,
+            "source": source,
+        }
+        if error:
+            event["error"] = error
+        events.put_nowait(event)
+
+    async def _produce() -> None:
+        llm_sem = asyncio.Semaphore(max(1, SEO_BULK_LLM_CONCURRENCY))
+        fetch_sem = asyncio.Semaphore(CRAWL_CONCURRENCY)
+        politeness = HostPoliteness()
+        batches: List[asyncio.Task] = []
+
+        async def _score(pages: List[Dict[str, Any]], retry: bool = True) -> None:
+            async with llm_sem:
+                counts["batches"] += 1
+                try:
+                    analyses = await _analyse_batch(pages, target_keywords, bypass_cache)
+                    error = "Page missing from the batched reply"
+                except Exception as exc:
+                    analyses, error = {}, str(exc)
+            missing, audits = [], []
+            for page in pages:
+                analysis = analyses.get(page["url"])
+                if analysis is None:
+                    missing.append(page)
+                    continue
+                counts["analysed"] += 1
+                _emit(page, "ok", analysis, "batch")
+                audits.append((page["url"], page["content_hash"], page["page_info"], analysis))
+            if store is not None and audits:
+                # one SQLite write per batch, off the event loop
+                await asyncio.to_thread(store.put_many, target_keywords or [], audits)
+            if missing and retry and len(missing) < len(pages):
+                await _score(missing, retry=False)
+                return
+            for page in missing:
+                counts["failed"] += 1
+                _emit(page, "error", None, error=error)
+
+        with track_usage() as usage:
+            usage_box.update(usage=usage)
+            try:
+                pending: List[Dict[str, Any]] = []
+                to_score: List[Dict[str, Any]] = []
+
+                def _check_rules(pages: List[Dict[str, Any]]) -> None:
+                    nonlocal to_score
+                    records = [{**page["page_info"], "has_html": True} for page in pages]
+                    for page, result in zip(pages, evaluate_pages(records, target_keywords)):
+                        page["rules"] = result
+                        if wants_llm(result, llm):
+                            to_score.append(page)
+                        else:
+                            counts["rules_only"] += 1
+                            _emit(page, "ok", rules_analysis(result), "rules")
+                    while len(to_score) >= batch_size:
+                        batches.append(asyncio.create_task(_score(to_score[:batch_size])))
+                        to_score = to_score[batch_size:]
+
+                fetches = [_fetch_page(url, politeness, fetch_sem) for url in targets]
+                for next_page in asyncio.as_completed(fetches):
+                    page = await next_page
+                    if not page["has_html"]:
+                        counts["fetch_failed"] += 1
+                        _emit(page, "fetch_failed", None, error=page.get("error"))
+                        continue
+                    snapshot = (await asyncio.to_thread(store.get, page["url"])
+                                if store is not None and not bypass_cache else None)
+                    if (snapshot is not None
+                            and snapshot["content_hash"] == page["content_hash"]
+                            and sorted(snapshot["target_keywords"]) == sorted(target_keywords or [])
+                            and "error" not in snapshot["ai_analysis"]
+                            and snapshot["ai_analysis"].get("source") != "rules"
+                            and llm != "never"):
+                        counts["reused"] += 1
+                        _emit(page, "ok", snapshot["ai_analysis"], "stored")
+                        continue
+                    pending.append(page)
+                    if len(pending) >= batch_size:
+                        _check_rules(pending)
+                        pending = []
+                _check_rules(pending)
+                if to_score:
+                    batches.append(asyncio.create_task(_score(to_score)))
+                await asyncio.gather(*batches)
+            finally:
+                events.put_nowait(None)
+
+    producer = asyncio.create_task(_produce())
+    try:
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield event
+        await producer
+    finally:
+        producer.cancel()
+
+    elapsed = time.perf_counter() - started
+    yield {
+        "event": "summary",
+        "urls": len(targets),
+        **counts,
+        "elapsed_seconds": round(elapsed, 3),
+        "pages_per_second": round(len(targets) / elapsed, 2) if elapsed else 0.0,
+        "usage": usage_box.get("usage", {}),
+    }
@@ -0,0 +1,131 @@
+# backend_api/utils/audit_store.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+AUDIT_DB_PATH = os.getenv("AUDIT_DB_PATH", ".cache/seo_audits.sqlite3")
+
+
+def content_hash(body: Optional[bytes]) -> Optional[str]:
+    if body is None:
+        return None
+    return hashlib.sha256(body).hexdigest()
+
+
+class AuditStore:
+    """
+    Last audit per URL (content hash, extracted fields, AI analysis) plus
+    the per-page snapshots of a crawl, so re-audits can skip unchanged
+    work and report what changed.
+    """
+
+    def __init__(self, path: str = AUDIT_DB_PATH):
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS audits (
+                url TEXT PRIMARY KEY,
+                target_keywords TEXT NOT NULL,
+                content_hash TEXT,
+                page_info TEXT NOT NULL,
+                ai_analysis TEXT NOT NULL,
+                audited_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS crawl_pages (
+                start_url TEXT NOT NULL,
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                info TEXT NOT NULL,
+                links TEXT NOT NULL,
+                PRIMARY KEY (start_url, url)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT target_keywords, content_hash, page_info, ai_analysis, audited_at "
+                "FROM audits WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        keywords, digest, page_info, ai_analysis, audited_at = row
+        return {
+            "url": url,
+            "target_keywords": json.loads(keywords),
+            "content_hash": digest,
+            "page_info": json.loads(page_info),
+            "ai_analysis": json.loads(ai_analysis),
+            "audited_at": audited_at,
+        }
+
+    def put(self, url: str, target_keywords: list, digest: Optional[str],
+            page_info: Dict[str, Any], ai_analysis: Dict[str, Any]) -> None:
+        self.put_many(target_keywords, [(url, digest, page_info, ai_analysis)])
+
+    def put_many(self, target_keywords: list,
+                 audits: List[Tuple[str, Optional[str], Dict[str, Any], Dict[str, Any]]]) -> None:
+        """(url, digest, page_info, ai_analysis) rows audited with the same keywords, one commit."""
+        keywords, now = json.dumps(target_keywords), time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO audits "
+                "(url, target_keywords, content_hash, page_info, ai_analysis, audited_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(url, keywords, digest, json.dumps(page_info), json.dumps(ai_analysis), now)
+                 for url, digest, page_info, ai_analysis in audits],
+            )
+            self._conn.commit()
+
+    def crawl_pages(self, start_url: str) -> Dict[str, Dict[str, Any]]:
+        """url -> {"content_hash", "info", "links"} from the last crawl of start_url."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, content_hash, info, links FROM crawl_pages WHERE start_url = ?",
+                (start_url,),
+            ).fetchall()
+        return {
+            url: {"content_hash": digest, "info": json.loads(info), "links": json.loads(links)}
+            for url, digest, info, links in rows
+        }
+
+    def put_crawl_pages(self, start_url: str, pages: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the stored crawl of start_url."""
+        with self._lock:
+            self._conn.execute("DELETE FROM crawl_pages WHERE start_url = ?", (start_url,))
+            self._conn.executemany(
+                "INSERT INTO crawl_pages (start_url, url, content_hash, info, links) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(start_url, url, page["content_hash"], json.dumps(page["info"]),
+                  json.dumps(page["links"])) for url, page in pages.items()],
+            )
+            self._conn.commit()
+
+
+_store: Optional[AuditStore] = None
+_store_lock = threading.Lock()
+
+
+def get_audit_store() -> AuditStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AuditStore()
+        return _store
@@ -0,0 +1,327 @@
+# backend_api/utils/crawler.py
+
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+from .audit_store import content_hash
+from .html_extract import extract_seo_signals
+from .http_client import HTTP_USER_AGENT, fetch_async
+from .seo_rules import evaluate_pages
+
+CRAWL_USER_AGENT = HTTP_USER_AGENT
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "16"))
+CRAWL_PER_HOST_CONCURRENCY = int(os.getenv("CRAWL_PER_HOST_CONCURRENCY", "8"))
+CRAWL_HOST_DELAY = float(os.getenv("CRAWL_HOST_DELAY", "0"))
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "100"))
+CRAWL_MAX_DEPTH = 5
+CRAWL_READ_TIMEOUT = 10.0
+
+SKIP_EXTENSIONS = (
+    ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico", ".pdf", ".zip",
+    ".mp4", ".mp3", ".css", ".js", ".xml", ".json", ".woff", ".woff2",
+)
+
+
+# ----------------------------------------------------
+# URL CANONICALIZATION
+# ----------------------------------------------------
+def canonicalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """
+    Resolve against `base`, drop fragments and default ports, lowercase the
+    scheme/host and sort query parameters so equivalent URLs dedupe.
+    Returns None for non-http(s) or malformed links.
+    """
+    try:
+        if base:
+            url = urljoin(base, url)
+        url, _ = urldefrag(url.strip())
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        # unclosed IPv6 brackets, out-of-range ports
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+        return None
+
+    host = (parts.hostname or "").lower()
+    if not host:
+        return None
+    netloc = host
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        netloc = f"{host}:{port}"
+
+    path = parts.path or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _is_crawlable(url: str) -> bool:
+    return not urlsplit(url).path.lower().endswith(SKIP_EXTENSIONS)
+
+
+# ----------------------------------------------------
+# PAGE PARSING + FINDINGS
+# ----------------------------------------------------
+def parse_page(html: str, base_url: str) -> Tuple[Dict[str, Any], List[str]]:
+    signals = extract_seo_signals(
+        html,
+        base_url,
+        fields=("title", "meta", "canonical", "hreflang", "headings", "links",
+                "images", "word_count", "structured_data"),
+    )
+
+    info = {
+        "title": signals["title"],
+        "meta_description": signals["meta_description"],
+        "robots": signals["robots"],
+        "h1": signals["h1"],
+        "h1_count": signals["h1_count"],
+        "canonical": signals["canonical"],
+        "hreflang": signals["hreflang"],
+        "word_count": signals["word_count"],
+        "images": len(signals["images"]),
+        "images_missing_alt": signals["images_missing_alt"],
+        "structured_data_types": sorted({
+            item.get("@type", "") for item in signals["structured_data"]
+            if isinstance(item, dict) and isinstance(item.get("@type"), str)
+        }),
+    }
+
+    links = []
+    for link in signals["links"]:
+        url = canonicalize_url(link["href"])
+        if url:
+            links.append(url)
+    return info, links
+
+
+def _fetch_issues(page: Dict[str, Any]) -> List[str]:
+    status = page.get("status")
+    if status is None:
+        return ["Page could not be fetched"]
+    if status >= 400:
+        return [f"HTTP {status}"]
+    return []
+
+
+def score_pages(pages: List[Dict[str, Any]], target_keywords: Optional[List[str]] = None) -> None:
+    """
+    Issues and a score for every HTML page from the seo_rules engine, in
+    one vectorised pass; other pages only report fetch problems.
+    """
+    html_pages = [p for p in pages if p.get("has_html")]
+    for page, result in zip(html_pages, evaluate_pages(html_pages, target_keywords)):
+        page["issues"] = result["issues"]
+        page["score"] = result["score"]
+    for page in pages:
+        if not page.get("has_html"):
+            page["issues"] = _fetch_issues(page)
+
+
+def site_findings(pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ok_pages = [p for p in pages if p.get("status") and p["status"] < 400]
+
+    def _duplicates(field: str) -> Dict[str, List[str]]:
+        counts = Counter(p[field] for p in ok_pages if p.get(field))
+        return {
+            value: [p["url"] for p in ok_pages if p.get(field) == value]
+            for value, n in counts.items() if n > 1
+        }
+
+    issue_counts = Counter(issue for p in pages for issue in p.get("issues", []))
+    findings = {
+        "pages_crawled": len(pages),
+        "broken_pages": [p["url"] for p in pages if not p.get("status") or p["status"] >= 400],
+        "duplicate_titles": _duplicates("title"),
+        "duplicate_meta_descriptions": _duplicates("meta_description"),
+        "issue_counts": dict(issue_counts.most_common()),
+    }
+    scores = [p["score"] for p in pages if "score" in p]
+    if scores:
+        findings["average_score"] = round(sum(scores) / len(scores), 1)
+    return findings
+
+
+# ----------------------------------------------------
+# POLITENESS: robots.txt + per-host limits
+# ----------------------------------------------------
+class HostPoliteness:
+    def __init__(self, per_host: int = CRAWL_PER_HOST_CONCURRENCY, delay: float = CRAWL_HOST_DELAY):
+        self.per_host = per_host
+        self.delay = delay
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_slot: Dict[str, float] = {}
+        self._delays: Dict[str, float] = {}
+
+    def set_delay(self, host: str, delay: float) -> None:
+        self._delays[host] = max(self.delay, delay)
+
+    async def acquire(self, host: str) -> None:
+        sem = self._semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        await sem.acquire()
+        delay = self._delays.get(host, self.delay)
+        if delay > 0:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + delay
+            if slot > now:
+                await asyncio.sleep(slot - now)
+
+    def release(self, host: str) -> None:
+        self._semaphores[host].release()
+
+
+async def _load_robots(origin: str) -> Optional[RobotFileParser]:
+    try:
+        res = await fetch_async(f"{origin}/robots.txt", timeout=CRAWL_READ_TIMEOUT)
+    except (httpx.HTTPError, httpx.InvalidURL, ValueError):
+        return None
+    if res.status_code >= 400:
+        return None
+    parser = RobotFileParser()
+    parser.parse(res.text.splitlines())
+    return parser
+
+
+# ----------------------------------------------------
+# BREADTH-FIRST CRAWL
+# ----------------------------------------------------
+async def crawl_site(start_url: str,
+                     depth: int = 1,
+                     max_pages: int = CRAWL_MAX_PAGES,
+                     concurrency: int = CRAWL_CONCURRENCY,
+                     respect_robots: bool = True,
+                     previous: Optional[Dict[str, Dict[str, Any]]] = None,
+                     target_keywords: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Crawl same-origin links breadth-first. `depth` counts levels including
+    the start page (depth=1 fetches only start_url). Each level is fetched
+    concurrently through the shared pooled client (with conditional
+    re-fetches), bounded globally by `concurrency` and per host by
+    HostPoliteness.
+
+    With `previous` (url -> {"content_hash", "info", "links"} from an
+    earlier crawl, see AuditStore) pages whose body hash is unchanged are
+    not parsed again, and the result carries "snapshots" in the same shape
+    for storing.
+
+    Pages are scored against the seo_rules engine (with `target_keywords`)
+    once the crawl is done; see score_pages.
+
+    `max_pages` is capped at CRAWL_MAX_PAGES. A start URL that robots.txt
+    disallows is not fetched: the result has no pages and
+    stats.start_blocked is set.
+    """
+    depth = max(1, min(depth, CRAWL_MAX_DEPTH))
+    max_pages = max(1, min(max_pages, CRAWL_MAX_PAGES))
+    start = canonicalize_url(start_url)
+    if start is None:
+        return {"start_url": start_url, "pages": [], "site_findings": site_findings([]),
+                "stats": {"elapsed_seconds": 0.0, "robots_blocked": 0}}
+
+    origin = _origin(start)
+    politeness = HostPoliteness()
+    global_sem = asyncio.Semaphore(concurrency)
+    seen: Set[str] = {start}
+    pages: List[Dict[str, Any]] = []
+    snapshots: Dict[str, Dict[str, Any]] = {}
+    robots_blocked = 0
+    started = time.perf_counter()
+
+    robots = await _load_robots(origin) if respect_robots else None
+    host = urlsplit(origin).netloc
+    if robots is not None:
+        crawl_delay = robots.crawl_delay(CRAWL_USER_AGENT)
+        if crawl_delay:
+            politeness.set_delay(host, float(crawl_delay))
+        if not robots.can_fetch(CRAWL_USER_AGENT, start):
+            result = {
+                "start_url": start,
+                "pages": [],
+                "site_findings": site_findings([]),
+                "stats": {"elapsed_seconds": round(time.perf_counter() - started, 3),
+                          "robots_blocked": 1, "start_blocked": True},
+            }
+            if previous is not None:
+                result["stats"]["pages_unchanged"] = 0
+                result["snapshots"] = {}
+            return result
+
+    async def _fetch(url: str, level: int) -> Tuple[Dict[str, Any], List[str]]:
+        page: Dict[str, Any] = {"url": url, "depth": level, "status": None, "has_html": False}
+        async with global_sem:
+            await politeness.acquire(host)
+            try:
+                res = await fetch_async(url, conditional=True, timeout=CRAWL_READ_TIMEOUT)
+            except (httpx.HTTPError, httpx.InvalidURL, ValueError):
+                # one bad link must not abort the whole level's gather
+                return page, []
+            finally:
+                politeness.release(host)
+
+        page["status"] = res.status_code
+        page["final_url"] = res.url
+        page["not_modified"] = res.not_modified
+        links: List[str] = []
+        content_type = res.headers.get("content-type", "")
+        if res.ok and "html" in content_type:
+            digest = content_hash(res.content)
+            before = previous.get(url) if previous is not None else None
+            if before is not None and before["content_hash"] == digest:
+                info, links = before["info"], before["links"]
+                page["unchanged"] = True
+            else:
+                info, links = await asyncio.to_thread(parse_page, res.text, res.url)
+            page.update(info, has_html=True, content_hash=digest)
+            if previous is not None:
+                snapshots[url] = {"content_hash": digest, "info": info, "links": links}
+        return page, links
+
+    frontier = [start]
+    for level in range(depth):
+        if not frontier:
+            break
+        results = await asyncio.gather(*(_fetch(url, level) for url in frontier))
+
+        next_frontier: List[str] = []
+        for page, links in results:
+            pages.append(page)
+            for link in links:
+                if link in seen or _origin(link) != origin or not _is_crawlable(link):
+                    continue
+                seen.add(link)
+                if robots is not None and not robots.can_fetch(CRAWL_USER_AGENT, link):
+                    robots_blocked += 1
+                    continue
+                next_frontier.append(link)
+
+        budget = max_pages - len(pages)
+        frontier = next_frontier[:max(budget, 0)] if level + 1 < depth else []
+
+    score_pages(pages, target_keywords)
+    result = {
+        "start_url": start,
+        "pages": pages,
+        "site_findings": site_findings(pages),
+        "stats": {
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+            "robots_blocked": robots_blocked,
+        },
+    }
+    if previous is not None:
+        result["stats"]["pages_unchanged"] = sum(1 for p in pages if p.get("unchanged"))
+        result["snapshots"] = snapshots
+    return result
@@ -0,0 +1,244 @@
+# backend_api/utils/forecast.py
+
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# JSON file of platform -> prior overrides merged over DEFAULT_PRIORS
+FORECAST_PRIORS_PATH = os.getenv("FORECAST_PRIORS_PATH", "")
+FORECAST_SIMULATIONS = int(os.getenv("FORECAST_SIMULATIONS", "10000"))
+# Cap on simulations x scenarios x platforms drawn by one grid request
+FORECAST_MAX_DRAWS = int(os.getenv("FORECAST_MAX_DRAWS", "5000000"))
+# Most budgets x mixes x durations one grid request may sweep
+FORECAST_MAX_SCENARIOS = int(os.getenv("FORECAST_MAX_SCENARIOS", "200"))
+MIN_SIMULATIONS = 100
+PERCENTILES = (10, 50, 90)
+WEEKS_PER_MONTH = 52 / 12
+
+# Each metric is a [5th, 95th] percentile range; rates are fractions.
+#   ctr             clicks per impression (paid and organic)
+#   cpc             USD per paid click; null for platforms with no paid placement
+#   cvr             conversions per click
+#   reach_per_post  organic impressions per post
+#   delivery        share of the budget actually spent (sampled uniformly)
+DEFAULT_PRIORS: Dict[str, Dict[str, Any]] = {
+    "facebook": {"ctr": [0.005, 0.018], "cpc": [0.4, 1.8], "cvr": [0.03, 0.12],
+                 "reach_per_post": [100, 1500]},
+    "instagram": {"ctr": [0.003, 0.012], "cpc": [0.5, 2.5], "cvr": [0.01, 0.06],
+                  "reach_per_post": [200, 3000]},
+    "linkedin": {"ctr": [0.003, 0.009], "cpc": [3.0, 9.0], "cvr": [0.02, 0.10],
+                 "reach_per_post": [150, 2000]},
+    "twitter": {"ctr": [0.005, 0.02], "cpc": [0.3, 1.5], "cvr": [0.005, 0.03],
+                "reach_per_post": [100, 2000]},
+    "tiktok": {"ctr": [0.005, 0.02], "cpc": [0.2, 1.5], "cvr": [0.005, 0.03],
+               "reach_per_post": [300, 8000]},
+    "youtube": {"ctr": [0.003, 0.015], "cpc": [0.1, 1.0], "cvr": [0.005, 0.03],
+                "reach_per_post": [100, 5000]},
+    "google": {"ctr": [0.02, 0.08], "cpc": [1.0, 5.0], "cvr": [0.02, 0.08],
+               "reach_per_post": [0, 0]},
+    "email": {"ctr": [0.01, 0.05], "cpc": None, "cvr": [0.01, 0.05],
+              "reach_per_post": [200, 2000]},
+    "blog": {"ctr": [0.01, 0.04], "cpc": None, "cvr": [0.01, 0.04],
+             "reach_per_post": [50, 1500]},
+    "default": {"ctr": [0.004, 0.015], "cpc": [0.5, 3.0], "cvr": [0.01, 0.05],
+                "reach_per_post": [100, 1500]},
+}
+PRIOR_ALIASES = {"x": "twitter", "ig": "instagram", "fb": "facebook", "search": "google",
+                 "adwords": "google", "newsletter": "email"}
+DEFAULT_DELIVERY = [0.85, 1.0]
+METRICS = ("spend", "impressions", "clicks", "conversions")
+
+
+def validate_priors(priors: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    checked = {}
+    for name, prior in priors.items():
+        for key in ("ctr", "cvr", "reach_per_post"):
+            if key not in prior:
+                raise ValueError(f"Forecast prior {name!r} is missing {key!r}")
+        for key in ("ctr", "cpc", "cvr", "reach_per_post", "delivery"):
+            value = prior.get(key)
+            if value is not None and (len(value) != 2 or not 0 <= value[0] <= value[1]):
+                raise ValueError(f"Forecast prior {name!r}: {key} must be [low, high] with 0 <= low <= high")
+        checked[name] = {"cpc": None, "delivery": DEFAULT_DELIVERY, **prior}
+    if "default" not in checked:
+        raise ValueError("Forecast priors need a 'default' entry")
+    return checked
+
+
+_priors: Optional[Dict[str, Dict[str, Any]]] = None
+_priors_lock = threading.Lock()
+
+
+def load_priors() -> Dict[str, Dict[str, Any]]:
+    """DEFAULT_PRIORS with FORECAST_PRIORS_PATH merged over them (loaded once)."""
+    global _priors
+    with _priors_lock:
+        if _priors is None:
+            priors = dict(DEFAULT_PRIORS)
+            if FORECAST_PRIORS_PATH:
+                with open(FORECAST_PRIORS_PATH, encoding="utf-8") as fh:
+                    priors.update(json.load(fh))
+            _priors = validate_priors(priors)
+        return _priors
+
+
+def prior_for(platform: str, priors: Dict[str, Dict[str, Any]]) -> Optional[str]:
+    """Key of the prior `platform` maps to, or None when it falls back to "default"."""
+    for word in re.findall(r"[a-z]+", platform.lower()):
+        key = PRIOR_ALIASES.get(word, word)
+        if key in priors and key != "default":
+            return key
+    return None
+
+
+def stable_seed(*parts: Any) -> int:
+    """Same inputs, same draws: forecasts are reproducible."""
+    digest = hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def draw_count(requested: int, rows: int) -> int:
+    """
+    Simulations per scenario x platform row: at least MIN_SIMULATIONS, but
+    never more than FORECAST_MAX_DRAWS in total. Raises ValueError when the
+    cap cannot fit MIN_SIMULATIONS per row.
+    """
+    budget = FORECAST_MAX_DRAWS // max(1, rows)
+    if budget < MIN_SIMULATIONS:
+        raise ValueError(f"Too many scenarios x platforms ({rows}) for FORECAST_MAX_DRAWS")
+    return min(max(MIN_SIMULATIONS, int(requested)), budget)
+
+
+# ----------------------------------------------------
+# SIMULATION
+# ----------------------------------------------------
+def _lognormal(rng: np.random.Generator, bounds: Sequence[Sequence[float]], n: int) -> np.ndarray:
+    """
+    (n, len(bounds)) draws, column j log-normal with 5th/95th percentiles
+    bounds[j]; a zero upper bound gives zeros.
+    """
+    low = np.array([b[0] for b in bounds], dtype=float)
+    high = np.array([b[1] for b in bounds], dtype=float)
+    low = np.maximum(low, high * 1e-3)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        median = np.sqrt(low * high)
+        sigma = np.where(high > 0, np.log(high / low) / (2 * 1.645), 0.0)
+    return median * np.exp(sigma * rng.standard_normal((n, len(bounds))))
+
+
+def _renormalise(mixes: np.ndarray) -> np.ndarray:
+    totals = mixes.sum(axis=1, keepdims=True)
+    return np.divide(mixes, totals, out=np.zeros_like(mixes, dtype=float), where=totals > 0)
+
+
+def simulate(platforms: List[str],
+             budgets: np.ndarray,
+             mixes: np.ndarray,
+             weeks: np.ndarray,
+             posts_per_week: np.ndarray,
+             simulations: int = FORECAST_SIMULATIONS,
+             seed: int = 0,
+             priors: Optional[Dict[str, Dict[str, Any]]] = None,
+             overrides: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, np.ndarray]:
+    """
+    Monte Carlo over S scenarios at once. budgets, weeks and
+    posts_per_week have shape (S,); mixes is (S, P), each row the share of
+    budget and posts per platform. Platform rates are drawn once per
+    simulation (shape (N, P)) and shared by every scenario, so scenario
+    differences are not drowned in sampling noise. `overrides` maps a
+    platform name to the prior it uses instead of its benchmark one (e.g.
+    rates observed in the client's own results).
+
+    Returns metric -> array of shape (S, N, P).
+    """
+    priors = load_priors() if priors is None else priors
+    rng = np.random.default_rng(seed)
+    n = simulations
+    overrides = overrides or {}
+    chosen = [overrides.get(name) or priors[prior_for(name, priors) or "default"] for name in platforms]
+
+    paid = np.array([bool(c["cpc"]) for c in chosen])
+    organic = np.array([c["reach_per_post"][1] > 0 for c in chosen])
+    ctr = np.clip(_lognormal(rng, [c["ctr"] for c in chosen], n), 0, 1)  # (N, P)
+    cvr = np.clip(_lognormal(rng, [c["cvr"] for c in chosen], n), 0, 1)
+    reach = _lognormal(rng, [c["reach_per_post"] for c in chosen], n)
+    cpc = np.where(paid, _lognormal(rng, [c["cpc"] or [0, 0] for c in chosen], n), np.inf)
+    low, high = np.array([c["delivery"] for c in chosen], dtype=float).T
+    delivery = low + (high - low) * rng.random((n, len(chosen)))
+
+    # budget only goes to platforms with paid placements and posts to those
+    # with organic reach, each renormalised per scenario
+    paid_mix = _renormalise(mixes * paid)
+    post_mix = _renormalise(mixes * organic)
+
+    planned = (budgets * weeks / WEEKS_PER_MONTH)[:, None] * paid_mix    # (S, P)
+    spend = planned[:, None, :] * delivery[None]                          # (S, N, P)
+    paid_clicks = spend / cpc[None]
+    paid_impressions = np.divide(paid_clicks, ctr[None], out=np.zeros_like(paid_clicks),
+                                 where=ctr[None] > 0)
+
+    posts = (posts_per_week * weeks)[:, None] * post_mix                 # (S, P)
+    organic_impressions = posts[:, None, :] * reach[None]
+    clicks = paid_clicks + organic_impressions * ctr[None]
+    conversions = rng.poisson(clicks * cvr[None]).astype(float)
+    return {
+        "spend": spend,
+        "impressions": paid_impressions + organic_impressions,
+        "clicks": clicks,
+        "conversions": conversions,
+    }
+
+
+def percentile_bands(series: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    PERCENTILES (shape (Q, K)) and finite means (shape (K,)) of K series
+    of draws, one per row. Every row is sorted in a single float32 call,
+    which on NumPy 2 beats np.percentile's per-quantile partitioning.
+    Infinite draws (e.g. CPA with no conversions) sort last.
+    """
+    ordered = np.sort(series.astype(np.float32), axis=1)
+    n = ordered.shape[1]
+    position = np.asarray(PERCENTILES) / 100 * (n - 1)
+    low = np.floor(position).astype(int)
+    high = np.minimum(low + 1, n - 1)
+    below, above = ordered[:, low].T, ordered[:, high].T
+    with np.errstate(invalid="ignore"):
+        qs = np.where(below == above, below, below + (above - below) * (position - low)[:, None])
+    finite = np.isfinite(series)
+    means = np.where(finite, series, 0).sum(axis=1) / np.maximum(finite.sum(axis=1), 1)
+    return qs, means
+
+
+def band(qs: np.ndarray, mean: float) -> Dict[str, Optional[float]]:
+    band = {f"p{pct}": float(q) for pct, q in zip(PERCENTILES, qs)}
+    band["mean"] = float(mean)
+    return {k: round(v, 4) if np.isfinite(v) else None for k, v in band.items()}
+
+
+def summarise(draws: Dict[str, np.ndarray], scenario: int, platforms: List[str]) -> Dict[str, Any]:
+    """Bands for one scenario: totals, derived rates and a per-platform breakdown."""
+    per_platform = {metric: draws[metric][scenario] for metric in METRICS}    # (N, P)
+    totals = {metric: values.sum(axis=1) for metric, values in per_platform.items()}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        totals["ctr"] = np.where(totals["impressions"] > 0, totals["clicks"] / totals["impressions"], 0.0)
+        totals["cpc"] = np.where(totals["clicks"] > 0, totals["spend"] / totals["clicks"], 0.0)
+        totals["cpa"] = np.where(totals["conversions"] > 0, totals["spend"] / totals["conversions"], np.inf)
+
+    # every series of this scenario in one percentile pass
+    names = [("totals", metric) for metric in totals]
+    names += [(name, metric) for name in platforms for metric in METRICS]
+    series = np.stack(list(totals.values())
+                      + [per_platform[metric][:, index]
+                         for index in range(len(platforms)) for metric in METRICS])
+    qs, means = percentile_bands(series)
+
+    result: Dict[str, Any] = {"totals": {}, "platforms": {name: {} for name in platforms}}
+    for row, (group, metric) in enumerate(names):
+        target = result["totals"] if group == "totals" else result["platforms"][group]
+        target[metric] = band(qs[:, row], means[row])
+    return result
@@ -2,21 +2,457 @@
 
 import os
 import json
-from typing import Any, Dict
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from dotenv import load_dotenv
-import google.generativeai as genai
+
+from .json_repair import continuation_prompt, count as count_parse, missing_keys, repair
+from .json_stream import IncrementalJSONParser, events_from_result
+from .rate_limiter import ConcurrencyLimiter, TokenBucket
+from .resilience import CircuitBreaker, CircuitOpen, LatencyWindow, backoff_delay, is_transient
+from .response_cache import ResponseCache, make_cache_key
+from .telemetry import (GEMINI_CALL_SECONDS, GEMINI_PROMPT_TOKENS_SAVED, GEMINI_REQUESTS,
+                        GEMINI_TOKENS, estimate_tokens)
 
 load_dotenv()
 
 API_KEY = os.getenv("GEMINI_API_KEY")
 MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", "gemini-2.5-flash")
+# Shared limits for every Gemini call in this process (RPS <= 0: unlimited)
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "16"))
+GEMINI_RPS = float(os.getenv("GEMINI_RPS", "0"))
+
+# Call resilience: per-call deadline, retries on transient errors, optional
+# hedging (a duplicate request once the first exceeds the observed p95, or
+# GEMINI_HEDGE_AFTER_SECONDS), a circuit breaker per model and an optional
+# fallback model used when the primary is failing.
+FALLBACK_MODEL_NAME = os.getenv("GEMINI_FALLBACK_MODEL_NAME") or None
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "60"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+GEMINI_RETRY_BASE_SECONDS = float(os.getenv("GEMINI_RETRY_BASE_SECONDS", "0.5"))
+GEMINI_HEDGE = os.getenv("GEMINI_HEDGE", "0").lower() in ("1", "true", "yes")
+GEMINI_HEDGE_AFTER_SECONDS = float(os.getenv("GEMINI_HEDGE_AFTER_SECONDS", "0"))
+GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "5"))
+GEMINI_BREAKER_COOLDOWN = float(os.getenv("GEMINI_BREAKER_COOLDOWN", "30"))
+# Ask only for the template keys a truncated/partial reply is missing
+GEMINI_JSON_CONTINUATION = os.getenv("GEMINI_JSON_CONTINUATION", "1").lower() in ("1", "true", "yes")
+# Prompt budget: minify the JSON template and trim prompt whitespace
+GEMINI_COMPACT_PROMPTS = os.getenv("GEMINI_COMPACT_PROMPTS", "0").lower() in ("1", "true", "yes")
+
+
+class GeminiUnavailable(RuntimeError):
+    """
+    Gemini could not produce a reply in time (deadline, retries and any
+    fallback exhausted, or the circuit is open). The API maps this to 503.
+    """
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# ----------------------------------------------------
+# MODEL (built lazily on first call)
+# ----------------------------------------------------
+# google.generativeai takes about a second to import, so it is only
+# loaded when the first generation actually needs it. Startup, health
+# checks and cache hits never pay for it, and a missing key only fails
+# the calls that need Gemini.
+_model: Optional[Any] = None
+_fallback_model: Optional[Any] = None
+_model_lock = threading.Lock()
+
+
+def _build_model(name: str) -> Any:
+    if not API_KEY:
+        raise RuntimeError("❌ GEMINI_API_KEY is not set in .env")
+    import google.generativeai as genai
+
+    genai.configure(api_key=API_KEY)
+    return genai.GenerativeModel(name)
+
+
+def _get_model() -> Any:
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = _build_model(MODEL_NAME)
+    return _model
+
+
+def _get_fallback_model() -> Any:
+    global _fallback_model
+    if _fallback_model is None:
+        with _model_lock:
+            if _fallback_model is None:
+                _fallback_model = _build_model(FALLBACK_MODEL_NAME)
+    return _fallback_model
+
+
+def preload_model() -> None:
+    """
+    Build the model on a daemon thread so the first generation does not
+    block the event loop on the import. No-op without an API key.
+    """
+    if _model is None and API_KEY:
+        threading.Thread(target=_get_model, name="gemini-preload", daemon=True).start()
+
+
+def set_model(model: Optional[Any], fallback: Optional[Any] = None) -> None:
+    """
+    Swap the model object (anything with generate_content /
+    generate_content_async), and optionally the fallback model. Pass None
+    to rebuild the defaults lazily.
+    """
+    global _model, _fallback_model
+    _model = model
+    _fallback_model = fallback
+
+
+# ----------------------------------------------------
+# RESPONSE CACHE (pluggable)
+# ----------------------------------------------------
+_cache: Optional[Any] = ResponseCache()
+
+
+def get_cache() -> Optional[Any]:
+    return _cache
+
+
+def set_cache(cache: Optional[Any]) -> None:
+    """
+    Swap the response cache. Pass None to disable caching entirely.
+    """
+    global _cache
+    _cache = cache
+
+
+# ----------------------------------------------------
+# SHARED CONCURRENCY + RATE LIMIT
+# ----------------------------------------------------
+_rate_bucket = TokenBucket(GEMINI_RPS)
+# one limit for the whole process: the server loop, sync callers on
+# worker threads and job threads running their own loop share the slots
+_slots = ConcurrencyLimiter(GEMINI_MAX_CONCURRENCY)
+
+
+@contextmanager
+def _call_slot() -> Iterator[None]:
+    _slots.acquire()
+    try:
+        _rate_bucket.acquire()
+        yield
+    finally:
+        _slots.release()
+
+
+@asynccontextmanager
+async def _async_call_slot() -> AsyncIterator[None]:
+    await _slots.acquire_async()
+    try:
+        await _rate_bucket.acquire_async()
+        yield
+    finally:
+        _slots.release()
+
+
+# ----------------------------------------------------
+# RESILIENT CALLS (deadline, retries, hedging, breaker, fallback)
+# ----------------------------------------------------
+_breakers: Dict[str, CircuitBreaker] = {}
+_latency: Dict[str, LatencyWindow] = {}
+_call_stats_lock = threading.Lock()
+_call_stats = {"attempts": 0, "retries": 0, "timeouts": 0, "hedged": 0,
+               "hedge_wins": 0, "fallbacks": 0, "unavailable": 0}
+
+
+def _count_call(name: str, value: int = 1) -> None:
+    with _call_stats_lock:
+        _call_stats[name] += value
+
+
+def _breaker(model_name: str) -> CircuitBreaker:
+    with _call_stats_lock:
+        if model_name not in _breakers:
+            _breakers[model_name] = CircuitBreaker(
+                model_name, GEMINI_BREAKER_FAILURES, GEMINI_BREAKER_COOLDOWN)
+            _latency[model_name] = LatencyWindow()
+        return _breakers[model_name]
+
+
+def _routes() -> List[Tuple[str, Callable[[], Any]]]:
+    routes = [(MODEL_NAME, _get_model)]
+    if FALLBACK_MODEL_NAME and FALLBACK_MODEL_NAME != MODEL_NAME:
+        routes.append((FALLBACK_MODEL_NAME, _get_fallback_model))
+    return routes
+
+
+def _unavailable(last_exc: Optional[BaseException]) -> GeminiUnavailable:
+    _count_call("unavailable")
+    retry_after = getattr(last_exc, "retry_after", 0.0) or GEMINI_RETRY_BASE_SECONDS * 4
+    return GeminiUnavailable(f"Gemini is unavailable: {last_exc}", retry_after)
+
+
+def _record_outcome(model_name: str, exc: Optional[BaseException], started: float) -> None:
+    breaker = _breaker(model_name)
+    if exc is None:
+        breaker.record_success()
+        _latency[model_name].add(time.monotonic() - started)
+    elif is_transient(exc):
+        breaker.record_failure()
+        if isinstance(exc, (TimeoutError, asyncio.TimeoutError)):
+            _count_call("timeouts")
+
+
+@contextmanager
+def _breaker_trial(model_name: str) -> Iterator[None]:
+    """
+    before_call() around one attempt. A half-open trial that ends without
+    a verdict (non-transient error, or cancelled as the losing hedge) is
+    released in `finally`, so the breaker never stays stuck half-open.
+    """
+    breaker = _breaker(model_name)
+    trial = breaker.before_call()
+    try:
+        yield
+    finally:
+        if trial:
+            breaker.record_release()
+
+
+def _with_retries_sync(model_name: str, get_model: Callable[[], Any],
+                       call: Callable[[Any, float], Any]) -> Any:
+    deadline = time.monotonic() + GEMINI_TIMEOUT_SECONDS
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        try:
+            with _breaker_trial(model_name):
+                started = time.monotonic()
+                _count_call("attempts")
+                try:
+                    result = call(get_model(), max(deadline - started, 0.001))
+                except Exception as exc:
+                    _record_outcome(model_name, exc, started)
+                    raise
+                _record_outcome(model_name, None, started)
+                return result
+        except CircuitOpen:
+            raise
+        except Exception as exc:
+            remaining = deadline - time.monotonic()
+            if not is_transient(exc) or attempt == GEMINI_MAX_RETRIES or remaining <= 0:
+                raise
+            _count_call("retries")
+            time.sleep(min(backoff_delay(attempt, GEMINI_RETRY_BASE_SECONDS), remaining))
+
+
+def _call_model(prompt: str, config: Dict[str, Any]) -> Tuple[Any, str]:
+    """
+    Blocking generate_content through the resilience layer. Returns
+    (response, model name that served it). Deadline, retries, breaker and
+    fallback apply as on the async path, but there is no hedging: a
+    duplicate request would need a second thread per call. Endpoints that
+    want hedging use generate_json_async.
+    """
+    def call(model: Any, timeout: float) -> Any:
+        with _call_slot():
+            return model.generate_content(
+                prompt, generation_config=config, request_options={"timeout": timeout})
+
+    last_exc: Optional[BaseException] = None
+    for index, (model_name, get_model) in enumerate(_routes()):
+        if index:
+            _count_call("fallbacks")
+        try:
+            return _with_retries_sync(model_name, get_model, call), model_name
+        except Exception as exc:
+            if not (isinstance(exc, CircuitOpen) or is_transient(exc)):
+                raise
+            last_exc = exc
+    raise _unavailable(last_exc) from last_exc
+
+
+async def _attempt_async(model_name: str, get_model: Callable[[], Any], prompt: str,
+                         config: Dict[str, Any], deadline: float, stream: bool) -> Any:
+    async def call() -> Any:
+        timeout = max(deadline - time.monotonic(), 0.001)
+        kwargs = {"generation_config": config, "request_options": {"timeout": timeout}}
+        if stream:
+            kwargs["stream"] = True
+        return await asyncio.wait_for(get_model().generate_content_async(prompt, **kwargs),
+                                      timeout)
 
-if not API_KEY:
-    raise RuntimeError("❌ GEMINI_API_KEY is not set in .env")
+    with _breaker_trial(model_name):
+        started = time.monotonic()
+        _count_call("attempts")
+        try:
+            if stream:  # the caller already holds a slot for the whole stream
+                result = await call()
+            else:
+                async with _async_call_slot():
+                    result = await call()
+        except Exception as exc:
+            _record_outcome(model_name, exc, started)
+            raise
+        _record_outcome(model_name, None, started)
+        return result
 
-genai.configure(api_key=API_KEY)
-_model = genai.GenerativeModel(MODEL_NAME)
+
+async def _hedged_async(model_name: str, get_model: Callable[[], Any], prompt: str,
+                        config: Dict[str, Any], deadline: float) -> Any:
+    """
+    Fire a second identical request if the first has not answered within
+    the hedge delay; whichever succeeds first wins, the other is cancelled.
+    """
+    _breaker(model_name)  # registers the latency window on first use
+    delay = GEMINI_HEDGE_AFTER_SECONDS or _latency[model_name].percentile(95)
+    if not GEMINI_HEDGE or delay is None:
+        return await _attempt_async(model_name, get_model, prompt, config, deadline, False)
+
+    first = asyncio.ensure_future(
+        _attempt_async(model_name, get_model, prompt, config, deadline, False))
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done:
+        return first.result()
+
+    _count_call("hedged")
+    second = asyncio.ensure_future(
+        _attempt_async(model_name, get_model, prompt, config, deadline, False))
+    pending = {first, second}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is second:
+                        _count_call("hedge_wins")
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _call_model_async(prompt: str, config: Dict[str, Any],
+                            stream: bool = False) -> Tuple[Any, str]:
+    """
+    Async counterpart of _call_model(). With stream=True only opening the
+    stream is retried (never after output has been consumed) and there is
+    no hedging; the caller must hold an _async_call_slot().
+    """
+    last_exc: Optional[BaseException] = None
+    for index, (model_name, get_model) in enumerate(_routes()):
+        if index:
+            _count_call("fallbacks")
+        deadline = time.monotonic() + GEMINI_TIMEOUT_SECONDS
+        for attempt in range(GEMINI_MAX_RETRIES + 1):
+            try:
+                if stream:
+                    resp = await _attempt_async(model_name, get_model, prompt, config,
+                                                deadline, True)
+                else:
+                    resp = await _hedged_async(model_name, get_model, prompt, config, deadline)
+                return resp, model_name
+            except CircuitOpen as exc:
+                last_exc = exc
+                break
+            except Exception as exc:
+                if not is_transient(exc):
+                    raise
+                last_exc = exc
+                remaining = deadline - time.monotonic()
+                if attempt == GEMINI_MAX_RETRIES or remaining <= 0:
+                    break
+                _count_call("retries")
+                await asyncio.sleep(min(backoff_delay(attempt, GEMINI_RETRY_BASE_SECONDS),
+                                        remaining))
+    raise _unavailable(last_exc) from last_exc
+
+
+def gemini_call_stats() -> Dict[str, Any]:
+    with _call_stats_lock:
+        counters = dict(_call_stats)
+        models = list(_breakers)
+    return {
+        **counters,
+        "fallback_model": FALLBACK_MODEL_NAME,
+        "hedging": GEMINI_HEDGE,
+        "slots": _slots.stats(),
+        "models": {
+            name: {**_breakers[name].stats(), "latency": _latency[name].stats()}
+            for name in models
+        },
+    }
+
+
+# ----------------------------------------------------
+# TOKEN USAGE TRACKING
+# ----------------------------------------------------
+_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar("gemini_usage", default=None)
+
+
+@contextmanager
+def track_usage() -> Iterator[Dict[str, int]]:
+    """
+    Accumulate token usage of every Gemini call made inside the block
+    (including tasks spawned from it):
+
+        with track_usage() as usage:
+            await run_campaign_builder_async(payload)
+        usage["total_tokens"]
+    """
+    usage = {"calls": 0, "cache_hits": 0, "prompt_tokens": 0,
+             "completion_tokens": 0, "total_tokens": 0}
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
+
+def _record_usage(resp: Any = None, cache_hit: bool = False, endpoint: str = "default") -> None:
+    if cache_hit:
+        GEMINI_REQUESTS.inc(endpoint=endpoint, outcome="cache_hit")
+    meta = None if cache_hit else getattr(resp, "usage_metadata", None)
+    prompt_tokens = getattr(meta, "prompt_token_count", 0) or 0
+    completion_tokens = getattr(meta, "candidates_token_count", 0) or 0
+    if meta is not None:
+        GEMINI_TOKENS.inc(prompt_tokens, endpoint=endpoint, kind="prompt")
+        GEMINI_TOKENS.inc(completion_tokens, endpoint=endpoint, kind="completion")
+
+    usage = _usage.get()
+    if usage is None:
+        return
+    if cache_hit:
+        usage["cache_hits"] += 1
+        return
+    usage["calls"] += 1
+    if meta is not None:
+        usage["prompt_tokens"] += prompt_tokens
+        usage["completion_tokens"] += completion_tokens
+        usage["total_tokens"] += getattr(meta, "total_token_count", 0) or 0
+
+
+@contextmanager
+def _timed_call(endpoint: str) -> Iterator[None]:
+    """Latency of a cache-miss generation; failures are counted by outcome."""
+    started = time.perf_counter()
+    try:
+        yield
+    except GeminiUnavailable:
+        GEMINI_REQUESTS.inc(endpoint=endpoint, outcome="unavailable")
+        raise
+    except Exception:
+        GEMINI_REQUESTS.inc(endpoint=endpoint, outcome="error")
+        raise
+    GEMINI_CALL_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
 
 
 # ----------------------------------------------------
@@ -111,19 +547,30 @@ Rules:
 
 
 # ----------------------------------------------------
-# GENERATE JSON WITH TEMPLATE
+# PROMPT RENDERING + RESPONSE PARSING (shared by sync/async)
 # ----------------------------------------------------
-def generate_json(
+def _compact_text(text: str) -> str:
+    return "\n".join(" ".join(line.split()) for line in text.strip().splitlines() if line.strip())
+
+
+def _render_prompt(
     user_prompt: str,
-    system_prompt: str = WORKFLOW_SYSTEM_PROMPT,
-    json_template: Dict[str, Any] = WORKFLOW_JSON_TEMPLATE,
-    temperature: float = 0.4,
-    max_tokens: int = 2048,
-) -> Dict[str, Any]:
+    system_prompt: str,
+    json_template: Dict[str, Any],
+    compact: bool = False,
+) -> str:
+    if compact:
+        template_str = json.dumps(json_template, separators=(",", ":"), ensure_ascii=False)
+        return (
+            f"{_compact_text(system_prompt)}\n"
+            "Respond ONLY with valid JSON using exactly this structure:\n"
+            f"{template_str}\n"
+            f"USER REQUEST:\n{_compact_text(user_prompt)}"
+        )
 
     template_str = json.dumps(json_template, indent=2)
 
-    prompt = f"""
+    return f"""
 {system_prompt.strip()}
 
 You MUST obey these rules:
@@ -136,21 +583,306 @@ USER REQUEST:
 {user_prompt}
 """.strip()
 
-    resp = _model.generate_content(
-        prompt,
-        generation_config={
-            "temperature": temperature,
-            "max_output_tokens": max_tokens,
-        },
-    )
 
-    raw_text = resp.text or ""
-    cleaned = _clean_to_json(raw_text)
+def _build_prompt(user_prompt: str, system_prompt: str, json_template: Dict[str, Any],
+                  endpoint: str) -> str:
+    """
+    Render the prompt, compacted when GEMINI_COMPACT_PROMPTS is on; the
+    estimated tokens saved are exported per endpoint.
+    """
+    if not GEMINI_COMPACT_PROMPTS:
+        return _render_prompt(user_prompt, system_prompt, json_template)
+    prompt = _render_prompt(user_prompt, system_prompt, json_template, compact=True)
+    full = _render_prompt(user_prompt, system_prompt, json_template)
+    GEMINI_PROMPT_TOKENS_SAVED.inc(
+        max(0, estimate_tokens(full) - estimate_tokens(prompt)), endpoint=endpoint)
+    return prompt
+
+
+def _generation_config(temperature: float, max_tokens: int) -> Dict[str, Any]:
+    return {
+        "temperature": temperature,
+        "max_output_tokens": max_tokens,
+    }
+
+
+def _cache_lookup(cache_key: str, bypass_cache: bool, endpoint: str) -> Optional[Dict[str, Any]]:
+    if _cache is None or bypass_cache:
+        return None
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        _record_usage(cache_hit=True, endpoint=endpoint)
+    return cached
+
 
+async def _cache_lookup_async(cache_key: str, bypass_cache: bool, endpoint: str) -> Optional[Dict[str, Any]]:
+    # the disk tier commits on every hit, so it stays off the event loop
+    cache = _cache
+    if cache is None or bypass_cache:
+        return None
+    cached = await asyncio.to_thread(cache.get, cache_key)
+    if cached is not None:
+        _record_usage(cache_hit=True, endpoint=endpoint)
+    return cached
+
+
+def _served_key(cache_key: str, model_name: str) -> Optional[str]:
+    # Fallback replies are returned but not cached under the primary's key.
+    return cache_key if model_name == MODEL_NAME else None
+
+
+def _response_text(resp: Any, endpoint: str) -> str:
+    _record_usage(resp, endpoint=endpoint)
+    return resp.text or ""
+
+
+def _load_lenient(raw_text: str) -> Tuple[Any, bool, bool]:
+    """(parsed value or None, whether the repair pass was needed, truncated)"""
     try:
-        return json.loads(cleaned)
+        return json.loads(_clean_to_json(raw_text)), False, False
     except json.JSONDecodeError:
+        value, truncated = repair(raw_text)
+        return value, True, truncated
+
+
+def _parse_lenient(raw_text: str, json_template: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """
+    Strict parse first, then the lenient repair (trailing commas, fences,
+    truncation). Returns (result or None, template keys still missing).
+    """
+    result, repaired, truncated = _load_lenient(raw_text)
+    if not isinstance(result, dict):
+        count_parse("failed")
+        return None, []
+    count_parse("repaired" if repaired else "parsed")
+    if not isinstance(json_template, dict):
+        return result, []
+    missing = missing_keys(result, json_template)
+    if truncated and result:
+        # the last section of a cut-off reply is probably cut short too;
+        # keep it for now but ask for it again
+        last = list(result)[-1]
+        if last in json_template and last not in missing:
+            missing.append(last)
+    if missing:
+        count_parse("incomplete")
+    return result, missing
+
+
+def _should_continue(result: Optional[Dict[str, Any]], missing: List[str],
+                     json_template: Dict[str, Any]) -> bool:
+    # A reply that matches none of the template is not worth patching.
+    return (GEMINI_JSON_CONTINUATION and result is not None and bool(missing)
+            and len(missing) < len(json_template))
+
+
+def _continuation(user_prompt: str, system_prompt: str, json_template: Dict[str, Any],
+                  missing: List[str]) -> str:
+    done = [key for key in json_template if key not in missing]
+    return _render_prompt(
+        continuation_prompt(user_prompt, done, missing),
+        system_prompt,
+        {key: json_template[key] for key in missing},
+        compact=GEMINI_COMPACT_PROMPTS,
+    )
+
+
+def _merge_continuation(result: Dict[str, Any], missing: List[str], raw_text: str,
+                        json_template: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    extra = _load_lenient(raw_text)[0]
+    if isinstance(extra, dict):
+        for key in missing:
+            if key in extra:
+                result[key] = extra[key]
+    still_missing = missing_keys(result, json_template)
+    if not still_missing:
+        count_parse("completed")
+    return result, still_missing
+
+
+def _complete(user_prompt: str, system_prompt: str, json_template: Dict[str, Any],
+              result: Dict[str, Any], missing: List[str], config: Dict[str, Any],
+              endpoint: str) -> Tuple[Dict[str, Any], List[str]]:
+    count_parse("continuations")
+    try:
+        resp, _ = _call_model(_continuation(user_prompt, system_prompt, json_template, missing), config)
+    except GeminiUnavailable:
+        return result, missing
+    return _merge_continuation(result, missing, _response_text(resp, endpoint), json_template)
+
+
+async def _complete_async(user_prompt: str, system_prompt: str, json_template: Dict[str, Any],
+                          result: Dict[str, Any], missing: List[str], config: Dict[str, Any],
+                          endpoint: str) -> Tuple[Dict[str, Any], List[str]]:
+    count_parse("continuations")
+    try:
+        resp, _ = await _call_model_async(
+            _continuation(user_prompt, system_prompt, json_template, missing), config)
+    except GeminiUnavailable:
+        return result, missing
+    return _merge_continuation(result, missing, _response_text(resp, endpoint), json_template)
+
+
+def _finish(result: Optional[Dict[str, Any]], missing: List[str], raw_text: str,
+            endpoint: str) -> Dict[str, Any]:
+    if result is None:
+        GEMINI_REQUESTS.inc(endpoint=endpoint, outcome="parse_failed")
         return {
             "error": "❌ Failed to parse Gemini response as JSON",
             "raw_response": raw_text,
         }
+    GEMINI_REQUESTS.inc(endpoint=endpoint, outcome="incomplete" if missing else "ok")
+    return result
+
+
+def _cacheable(result: Optional[Dict[str, Any]], missing: List[str], cache_key: Optional[str]) -> bool:
+    # Partial and unparsable replies are returned but never cached.
+    return _cache is not None and cache_key is not None and result is not None and not missing
+
+
+# ----------------------------------------------------
+# GENERATE JSON WITH TEMPLATE
+# ----------------------------------------------------
+async def generate_json_async(
+    user_prompt: str,
+    system_prompt: str = WORKFLOW_SYSTEM_PROMPT,
+    json_template: Dict[str, Any] = WORKFLOW_JSON_TEMPLATE,
+    temperature: float = 0.4,
+    max_tokens: int = 2048,
+    endpoint: str = "default",
+    bypass_cache: bool = False,
+) -> Dict[str, Any]:
+    """
+    Render the prompt, call Gemini and parse the JSON reply without
+    blocking the event loop.
+
+    Successful replies are cached under a hash of the rendered prompt and
+    generation config; `endpoint` selects the TTL. `bypass_cache` skips
+    the lookup but still stores the fresh result.
+
+    Malformed or truncated replies go through json_repair first; if
+    top-level template keys are still missing, one follow-up prompt asks
+    for just those keys. Replies that stay incomplete are not cached.
+    """
+    prompt = _build_prompt(user_prompt, system_prompt, json_template, endpoint)
+    cache_key = make_cache_key(MODEL_NAME, prompt, temperature, max_tokens)
+    cached = await _cache_lookup_async(cache_key, bypass_cache, endpoint)
+    if cached is not None:
+        return cached
+
+    config = _generation_config(temperature, max_tokens)
+    with _timed_call(endpoint):
+        resp, served_by = await _call_model_async(prompt, config)
+    raw_text = _response_text(resp, endpoint)
+    result, missing = _parse_lenient(raw_text, json_template)
+    if _should_continue(result, missing, json_template):
+        result, missing = await _complete_async(
+            user_prompt, system_prompt, json_template, result, missing, config, endpoint)
+    served_key = _served_key(cache_key, served_by)
+    if _cacheable(result, missing, served_key):
+        await asyncio.to_thread(_cache.set, served_key, result, endpoint)
+    return _finish(result, missing, raw_text, endpoint)
+
+
+def generate_json(
+    user_prompt: str,
+    system_prompt: str = WORKFLOW_SYSTEM_PROMPT,
+    json_template: Dict[str, Any] = WORKFLOW_JSON_TEMPLATE,
+    temperature: float = 0.4,
+    max_tokens: int = 2048,
+    endpoint: str = "default",
+    bypass_cache: bool = False,
+) -> Dict[str, Any]:
+    """
+    Blocking counterpart of generate_json_async() for library callers.
+    """
+    prompt = _build_prompt(user_prompt, system_prompt, json_template, endpoint)
+    cache_key = make_cache_key(MODEL_NAME, prompt, temperature, max_tokens)
+    cached = _cache_lookup(cache_key, bypass_cache, endpoint)
+    if cached is not None:
+        return cached
+
+    config = _generation_config(temperature, max_tokens)
+    with _timed_call(endpoint):
+        resp, served_by = _call_model(prompt, config)
+    raw_text = _response_text(resp, endpoint)
+    result, missing = _parse_lenient(raw_text, json_template)
+    if _should_continue(result, missing, json_template):
+        result, missing = _complete(
+            user_prompt, system_prompt, json_template, result, missing, config, endpoint)
+    served_key = _served_key(cache_key, served_by)
+    if _cacheable(result, missing, served_key):
+        _cache.set(served_key, result, endpoint)
+    return _finish(result, missing, raw_text, endpoint)
+
+
+# ----------------------------------------------------
+# STREAMING GENERATION
+# ----------------------------------------------------
+async def stream_json_async(
+    user_prompt: str,
+    system_prompt: str = WORKFLOW_SYSTEM_PROMPT,
+    json_template: Dict[str, Any] = WORKFLOW_JSON_TEMPLATE,
+    temperature: float = 0.4,
+    max_tokens: int = 2048,
+    endpoint: str = "default",
+    bypass_cache: bool = False,
+    item_keys: Iterable[str] = (),
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream the generation and yield events as top-level sections (and
+    items of the arrays named in `item_keys`) close. The last event is
+    {"event": "done", "result": ...} with the fully parsed reply, which is
+    cached exactly like generate_json_async().
+    """
+    prompt = _build_prompt(user_prompt, system_prompt, json_template, endpoint)
+    cache_key = make_cache_key(MODEL_NAME, prompt, temperature, max_tokens)
+    cached = await _cache_lookup_async(cache_key, bypass_cache, endpoint)
+    if cached is not None:
+        for event in events_from_result(cached, item_keys):
+            yield event
+        yield {"event": "done", "result": cached, "cached": True}
+        return
+
+    parser = IncrementalJSONParser(item_keys)
+    streamed_items: Dict[str, int] = {}
+    chunks = []
+    last_chunk = None
+    config = _generation_config(temperature, max_tokens)
+    with _timed_call(endpoint):
+        async with _async_call_slot():
+            resp, served_by = await _call_model_async(prompt, config, stream=True)
+            async for chunk in resp:
+                last_chunk = chunk
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # chunk without text parts (e.g. a safety/finish marker)
+                    continue
+                chunks.append(text)
+                for event in parser.feed(text):
+                    if event["event"] == "item":
+                        streamed_items[event["key"]] = event["index"] + 1
+                    yield event
+
+    # usage_metadata on the final chunk covers the whole stream
+    _record_usage(last_chunk, endpoint=endpoint)
+    raw_text = "".join(chunks)
+    result, missing = _parse_lenient(raw_text, json_template)
+    if _should_continue(result, missing, json_template):
+        # sections the stream never delivered are fetched in one follow-up
+        requested = list(missing)
+        result, missing = await _complete_async(
+            user_prompt, system_prompt, json_template, result, requested, config, endpoint)
+        for key in requested:
+            if key in missing:
+                continue
+            # items already shown stay; only new ones are announced
+            for event in events_from_result({key: result[key]}, item_keys):
+                if event["event"] == "section" or event["index"] >= streamed_items.get(key, 0):
+                    yield event
+    served_key = _served_key(cache_key, served_by)
+    if _cacheable(result, missing, served_key):
+        await asyncio.to_thread(_cache.set, served_key, result, endpoint)
+    result = _finish(result, missing, raw_text, endpoint)
+    yield {"event": "done", "result": result, "cached": False}
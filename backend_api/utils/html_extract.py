@@ -0,0 +1,222 @@
+# backend_api/utils/html_extract.py
+
+import json
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urljoin
+
+# Fields that can be requested from extract_seo_signals().
+#   title, meta, canonical, hreflang  -> complete once <head> is closed
+#   h1                                -> complete at the first </h1>
+#   headings, links, images,
+#   word_count, structured_data       -> need the whole document
+ALL_FIELDS = (
+    "title", "meta", "canonical", "hreflang", "h1",
+    "headings", "links", "images", "word_count", "structured_data",
+)
+HEAD_FIELDS = {"title", "meta", "canonical", "hreflang"}
+
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+SKIP_TEXT_TAGS = {"script", "style", "noscript", "template"}
+DEFAULT_CHUNK_SIZE = 16 * 1024
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class SEOExtractor(HTMLParser):
+    """
+    Single-pass, event-based extractor. Text is only buffered for the
+    elements that are being captured, and parsing stops as soon as every
+    requested field is complete.
+    """
+
+    def __init__(self, base_url: str = "", fields: Optional[Iterable[str]] = None):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.fields = set(fields or ALL_FIELDS)
+        self.complete: set = set()
+
+        self.title: Optional[str] = None
+        self.meta: Dict[str, str] = {}
+        self.canonical = ""
+        self.hreflang: List[Dict[str, str]] = []
+        self.headings: Dict[str, List[str]] = {tag: [] for tag in sorted(HEADING_TAGS)}
+        self.links: List[Dict[str, Any]] = []
+        self.images: List[Dict[str, Any]] = []
+        self.word_count = 0
+        self.structured_data: List[Any] = []
+
+        self._in_title = False
+        self._title_parts: List[str] = []
+        self._heading: Optional[str] = None
+        self._heading_parts: List[str] = []
+        self._link: Optional[Dict[str, Any]] = None
+        self._skip_depth = 0
+        self._jsonld_parts: Optional[List[str]] = None
+        self._in_body = False
+
+    # ---- completion tracking ----
+    def _mark(self, *names: str) -> None:
+        self.complete.update(n for n in names if n in self.fields)
+        if self.fields <= self.complete:
+            raise _StopParsing
+
+    def _end_head(self) -> None:
+        if not self._in_body:
+            self._in_body = True
+            self._mark(*HEAD_FIELDS)
+
+    @property
+    def done(self) -> bool:
+        return self.fields <= self.complete
+
+    # ---- events ----
+    def _resolve(self, href: str) -> str:
+        # Malformed hrefs (e.g. "http://[::1") make urljoin raise; keep
+        # them as written so one bad link cannot abort the whole page.
+        try:
+            return urljoin(self.base_url, href.strip())
+        except ValueError:
+            return href.strip()
+
+    def handle_starttag(self, tag: str, attrs: List[Any]) -> None:
+        a = {k: (v or "") for k, v in attrs}
+
+        if tag == "body":
+            self._end_head()
+        elif tag == "title" and self.title is None:
+            self._in_title = True
+            self._title_parts = []
+        elif tag == "meta":
+            key = (a.get("name") or a.get("property") or a.get("http-equiv") or "").lower()
+            if key and key not in self.meta:
+                self.meta[key] = a.get("content", "").strip()
+        elif tag == "link":
+            rel = a.get("rel", "").lower().split()
+            href = self._resolve(a.get("href", ""))
+            if "canonical" in rel and not self.canonical:
+                self.canonical = href
+            elif "alternate" in rel and a.get("hreflang"):
+                self.hreflang.append({"hreflang": a["hreflang"], "href": href})
+        elif tag in HEADING_TAGS:
+            self._end_head()
+            self._heading = tag
+            self._heading_parts = []
+        elif tag == "a" and "links" in self.fields and a.get("href"):
+            self._link = {
+                "href": self._resolve(a["href"]),
+                "text": "",
+                "nofollow": "nofollow" in a.get("rel", "").lower().split(),
+            }
+            self.links.append(self._link)
+        elif tag == "img" and "images" in self.fields:
+            self.images.append({
+                "src": self._resolve(a.get("src", "")),
+                "alt": a.get("alt", "").strip(),
+                "has_alt": "alt" in a,
+            })
+        elif tag == "script" and a.get("type", "").lower() == "application/ld+json":
+            self._jsonld_parts = []
+            self._skip_depth += 1
+        elif tag in SKIP_TEXT_TAGS:
+            self._skip_depth += 1
+
+    def handle_startendtag(self, tag: str, attrs: List[Any]) -> None:
+        # <meta/>, <link/>, <img/>: no end tag will follow, so never bump
+        # the skip depth for them.
+        if tag in SKIP_TEXT_TAGS:
+            return
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "head":
+            self._end_head()
+        elif tag == "title" and self._in_title:
+            self._in_title = False
+            self.title = " ".join("".join(self._title_parts).split())
+            self._mark("title")
+        elif tag == self._heading:
+            text = " ".join("".join(self._heading_parts).split())
+            self.headings[tag].append(text)
+            self._heading = None
+            if tag == "h1" and len(self.headings["h1"]) == 1:
+                self._mark("h1")
+        elif tag == "a" and self._link is not None:
+            self._link["text"] = " ".join(self._link["text"].split())
+            self._link = None
+        elif tag == "script" and self._jsonld_parts is not None:
+            raw = "".join(self._jsonld_parts).strip()
+            self._jsonld_parts = None
+            self._skip_depth = max(0, self._skip_depth - 1)
+            try:
+                self.structured_data.append(json.loads(raw))
+            except ValueError:
+                pass
+        elif tag in SKIP_TEXT_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+
+    def handle_data(self, data: str) -> None:
+        if self._jsonld_parts is not None:
+            self._jsonld_parts.append(data)
+            return
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self._title_parts.append(data)
+            return
+        if self._heading is not None:
+            self._heading_parts.append(data)
+        if self._link is not None:
+            self._link["text"] += data
+        if self._in_body and "word_count" in self.fields:
+            self.word_count += len(data.split())
+
+    # ---- result ----
+    def result(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        if "title" in self.fields:
+            out["title"] = self.title or ""
+        if "meta" in self.fields:
+            out["meta"] = self.meta
+            out["meta_description"] = self.meta.get("description", "")
+            out["robots"] = self.meta.get("robots", "")
+        if "canonical" in self.fields:
+            out["canonical"] = self.canonical
+        if "hreflang" in self.fields:
+            out["hreflang"] = self.hreflang
+        if "h1" in self.fields or "headings" in self.fields:
+            out["h1"] = self.headings["h1"][0] if self.headings["h1"] else ""
+        if "headings" in self.fields:
+            out["headings"] = self.headings
+            out["h1_count"] = len(self.headings["h1"])
+        if "links" in self.fields:
+            out["links"] = self.links
+        if "images" in self.fields:
+            out["images"] = self.images
+            out["images_missing_alt"] = sum(1 for img in self.images if not img["alt"])
+        if "word_count" in self.fields:
+            out["word_count"] = self.word_count
+        if "structured_data" in self.fields:
+            out["structured_data"] = self.structured_data
+        return out
+
+
+def extract_seo_signals(html: str,
+                        base_url: str = "",
+                        fields: Optional[Iterable[str]] = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Pull the requested SEO signals out of `html` in one streaming pass.
+    The document is fed in chunks so a request for head-only fields
+    (or the first H1) never tokenizes the rest of a large page.
+    """
+    parser = SEOExtractor(base_url, fields)
+    try:
+        for start in range(0, len(html), chunk_size):
+            parser.feed(html[start:start + chunk_size])
+        parser.close()
+    except _StopParsing:
+        pass
+    return parser.result()
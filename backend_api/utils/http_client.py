@@ -0,0 +1,370 @@
+# backend_api/utils/http_client.py
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import httpx
+
+from .telemetry import HTTP_REQUESTS, HTTP_REQUEST_SECONDS, http_result
+
+HTTP_USER_AGENT = os.getenv("HTTP_USER_AGENT", "Mozilla/5.0 (compatible; SEOAgentBot/1.0)")
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "15"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_MAX_BODY_BYTES = int(os.getenv("HTTP_MAX_BODY_BYTES", str(5 * 1024 * 1024)))
+HTTP_VALIDATOR_PATH = os.getenv("HTTP_VALIDATOR_PATH", ".cache/http_validators.sqlite3")
+HTTP_VALIDATOR_ENTRIES = int(os.getenv("HTTP_VALIDATOR_ENTRIES", "20000"))
+# Total size of the stored bodies; the oldest entries go first
+HTTP_VALIDATOR_MAX_BYTES = int(os.getenv("HTTP_VALIDATOR_MAX_BYTES", str(256 * 1024 * 1024)))
+
+try:
+    import brotli  # noqa: F401  (httpx decodes "br" only when brotli is installed)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+DEFAULT_HEADERS = {
+    "User-Agent": HTTP_USER_AGENT,
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+
+
+def make_timeout(read: Optional[float] = None) -> httpx.Timeout:
+    return httpx.Timeout(read or HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+
+def _limits() -> httpx.Limits:
+    # httpx keeps one connection pool per origin inside these limits.
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+    )
+
+
+# ----------------------------------------------------
+# SHARED CLIENTS
+# ----------------------------------------------------
+_sync_client: Optional[httpx.Client] = None
+_sync_lock = threading.Lock()
+# AsyncClient connections are bound to the loop that opened them, so keep
+# one client per running loop (uvicorn has one; asyncio.run() makes more).
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+    weakref.WeakKeyDictionary()
+
+
+def get_client() -> httpx.Client:
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is None:
+            _sync_client = httpx.Client(
+                headers=DEFAULT_HEADERS,
+                timeout=make_timeout(),
+                limits=_limits(),
+                follow_redirects=True,
+            )
+        return _sync_client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            timeout=make_timeout(),
+            limits=_limits(),
+            follow_redirects=True,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+# ----------------------------------------------------
+# CONDITIONAL RE-FETCH STORE (ETag / Last-Modified)
+# ----------------------------------------------------
+class ValidatorStore:
+    """
+    ETag / Last-Modified and the body they validate, per URL, so a 304 can
+    be answered from disk. Bounded by entry count and by total body bytes
+    (kept as a running total); the oldest entries are evicted first.
+    """
+
+    def __init__(self, path: str = HTTP_VALIDATOR_PATH, max_entries: int = HTTP_VALIDATOR_ENTRIES,
+                 max_bytes: int = HTTP_VALIDATOR_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS validators (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                body BLOB NOT NULL,
+                stored_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_validators_stored ON validators(stored_at)")
+        self._conn.commit()
+        self._bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(body)), 0) FROM validators").fetchone()[0]
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_type, body FROM validators WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, content_type, body = row
+        return {"etag": etag, "last_modified": last_modified,
+                "content_type": content_type, "body": body}
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str],
+            content_type: str, body: bytes) -> None:
+        if self.max_bytes and len(body) > self.max_bytes:
+            return
+        with self._lock:
+            row = self._conn.execute("SELECT LENGTH(body) FROM validators WHERE url = ?",
+                                     (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO validators "
+                "(url, etag, last_modified, content_type, body, stored_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, content_type, body, time.time()),
+            )
+            self._bytes += len(body) - (row[0] if row else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        count = self._conn.execute("SELECT COUNT(*) FROM validators").fetchone()[0]
+        over = max(0, count - self.max_entries)
+        if not over and not (self.max_bytes and self._bytes > self.max_bytes):
+            return
+        evicted = []
+        for url, size in self._conn.execute(
+                "SELECT url, LENGTH(body) FROM validators ORDER BY stored_at"):
+            if len(evicted) >= over and not (self.max_bytes and self._bytes > self.max_bytes):
+                break
+            evicted.append((url,))
+            self._bytes -= size
+        self._conn.executemany("DELETE FROM validators WHERE url = ?", evicted)
+
+
+_validators: Optional[ValidatorStore] = None
+_validators_lock = threading.Lock()
+
+
+def get_validator_store() -> ValidatorStore:
+    global _validators
+    with _validators_lock:
+        if _validators is None:
+            _validators = ValidatorStore()
+        return _validators
+
+
+# ----------------------------------------------------
+# FETCH
+# ----------------------------------------------------
+@dataclass
+class FetchResult:
+    url: str
+    status_code: int
+    headers: httpx.Headers = field(default_factory=httpx.Headers)
+    content: bytes = b""
+    encoding: str = "utf-8"
+    not_modified: bool = False
+    truncated: bool = False
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise httpx.HTTPStatusError(
+                f"HTTP {self.status_code} for {self.url}",
+                request=httpx.Request("GET", self.url),
+                response=httpx.Response(self.status_code),
+            )
+
+
+def _conditional_headers(url: str, headers: Optional[Dict[str, str]]) -> Tuple[Dict[str, str], Optional[Dict[str, Any]]]:
+    merged = dict(headers or {})
+    stored = get_validator_store().get(url)
+    if stored is not None:
+        if stored["etag"]:
+            merged["If-None-Match"] = stored["etag"]
+        if stored["last_modified"]:
+            merged["If-Modified-Since"] = stored["last_modified"]
+    return merged, stored
+
+
+def _body_too_large(res: httpx.Response, max_bytes: Optional[int]) -> bool:
+    if not max_bytes:
+        return False
+    try:
+        return int(res.headers.get("content-length", "0")) > max_bytes
+    except ValueError:
+        return False
+
+
+def _finish(url: str, res: httpx.Response, chunks: list, truncated: bool,
+            stored: Optional[Dict[str, Any]]) -> FetchResult:
+    headers = httpx.Headers(res.headers)
+    if res.status_code == 304 and stored is not None:
+        if stored["content_type"] and "content-type" not in headers:
+            headers["content-type"] = stored["content_type"]
+        return FetchResult(url=str(res.url), status_code=200, headers=headers,
+                           content=stored["body"], not_modified=True)
+
+    return FetchResult(
+        url=str(res.url),
+        status_code=res.status_code,
+        headers=headers,
+        content=b"".join(chunks),
+        encoding=res.encoding or "utf-8",
+        truncated=truncated,
+    )
+
+
+def _cacheable(result: FetchResult, conditional: bool) -> bool:
+    return (conditional and result.status_code == 200 and not result.not_modified
+            and not result.truncated
+            and bool(result.headers.get("etag") or result.headers.get("last-modified")))
+
+
+def _remember(url: str, result: FetchResult) -> None:
+    get_validator_store().put(url, result.headers.get("etag"), result.headers.get("last-modified"),
+                              result.headers.get("content-type", ""), result.content)
+
+
+@contextmanager
+def _observed(method: str) -> Iterator[Dict[str, str]]:
+    """Count and time one request; callers set outcome["result"] on success."""
+    outcome = {"result": "error"}
+    started = time.perf_counter()
+    try:
+        yield outcome
+    finally:
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=method.upper())
+        HTTP_REQUESTS.inc(method=method.upper(), result=outcome["result"])
+
+
+def _observe_result(outcome: Dict[str, str], result: "FetchResult") -> "FetchResult":
+    outcome["result"] = http_result(result.status_code, result.not_modified)
+    return result
+
+
+def fetch(url: str,
+          method: str = "GET",
+          params: Optional[Dict[str, Any]] = None,
+          json: Any = None,
+          headers: Optional[Dict[str, str]] = None,
+          conditional: bool = False,
+          max_bytes: Optional[int] = HTTP_MAX_BODY_BYTES,
+          timeout: Optional[float] = None) -> FetchResult:
+    """
+    Pooled, compressed request with a body-size cap. With conditional=True
+    a stored ETag/Last-Modified is replayed and a 304 returns the stored
+    body with not_modified=True. Transport errors propagate (httpx.HTTPError).
+    """
+    stored = None
+    if conditional and method.upper() == "GET":
+        headers, stored = _conditional_headers(url, headers)
+
+    chunks, size, truncated = [], 0, False
+    with _observed(method) as outcome:
+        with get_client().stream(method, url, params=params, json=json, headers=headers,
+                                 timeout=make_timeout(timeout)) as res:
+            if _body_too_large(res, max_bytes):
+                truncated = True
+            else:
+                for chunk in res.iter_bytes():
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if max_bytes and size >= max_bytes:
+                        truncated = True
+                        break
+            result = _finish(url, res, chunks, truncated, stored)
+        if _cacheable(result, conditional):
+            _remember(url, result)
+        return _observe_result(outcome, result)
+
+
+async def fetch_async(url: str,
+                      method: str = "GET",
+                      params: Optional[Dict[str, Any]] = None,
+                      json: Any = None,
+                      headers: Optional[Dict[str, str]] = None,
+                      conditional: bool = False,
+                      max_bytes: Optional[int] = HTTP_MAX_BODY_BYTES,
+                      timeout: Optional[float] = None) -> FetchResult:
+    """
+    Async counterpart of fetch() sharing the per-loop pooled client. The
+    validator store (SQLite) is read and written on a worker thread.
+    """
+    stored = None
+    if conditional and method.upper() == "GET":
+        headers, stored = await asyncio.to_thread(_conditional_headers, url, headers)
+
+    chunks, size, truncated = [], 0, False
+    with _observed(method) as outcome:
+        async with get_async_client().stream(method, url, params=params, json=json,
+                                             headers=headers, timeout=make_timeout(timeout)) as res:
+            if _body_too_large(res, max_bytes):
+                truncated = True
+            else:
+                async for chunk in res.aiter_bytes():
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if max_bytes and size >= max_bytes:
+                        truncated = True
+                        break
+            result = _finish(url, res, chunks, truncated, stored)
+        if _cacheable(result, conditional):
+            await asyncio.to_thread(_remember, url, result)
+        return _observe_result(outcome, result)
+
+
+def stream_lines(url: str,
+                 method: str = "POST",
+                 json: Any = None,
+                 params: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None) -> Iterator[str]:
+    """
+    Yield non-empty response lines as they arrive (NDJSON / SSE consumers).
+    Raises httpx.HTTPStatusError on a non-2xx status.
+    """
+    with get_client().stream(method, url, json=json, params=params,
+                             timeout=make_timeout(timeout)) as res:
+        if res.status_code >= 400:
+            res.read()
+            res.raise_for_status()
+        for line in res.iter_lines():
+            if line:
+                yield line
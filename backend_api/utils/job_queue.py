@@ -0,0 +1,386 @@
+# backend_api/utils/job_queue.py
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", ".cache/jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+# a running job is owned by one process for this long and renewed while it
+# runs; only an expired lease lets another process take the job over
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+Handler = Callable[[Dict[str, Any]], Any]
+
+
+# ----------------------------------------------------
+# SQLITE STATE
+# ----------------------------------------------------
+class JobStore:
+    """
+    Durable job records. Payloads and results are stored as JSON so a
+    restart (or a different worker process) can pick them back up.
+
+    A running job carries its owner and a lease expiry. Claims are a
+    single UPDATE, so of several processes sharing the file exactly one
+    runs a job, and a running job is only taken over once its lease has
+    expired (its owner died or stopped renewing).
+    """
+
+    COLUMNS = ("job_id", "kind", "status", "idempotency_key", "payload", "result",
+               "error", "created_at", "started_at", "finished_at", "owner", "lease_expires")
+
+    def __init__(self, path: str = JOB_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                idempotency_key TEXT UNIQUE,
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                owner TEXT,
+                lease_expires REAL
+            )
+            """
+        )
+        # files created before leases existed
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("owner", "TEXT"), ("lease_expires", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs(finished_at)")
+        self._conn.commit()
+
+    def _row_to_job(self, row: Optional[tuple]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(zip(self.COLUMNS, row))
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def create(self, kind: str, payload: Dict[str, Any],
+               idempotency_key: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Insert a queued job. If `idempotency_key` was already used, the
+        existing job is returned instead and the flag is False.
+        """
+        with self._lock:
+            if idempotency_key:
+                row = self._conn.execute(
+                    f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE idempotency_key = ?",
+                    (idempotency_key,),
+                ).fetchone()
+                if row is not None:
+                    return self._row_to_job(row), False
+
+            job_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, kind, status, idempotency_key, payload, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, idempotency_key, json.dumps(payload), time.time()),
+            )
+            self._conn.commit()
+        return self.get(job_id), True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_job(row)
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        query = f"SELECT {', '.join(self.COLUMNS)} FROM jobs"
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, params + (limit,)).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Queued jobs, plus running jobs whose lease has expired."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs "
+                "WHERE status = ? OR (status = ? AND COALESCE(lease_expires, 0) < ?) ORDER BY created_at",
+                (QUEUED, RUNNING, time.time()),
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def expired(self) -> List[str]:
+        """Ids of running jobs whose owner stopped renewing their lease."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id FROM jobs WHERE status = ? AND COALESCE(lease_expires, 0) < ? ORDER BY created_at",
+                (RUNNING, time.time()),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def mark_running(self, job_id: str, owner: str, lease_seconds: float = JOB_LEASE_SECONDS) -> bool:
+        """
+        Claim a job for `owner`: only a queued job or a running one whose
+        lease has expired. False if it was cancelled, finished or is held
+        by a live owner.
+        """
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, owner = ?, lease_expires = ? "
+                "WHERE job_id = ? AND (status = ? OR (status = ? AND COALESCE(lease_expires, 0) < ?))",
+                (RUNNING, now, owner, now + lease_seconds, job_id, QUEUED, RUNNING, now),
+            )
+            self._conn.commit()
+            return cur.rowcount == 1
+
+    def renew(self, job_ids: List[str], owner: str, lease_seconds: float = JOB_LEASE_SECONDS) -> int:
+        """Extend the leases `owner` still holds; returns how many were extended."""
+        if not job_ids:
+            return 0
+        marks = ", ".join("?" * len(job_ids))
+        with self._lock:
+            cur = self._conn.execute(
+                f"UPDATE jobs SET lease_expires = ? WHERE status = ? AND owner = ? AND job_id IN ({marks})",
+                (time.time() + lease_seconds, RUNNING, owner, *job_ids),
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+    def finish(self, job_id: str, status: str, result: Any = None,
+               error: Optional[str] = None, owner: Optional[str] = None) -> bool:
+        """
+        Record the outcome unless the job already finished (e.g. was
+        cancelled). With `owner`, only while that owner still holds the job.
+        """
+        query = ("UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_expires = NULL "
+                 "WHERE job_id = ? AND status NOT IN (?, ?, ?)")
+        params: tuple = (status, json.dumps(result) if result is not None else None, error,
+                         time.time(), job_id, *FINISHED)
+        if owner is not None:
+            query += " AND owner = ?"
+            params += (owner,)
+        with self._lock:
+            cur = self._conn.execute(query, params)
+            self._conn.commit()
+            return cur.rowcount == 1
+
+    def purge(self, older_than: float) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                (older_than,),
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+
+def scoped_key(kind: str, payload: Dict[str, Any], idempotency_key: Optional[str]) -> Optional[str]:
+    """
+    An Idempotency-Key only matches a retry of the same kind and payload;
+    reusing it for a different request creates a new job.
+    """
+    if not idempotency_key:
+        return None
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{kind}:{digest[:32]}:{idempotency_key}"
+
+
+# ----------------------------------------------------
+# WORKER POOL
+# ----------------------------------------------------
+class JobQueue:
+    """
+    Thread-pool executor over a JobStore. Handlers are registered per job
+    kind and receive the stored payload; their return value (JSON-able)
+    becomes the job result.
+
+    Cancelling a queued job stops it from starting. A running job cannot
+    be interrupted, but its result is discarded once it is cancelled.
+    Finished jobs older than `retention_seconds` are purged on submit.
+    The JobStore is opened on first use.
+
+    Each queue is a lease owner: a heartbeat thread renews the leases of
+    the jobs it is running every third of `lease_seconds` and picks up
+    running jobs whose lease expired elsewhere.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None, workers: int = JOB_WORKERS,
+                 retention_seconds: int = JOB_RETENTION_SECONDS,
+                 lease_seconds: float = JOB_LEASE_SECONDS):
+        self._store = store
+        self.retention_seconds = retention_seconds
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._workers = workers
+        self._handlers: Dict[str, Handler] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[str, Future] = {}
+        self._events: Dict[str, threading.Event] = {}
+        self._running: Set[str] = set()
+        self._heartbeat: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def store(self) -> JobStore:
+        with self._lock:
+            if self._store is None:
+                self._store = JobStore()
+            return self._store
+
+    def register(self, kind: str, handler: Handler) -> None:
+        self._handlers[kind] = handler
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self._workers,
+                                                thread_name_prefix="job-worker")
+                self._stopping.clear()
+                self._heartbeat = threading.Thread(target=self._beat, name="job-heartbeat", daemon=True)
+                self._heartbeat.start()
+            return self._pool
+
+    def _beat(self) -> None:
+        while not self._stopping.wait(self.lease_seconds / 3):
+            with self._lock:
+                running = list(self._running)
+            try:
+                self.store.renew(running, self.owner, self.lease_seconds)
+                for job_id in self.store.expired():
+                    if self._stopping.is_set():
+                        return
+                    self._enqueue(job_id)
+            except sqlite3.Error:
+                # a locked or unavailable file is retried on the next beat
+                continue
+
+    def _event(self, job_id: str) -> threading.Event:
+        with self._lock:
+            return self._events.setdefault(job_id, threading.Event())
+
+    def _notify(self, job_id: str) -> None:
+        with self._lock:
+            event = self._events.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    def _execute(self, job_id: str) -> None:
+        if not self.store.mark_running(job_id, self.owner, self.lease_seconds):
+            self._notify(job_id)
+            return
+        with self._lock:
+            self._running.add(job_id)
+        try:
+            job = self.store.get(job_id)
+            try:
+                handler = self._handlers[job["kind"]]
+                result = handler(job["payload"])
+            except Exception as exc:
+                self.store.finish(job_id, FAILED, error=str(exc), owner=self.owner)
+            else:
+                self.store.finish(job_id, DONE, result=result, owner=self.owner)
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+        self._notify(job_id)
+
+    def _forget(self, job_id: str) -> None:
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+    def _enqueue(self, job_id: str) -> None:
+        pool = self._executor()
+        with self._lock:
+            if job_id in self._futures or job_id in self._running:
+                return
+            future = pool.submit(self._execute, job_id)
+            self._futures[job_id] = future
+        # runs at once if the job already finished, so the entry never outlives it
+        future.add_done_callback(lambda _: self._forget(job_id))
+
+    def start(self) -> int:
+        """
+        Resume queued jobs and running jobs whose lease expired (their
+        process is gone). Jobs another live process holds are left alone.
+        Returns how many were requeued.
+        """
+        pending = self.store.pending()
+        for job in pending:
+            self._enqueue(job["job_id"])
+        return len(pending)
+
+    def submit(self, kind: str, payload: Dict[str, Any],
+               idempotency_key: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        self.store.purge(time.time() - self.retention_seconds)
+        job, created = self.store.create(kind, payload, scoped_key(kind, payload, idempotency_key))
+        if created:
+            self._enqueue(job["job_id"])
+        return job, created
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.cancel()
+        if self.store.finish(job_id, CANCELLED):
+            self._notify(job_id)
+        return self.store.get(job_id)
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Block until the job finishes or `timeout` elapses, then return its
+        current record (long-poll style subscription).
+        """
+        event = self._event(job_id)
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINISHED:
+            self._notify(job_id)
+            return job
+        event.wait(timeout)
+        return self.store.get(job_id)
+
+    def shutdown(self) -> None:
+        self._stopping.set()
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,160 @@
+# backend_api/utils/json_repair.py
+
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+MAX_REPAIR_ATTEMPTS = 64
+
+_metrics_lock = threading.Lock()
+_metrics = {
+    "parsed": 0,         # strict json.loads succeeded
+    "repaired": 0,       # needed the lenient repair pass
+    "failed": 0,         # nothing salvageable
+    "incomplete": 0,     # parsed, but keys from the template were missing
+    "continuations": 0,  # follow-up prompts sent for missing keys
+    "completed": 0,      # follow-up filled every missing key
+}
+
+
+def count(name: str, value: int = 1) -> None:
+    with _metrics_lock:
+        _metrics[name] += value
+
+
+def repair_stats() -> Dict[str, int]:
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+# ----------------------------------------------------
+# LENIENT PARSING
+# ----------------------------------------------------
+def _scan(text: str) -> Tuple[str, List[Tuple[int, str]], bool]:
+    """
+    Normalize `text` from its first "{" and record places where it could
+    be cut and closed. Returns (normalized text, [(cut index, open
+    brackets at that point)], whether the top-level object closed).
+
+    Trailing commas before "}" / "]" are dropped on the way; everything
+    after the top-level object closes is ignored.
+    """
+    start = text.find("{")
+    if start == -1:
+        return "", [], False
+
+    out: List[str] = []
+    cuts: List[Tuple[int, str]] = []
+    stack: List[str] = []
+    in_str = escape = False
+
+    for c in text[start:]:
+        if in_str:
+            out.append(c)
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_str = False
+                cuts.append((len(out), "".join(stack)))
+            continue
+
+        if c == '"':
+            in_str = True
+            out.append(c)
+        elif c in "{[":
+            stack.append(c)
+            out.append(c)
+            cuts.append((len(out), "".join(stack)))
+        elif c in "}]":
+            while out and out[-1] in " \t\r\n,":
+                out.pop()
+            if not stack:
+                break
+            stack.pop()
+            out.append(c)
+            if not stack:
+                return "".join(out), cuts, True
+            cuts.append((len(out), "".join(stack)))
+        elif c == ",":
+            cuts.append((len(out), "".join(stack)))
+            out.append(c)
+        else:
+            out.append(c)
+
+    if in_str:
+        # close a string cut off mid-way; it may be a usable value
+        out.append('"')
+        cuts.append((len(out), "".join(stack)))
+    return "".join(out), cuts, False
+
+
+def _closers(stack: str) -> str:
+    return "".join("}" if c == "{" else "]" for c in reversed(stack))
+
+
+def repair(text: str) -> Tuple[Optional[Any], bool]:
+    """
+    Best-effort parse of a JSON object that may be wrapped in prose or
+    code fences, contain trailing commas, or be truncated (e.g. at
+    max_output_tokens). Truncated output is cut back to the last complete
+    value and the open brackets are closed.
+
+    Returns (value or None, truncated). When truncated, the last
+    top-level value may itself be cut short.
+    """
+    normalized, cuts, closed = _scan(text)
+    if not normalized:
+        return None, False
+    if closed:
+        try:
+            return json.loads(normalized), False
+        except ValueError:
+            pass
+
+    for cut, stack in reversed(cuts[-MAX_REPAIR_ATTEMPTS:]):
+        candidate = normalized[:cut].rstrip().rstrip(",").rstrip()
+        if candidate.endswith(":"):
+            continue
+        try:
+            return json.loads(candidate + _closers(stack)), not closed
+        except ValueError:
+            continue
+    return None, not closed
+
+
+def repair_json(text: str) -> Optional[Any]:
+    return repair(text)[0]
+
+
+# ----------------------------------------------------
+# TEMPLATE VALIDATION
+# ----------------------------------------------------
+def missing_keys(result: Any, template: Dict[str, Any]) -> List[str]:
+    """
+    Top-level template keys that are absent from `result` or whose value
+    has the wrong container type (object vs. array).
+    """
+    if not isinstance(result, dict):
+        return list(template)
+    missing = []
+    for key, expected in template.items():
+        if key not in result:
+            missing.append(key)
+        elif isinstance(expected, dict) and not isinstance(result[key], dict):
+            missing.append(key)
+        elif isinstance(expected, list) and not isinstance(result[key], list):
+            missing.append(key)
+    return missing
+
+
+def continuation_prompt(user_prompt: str, done_keys: List[str], missing: List[str]) -> str:
+    """User prompt asking only for the keys a truncated reply did not cover."""
+    done = ", ".join(done_keys) or "none"
+    return (
+        f"{user_prompt.strip()}\n\n"
+        f"A previous reply already covered these keys: {done}.\n"
+        f"Return ONLY the remaining keys ({', '.join(missing)}) as one JSON object, "
+        "keeping it consistent with the request above."
+    )
@@ -0,0 +1,151 @@
+# backend_api/utils/json_stream.py
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONParser:
+    """
+    Scan a JSON object as it streams in and report pieces as soon as they
+    close, without re-parsing the whole buffer on every chunk:
+
+      {"event": "section", "key": k, "value": v}
+          a top-level key/value pair is complete
+      {"event": "item", "key": k, "index": i, "value": v}
+          an element of a top-level array listed in `item_keys` is complete
+
+    Anything before the first "{" (code fences, a stray "json" prefix) is
+    ignored, which matches what _clean_to_json() strips.
+    """
+
+    def __init__(self, item_keys: Iterable[str] = ()):
+        self.item_keys = set(item_keys)
+        self._text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._started = False
+        self._in_str = False
+        self._escape = False
+        self._expect = "key"  # key -> colon -> value -> in_value -> after_value
+        self._key: Optional[str] = None
+        self._key_start = 0
+        self._value_start = 0
+        self._item_start: Optional[int] = None
+        self._item_index = 0
+        self.done = False
+
+    # Malformed fragments are skipped here; the caller still parses the
+    # full text at the end and reports errors there.
+    def _emit_section(self, events: List[Dict[str, Any]], end: int) -> None:
+        raw = self._text[self._value_start:end].strip()
+        try:
+            events.append({"event": "section", "key": self._key, "value": json.loads(raw)})
+        except ValueError:
+            pass
+
+    def _emit_item(self, events: List[Dict[str, Any]], end: int) -> None:
+        raw = self._text[self._item_start:end].strip()
+        self._item_start = None
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        events.append({"event": "item", "key": self._key, "index": self._item_index,
+                       "value": value})
+        self._item_index += 1
+
+    def _tracking_items(self) -> bool:
+        return (len(self._stack) == 2 and self._stack[1] == "["
+                and self._key in self.item_keys)
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        if self.done or not chunk:
+            return []
+        self._text += chunk
+        events: List[Dict[str, Any]] = []
+        text = self._text
+
+        for i in range(self._pos, len(text)):
+            c = text[i]
+
+            if not self._started:
+                if c == "{":
+                    self._started = True
+                    self._stack.append("{")
+                continue
+
+            if self._in_str:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_str = False
+                    if len(self._stack) == 1 and self._expect == "key":
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._expect = "colon"
+                continue
+
+            if c in WHITESPACE:
+                continue
+
+            depth = len(self._stack)
+
+            # A new value / array item begins
+            if depth == 1 and self._expect == "value":
+                self._value_start = i
+                self._expect = "in_value"
+                self._item_index = 0
+            elif self._tracking_items() and self._item_start is None and c not in ",]":
+                self._item_start = i
+
+            if c == '"':
+                self._in_str = True
+                if depth == 1 and self._expect == "key":
+                    self._key_start = i
+            elif c in "{[":
+                self._stack.append(c)
+            elif c in "}]":
+                if depth == 2 and self._tracking_items() and self._item_start is not None:
+                    # primitive last item: [1, 2, 3]
+                    self._emit_item(events, i)
+                self._stack.pop()
+                depth = len(self._stack)
+                if depth == 0:
+                    if self._expect == "in_value":
+                        self._emit_section(events, i)
+                    self.done = True
+                    self._pos = i + 1
+                    return events
+                if depth == 2 and self._tracking_items() and self._item_start is not None:
+                    self._emit_item(events, i + 1)
+                elif depth == 1 and self._expect == "in_value":
+                    self._emit_section(events, i + 1)
+                    self._expect = "after_value"
+            elif c == ":" and depth == 1 and self._expect == "colon":
+                self._expect = "value"
+            elif c == ",":
+                if depth == 1:
+                    if self._expect == "in_value":
+                        self._emit_section(events, i)
+                    self._expect = "key"
+                elif depth == 2 and self._tracking_items() and self._item_start is not None:
+                    self._emit_item(events, i)
+
+        self._pos = len(text)
+        return events
+
+
+def events_from_result(result: Dict[str, Any], item_keys: Iterable[str] = ()) -> Iterator[Dict[str, Any]]:
+    """
+    Replay an already-parsed result (e.g. a cache hit) as the same event
+    sequence IncrementalJSONParser would have produced.
+    """
+    item_keys = set(item_keys)
+    for key, value in result.items():
+        if key in item_keys and isinstance(value, list):
+            for index, item in enumerate(value):
+                yield {"event": "item", "key": key, "index": index, "value": item}
+        yield {"event": "section", "key": key, "value": value}
@@ -0,0 +1,257 @@
+# backend_api/utils/keyword_clusters.py
+
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from .keyword_text import normalize_keyword, stem
+
+# Cosine similarity (TF-IDF over stemmed word 1-2 grams) that joins two keywords
+KEYWORD_CLUSTER_THRESHOLD = float(os.getenv("KEYWORD_CLUSTER_THRESHOLD", "0.5"))
+# Shared organic results that join two keywords regardless of wording
+KEYWORD_CLUSTER_MIN_SHARED_URLS = int(os.getenv("KEYWORD_CLUSTER_MIN_SHARED_URLS", "2"))
+# Features in more than this share of keywords ("best", "how to", ...) still
+# weigh into similarity but do not generate candidate pairs on their own;
+# keeps the sparse self-product near-linear on large sets.
+PAIR_MAX_DF_RATIO = 0.02
+PAIR_MIN_DF_CAP = 50
+
+
+class _Deduped:
+    """Unique keywords with their stemmed token ids (flat, CSR-style offsets)."""
+
+    def __init__(self):
+        self.surfaces: List[str] = []
+        self.variants: List[List[str]] = []
+        self.token_ids: List[int] = []
+        self.offsets: List[int] = [0]
+        self.vocab_size = 0
+
+
+def _dedupe(keywords: Iterable[str]) -> _Deduped:
+    """
+    Fold keywords that differ only in case, punctuation, word order or
+    inflection, keeping the first surface form and every variant.
+    """
+    out = _Deduped()
+    index: Dict[Tuple[int, ...], int] = {}
+    seen: Dict[str, int] = {}
+    token_id: Dict[str, int] = {}
+    for keyword in keywords:
+        slot = seen.get(keyword)
+        if slot is not None:
+            continue
+        normalized = normalize_keyword(keyword)
+        if not normalized:
+            continue
+        ids = []
+        for word in normalized.split():
+            tid = token_id.get(word)
+            if tid is None:
+                stemmed = stem(word)
+                tid = token_id.get(stemmed)
+                if tid is None:
+                    tid = token_id[stemmed] = len(token_id)
+                token_id[word] = tid
+            ids.append(tid)
+        key = tuple(sorted(ids))
+        slot = index.get(key)
+        if slot is None:
+            slot = index[key] = len(out.surfaces)
+            out.surfaces.append(normalized)
+            out.variants.append([keyword])
+            out.token_ids.extend(ids)
+            out.offsets.append(len(out.token_ids))
+        else:
+            out.variants[slot].append(keyword)
+        seen[keyword] = slot
+    out.vocab_size = len(token_id)
+    return out
+
+
+def _tfidf(deduped: _Deduped) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    L2-normalised binary TF-IDF rows over word unigrams and bigrams, plus
+    document frequencies. Bigram columns come from np.unique over
+    (left id * vocab + right id), so no per-keyword Python work is needed.
+    """
+    n = len(deduped.surfaces)
+    ids = np.asarray(deduped.token_ids, dtype=np.int64)
+    offsets = np.asarray(deduped.offsets, dtype=np.int64)
+    row_of = np.repeat(np.arange(n), np.diff(offsets))
+
+    # a bigram starts at every token that is not the last of its keyword
+    starts = np.ones(len(ids), dtype=bool)
+    starts[offsets[1:] - 1] = False
+    left = np.flatnonzero(starts)
+    bigram_keys = ids[left] * deduped.vocab_size + ids[left + 1]
+    bigram_vocab, bigram_cols = np.unique(bigram_keys, return_inverse=True)
+
+    rows = np.concatenate([row_of, row_of[left]])
+    cols = np.concatenate([ids, deduped.vocab_size + bigram_cols])
+    shape = (n, deduped.vocab_size + len(bigram_vocab))
+    matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=shape)
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+
+    df = np.bincount(matrix.indices, minlength=shape[1])
+    idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+    matrix.data *= idf[matrix.indices]
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    matrix.data /= np.repeat(norms, np.diff(matrix.indptr)).astype(np.float32)
+    return matrix, df
+
+
+def _similarity_edges(matrix: sparse.csr_matrix, df: np.ndarray, threshold: float) -> sparse.csr_matrix:
+    """
+    Pairs with cosine >= threshold. Candidates come from the self-product
+    over the rarer features; the common features can add at most
+    |common_i| * |common_j| (Cauchy-Schwarz), so only candidates that could
+    still reach the threshold are rescored on the full vectors.
+    """
+    n = matrix.shape[0]
+    cap = max(PAIR_MIN_DF_CAP, int(PAIR_MAX_DF_RATIO * n))
+    rare = df <= cap
+    blocking = matrix[:, np.flatnonzero(rare)]
+    common = matrix[:, np.flatnonzero(~rare)]
+    common_norm = np.sqrt(np.asarray(common.multiply(common).sum(axis=1)).ravel())
+
+    candidates = sparse.triu(blocking @ blocking.T, k=1).tocoo()
+    rows, cols, partial = candidates.row, candidates.col, candidates.data
+    bound = partial + common_norm[rows] * common_norm[cols]
+    sure = partial >= threshold
+    maybe = ~sure & (bound >= threshold)
+    sims = partial.copy()
+    if maybe.any():
+        r, c = rows[maybe], cols[maybe]
+        sims[maybe] += np.asarray(common[r].multiply(common[c]).sum(axis=1)).ravel()
+    if sure.any():
+        r, c = rows[sure], cols[sure]
+        sims[sure] += np.asarray(common[r].multiply(common[c]).sum(axis=1)).ravel()
+    keep = sims >= threshold
+    edges = sparse.csr_matrix((sims[keep], (rows[keep], cols[keep])), shape=(n, n))
+    return (edges + edges.T).tocsr()
+
+
+def _star_clusters(graph: sparse.csr_matrix, lengths: np.ndarray) -> np.ndarray:
+    """
+    Star clustering: the best-connected unassigned keyword becomes a centre
+    and takes all its unassigned neighbours. Clusters have diameter <= 2,
+    so loosely related keywords are not chained into one giant group.
+    """
+    n = graph.shape[0]
+    degree = np.diff(graph.indptr)
+    strength = np.asarray(graph.sum(axis=1)).ravel()
+    order = np.lexsort((lengths, -strength, -degree))
+    labels = np.full(n, -1, dtype=np.int64)
+    indptr, indices = graph.indptr, graph.indices
+    cluster = 0
+    for node in order.tolist():
+        if labels[node] != -1:
+            continue
+        labels[node] = cluster
+        neighbours = indices[indptr[node]:indptr[node + 1]]
+        if len(neighbours):
+            labels[neighbours[labels[neighbours] == -1]] = cluster
+        cluster += 1
+    return labels
+
+
+def _serp_edges(keywords: List[str], variants: List[List[str]],
+                serp_urls: Dict[str, List[str]], min_shared: int) -> Optional[sparse.csr_matrix]:
+    """Keyword x URL incidence; pairs sharing >= min_shared organic results are joined."""
+    if not serp_urls or min_shared <= 0:
+        return None
+    lookup = {normalize_keyword(k): urls for k, urls in serp_urls.items()}
+    url_ids: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    for row, forms in enumerate(variants):
+        urls = set()
+        for form in [keywords[row]] + forms:
+            urls.update(lookup.get(normalize_keyword(form), ()))
+        for url in urls:
+            rows.append(row)
+            cols.append(url_ids.setdefault(url, len(url_ids)))
+    if not rows:
+        return None
+    incidence = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                                  shape=(len(keywords), len(url_ids)))
+    shared = (incidence @ incidence.T).tocsr()
+    shared.data[shared.data < min_shared] = 0
+    shared.eliminate_zeros()
+    return shared
+
+
+def cluster_keywords(keywords: Iterable[str],
+                     serp_urls: Optional[Dict[str, List[str]]] = None,
+                     threshold: float = KEYWORD_CLUSTER_THRESHOLD,
+                     min_shared_urls: int = KEYWORD_CLUSTER_MIN_SHARED_URLS) -> Dict[str, Any]:
+    """
+    Deduplicate keywords and group them into topics.
+
+    Keywords are normalised and stemmed; exact token-bag duplicates fold
+    into one entry. Two keywords are linked when the cosine similarity of
+    their TF-IDF word n-gram vectors reaches `threshold`, or when
+    `serp_urls` (keyword -> organic result URLs) shows them sharing at
+    least `min_shared_urls` results; clusters are stars around the
+    best-connected keywords (see _star_clusters).
+    Each cluster's head is the member closest to the cluster centroid
+    (shorter keywords win ties).
+    """
+    started = time.perf_counter()
+    keywords = list(keywords)
+    deduped = _dedupe(keywords)
+    surfaces, variants = deduped.surfaces, deduped.variants
+    n = len(surfaces)
+    if n == 0:
+        return {"clusters": [], "stats": {"keywords": len(keywords), "unique_keywords": 0,
+                                          "clusters": 0, "elapsed_ms": 0.0}}
+
+    matrix, df = _tfidf(deduped)
+    graph = _similarity_edges(matrix, df, threshold)
+    serp_graph = _serp_edges(surfaces, variants, serp_urls or {}, min_shared_urls)
+    if serp_graph is not None:
+        graph = graph + serp_graph
+    lengths = np.diff(np.asarray(deduped.offsets)).astype(np.float32)
+    labels = _star_clusters(graph.tocsr(), lengths)
+    n_clusters = int(labels.max()) + 1
+
+    # centroid of each cluster, then each keyword's affinity to its own centroid
+    membership = sparse.csr_matrix((np.ones(n, dtype=np.float32), (labels, np.arange(n))),
+                                   shape=(n_clusters, n))
+    centroids = membership @ matrix
+    affinity = np.asarray(matrix.multiply(centroids[labels]).sum(axis=1)).ravel()
+    order = np.lexsort((lengths, -affinity, labels))
+    starts = np.flatnonzero(np.r_[True, labels[order][1:] != labels[order][:-1]])
+    heads = order[starts]
+    sizes = np.bincount(labels, minlength=n_clusters)
+
+    members: List[List[int]] = [[] for _ in range(n_clusters)]
+    for index in order.tolist():
+        members[labels[index]].append(index)
+
+    clusters = []
+    for cluster in np.argsort(-sizes, kind="stable").tolist():
+        rows = members[cluster]
+        clusters.append({
+            "head": surfaces[heads[cluster]],
+            "keywords": [surfaces[i] for i in rows],
+            "size": len(rows),
+            "variants": sum(len(variants[i]) for i in rows),
+        })
+
+    return {
+        "clusters": clusters,
+        "stats": {
+            "keywords": len(keywords),
+            "unique_keywords": n,
+            "duplicates_removed": len(keywords) - n,
+            "clusters": n_clusters,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    }
@@ -0,0 +1,340 @@
+# backend_api/utils/keyword_index.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .keyword_text import normalize_keyword, trigrams
+
+KEYWORD_INDEX_PATH = os.getenv("KEYWORD_INDEX_PATH", ".cache/keyword_index.sqlite3")
+# Share of trigrams two keywords must have in common (Jaccard) to count as related
+KEYWORD_INDEX_MIN_SIMILARITY = float(os.getenv("KEYWORD_INDEX_MIN_SIMILARITY", "0.3"))
+
+# keyword sources, in the order a lookup lists them
+SOURCES = ("seed", "core", "long_tail")
+
+
+class KeywordIndex:
+    """
+    Every keyword research run (seeds, Gemini's core/long-tail keywords
+    and the SERP titles/snippets behind them) folded into one SQLite file.
+
+    keywords is keyed by the normalised keyword, so its primary-key B-tree
+    doubles as the sorted array for prefix range scans; trigrams is a
+    WITHOUT ROWID inverted index (trigram -> keyword ids) for fuzzy lookups.
+    Posting lists are cached as NumPy arrays once read and extended on
+    ingest, so repeated lookups never go back to disk.
+    """
+
+    def __init__(self, path: str = KEYWORD_INDEX_PATH):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, np.ndarray] = {}
+        self._gram_counts: Optional[np.ndarray] = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY,
+                business_info TEXT NOT NULL,
+                product_info TEXT NOT NULL,
+                audience TEXT NOT NULL,
+                seed_keywords TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS keywords (
+                keyword TEXT PRIMARY KEY,
+                id INTEGER NOT NULL UNIQUE,
+                surface TEXT NOT NULL,
+                sources TEXT NOT NULL,
+                gram_count INTEGER NOT NULL,
+                runs INTEGER NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS keyword_runs (
+                keyword_id INTEGER NOT NULL,
+                run_id INTEGER NOT NULL,
+                PRIMARY KEY (keyword_id, run_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS trigrams (
+                gram TEXT NOT NULL,
+                keyword_id INTEGER NOT NULL,
+                PRIMARY KEY (gram, keyword_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS serp_results (
+                run_id INTEGER NOT NULL,
+                query TEXT NOT NULL,
+                title TEXT NOT NULL,
+                snippet TEXT NOT NULL,
+                link TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS serp_results_run ON serp_results (run_id);
+            """
+        )
+        self._conn.commit()
+
+    # ----------------------------------------------------
+    # INGESTION
+    # ----------------------------------------------------
+    def ingest(self, business_info: str, product_info: str, audience: str,
+               seed_keywords: List[str], ai_keywords: Dict[str, Any],
+               serp_results: List[Dict[str, Any]]) -> int:
+        """Record one research run; returns its run id."""
+        now = time.time()
+        default_query = f"{product_info} {audience}"
+        found: Dict[str, Dict[str, Any]] = {}
+
+        def _add(keyword: Any, source: str) -> None:
+            if not isinstance(keyword, str):
+                return
+            normalized = normalize_keyword(keyword)
+            if normalized:
+                entry = found.setdefault(normalized, {"surface": keyword.strip(), "sources": set()})
+                entry["sources"].add(source)
+
+        for keyword in seed_keywords:
+            _add(keyword, "seed")
+        for keyword in ai_keywords.get("core_keywords") or []:
+            _add(keyword, "core")
+        for keyword in ai_keywords.get("long_tail_keywords") or []:
+            _add(keyword, "long_tail")
+        serp_rows = []
+        for result in serp_results:
+            query = (result.get("matched_queries") or [default_query])[0]
+            serp_rows.append((query, result.get("title") or "",
+                              result.get("snippet") or "", result.get("link") or ""))
+
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO runs (business_info, product_info, audience, seed_keywords, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (business_info, product_info, audience, json.dumps(seed_keywords), now),
+            )
+            run_id = cur.lastrowid
+            next_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM keywords").fetchone()[0]
+            added: Dict[int, set] = {}
+            for normalized, entry in found.items():
+                row = self._conn.execute(
+                    "SELECT id, sources FROM keywords WHERE keyword = ?", (normalized,)
+                ).fetchone()
+                if row is None:
+                    keyword_id, next_id = next_id, next_id + 1
+                    grams = trigrams(normalized)
+                    self._conn.execute(
+                        "INSERT INTO keywords (keyword, id, surface, sources, gram_count, runs, "
+                        "first_seen, last_seen) VALUES (?, ?, ?, ?, ?, 1, ?, ?)",
+                        (normalized, keyword_id, entry["surface"],
+                         _join_sources(entry["sources"]), len(grams), now, now),
+                    )
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO trigrams (gram, keyword_id) VALUES (?, ?)",
+                        [(gram, keyword_id) for gram in grams],
+                    )
+                    added[keyword_id] = grams
+                else:
+                    keyword_id, sources = row
+                    self._conn.execute(
+                        "UPDATE keywords SET sources = ?, runs = runs + 1, last_seen = ? "
+                        "WHERE keyword = ?",
+                        (_join_sources(entry["sources"] | set(sources.split(","))), now, normalized),
+                    )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO keyword_runs (keyword_id, run_id) VALUES (?, ?)",
+                    (keyword_id, run_id),
+                )
+            self._conn.executemany(
+                "INSERT INTO serp_results (run_id, query, title, snippet, link) VALUES (?, ?, ?, ?, ?)",
+                [(run_id,) + row for row in serp_rows],
+            )
+            self._conn.commit()
+            self._extend_cache(added)
+        return run_id
+
+    def _extend_cache(self, added: Dict[int, set]) -> None:
+        if not added:
+            return
+        if self._gram_counts is not None:
+            counts = np.zeros(max(added) + 1, dtype=np.int32)
+            counts[:len(self._gram_counts)] = self._gram_counts
+            for keyword_id, grams in added.items():
+                counts[keyword_id] = len(grams)
+            self._gram_counts = counts
+        new: Dict[str, List[int]] = {}
+        for keyword_id, grams in added.items():
+            for gram in grams:
+                if gram in self._postings:
+                    new.setdefault(gram, []).append(keyword_id)
+        for gram, ids in new.items():
+            self._postings[gram] = np.concatenate([self._postings[gram],
+                                                   np.asarray(ids, dtype=np.int32)])
+
+    # ----------------------------------------------------
+    # LOOKUP
+    # ----------------------------------------------------
+    def prefix(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Known keywords starting with `query`, most frequently researched first."""
+        normalized = normalize_keyword(query)
+        if not normalized:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT keyword, surface, sources, runs, last_seen FROM keywords "
+                "WHERE keyword >= ? AND keyword < ? ORDER BY runs DESC, keyword LIMIT ?",
+                (normalized, normalized + "\uffff", limit),
+            ).fetchall()
+        return [_entry(row, 1.0) for row in rows]
+
+    def _load_counts(self) -> None:
+        if self._gram_counts is None:
+            rows = self._conn.execute("SELECT id, gram_count FROM keywords").fetchall()
+            counts = np.zeros(max((i for i, _ in rows), default=0) + 1, dtype=np.int32)
+            for keyword_id, count in rows:
+                counts[keyword_id] = count
+            self._gram_counts = counts
+
+    def _posting(self, gram: str) -> np.ndarray:
+        """Keyword ids containing `gram`, read from disk once and then cached."""
+        ids = self._postings.get(gram)
+        if ids is None:
+            rows = self._conn.execute(
+                "SELECT keyword_id FROM trigrams WHERE gram = ?", (gram,)
+            ).fetchall()
+            ids = self._postings[gram] = np.fromiter((r[0] for r in rows), dtype=np.int32,
+                                                     count=len(rows))
+        return ids
+
+    def related(self, query: str, limit: int = 20,
+                min_similarity: float = KEYWORD_INDEX_MIN_SIMILARITY) -> List[Dict[str, Any]]:
+        """
+        Known keywords sharing at least `min_similarity` of their trigrams
+        with `query` (Jaccard), best match first. Shared counts are one
+        bincount over the query trigrams' posting lists.
+        """
+        grams = trigrams(normalize_keyword(query))
+        if not grams:
+            return []
+        with self._lock:
+            self._load_counts()
+            counts = self._gram_counts
+            hits = np.concatenate([self._posting(gram) for gram in grams])
+        if not len(hits):
+            return []
+        shared = np.bincount(hits, minlength=len(counts))
+        ids = np.flatnonzero(shared)
+        scores = shared[ids] / (len(grams) + counts[ids] - shared[ids])
+        keep = scores >= min_similarity
+        ids, scores = ids[keep], scores[keep]
+        if len(ids) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            ids, scores = ids[top], scores[top]
+        if not len(ids):
+            return []
+        score_of = dict(zip(ids.tolist(), scores.tolist()))
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, keyword, surface, sources, runs, last_seen FROM keywords "
+                f"WHERE id IN ({','.join('?' * len(score_of))})",
+                list(score_of),
+            ).fetchall()
+        rows.sort(key=lambda row: (-score_of[row[0]], -row[4], row[1]))
+        return [_entry(row[1:], round(score_of[row[0]], 3)) for row in rows]
+
+    def lookup(self, query: str, limit: int = 20) -> Dict[str, Any]:
+        started = time.perf_counter()
+        prefix = self.prefix(query, limit)
+        seen = {entry["keyword"].lower() for entry in prefix}
+        related = [entry for entry in self.related(query, limit + len(prefix))
+                   if entry["keyword"].lower() not in seen][:limit]
+        return {
+            "query": query,
+            "prefix": prefix,
+            "related": related,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def seed_context(self, queries: Iterable[str], limit: int = 30,
+                     serp_limit: int = 10) -> Dict[str, Any]:
+        """
+        Known keywords related to any of `queries`, plus the stored SERP
+        results of the most recent runs that produced them, for prompting
+        without a fresh SerpAPI lookup.
+        """
+        best: Dict[str, Dict[str, Any]] = {}
+        for query in queries:
+            for entry in self.prefix(query, limit) + self.related(query, limit):
+                key = normalize_keyword(entry["keyword"])
+                if key not in best or entry["score"] > best[key]["score"]:
+                    best[key] = entry
+        keywords = sorted(best.values(), key=lambda e: (-e["score"], -e["runs"]))[:limit]
+        if not keywords:
+            return {"keywords": [], "serp_results": []}
+
+        names = [normalize_keyword(entry["keyword"]) for entry in keywords]
+        marks = ",".join("?" * len(names))
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT query, title, snippet, link FROM serp_results
+                WHERE run_id IN (
+                    SELECT DISTINCT kr.run_id FROM keyword_runs kr
+                    JOIN keywords k ON k.id = kr.keyword_id
+                    WHERE k.keyword IN ({marks})
+                )
+                ORDER BY run_id DESC
+                """,
+                names,
+            ).fetchall()
+        serp_results: List[Dict[str, Any]] = []
+        links = set()
+        for query, title, snippet, link in rows:
+            if (link or title) in links:
+                continue
+            links.add(link or title)
+            serp_results.append({"title": title, "snippet": snippet, "link": link,
+                                 "matched_queries": [query], "source": "keyword_index"})
+            if len(serp_results) >= serp_limit:
+                break
+        return {"keywords": keywords, "serp_results": serp_results}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            runs = self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+            keywords = self._conn.execute("SELECT COUNT(*) FROM keywords").fetchone()[0]
+        return {"runs": runs, "keywords": keywords}
+
+
+def _join_sources(sources: Iterable[str]) -> str:
+    return ",".join(s for s in SOURCES if s in sources)
+
+
+def _entry(row: tuple, score: float) -> Dict[str, Any]:
+    _, surface, sources, runs, last_seen = row
+    return {
+        "keyword": surface,
+        "score": score,
+        "sources": sources.split(","),
+        "runs": runs,
+        "last_seen": last_seen,
+    }
+
+
+_index: Optional[KeywordIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_keyword_index() -> KeywordIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = KeywordIndex()
+        return _index
@@ -0,0 +1,54 @@
+# backend_api/utils/keyword_text.py
+"""
+Keyword normalisation shared by clustering and the keyword index; kept
+free of NumPy/SciPy so importing it costs nothing at startup.
+"""
+
+import re
+from typing import Set
+
+_PUNCTUATION = str.maketrans({c: " " for c in "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~"})
+_NON_WORD = re.compile(r"[^\w\s]+")
+_VOWELS = set("aeiouy")
+
+
+def normalize_keyword(keyword: str) -> str:
+    text = keyword.lower().translate(_PUNCTUATION)
+    if not text.isascii():
+        text = _NON_WORD.sub(" ", text)
+    return " ".join(text.split())
+
+
+def stem(token: str) -> str:
+    """
+    Light suffix stripping, enough to fold plurals and -ing/-ed variants
+    ("recipes" -> "recipe", "boxes" -> "box", "running" -> "run").
+    """
+    if len(token) <= 3 or not token.isalpha():
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith("es") and token[:-2].endswith(("s", "x", "z", "ch", "sh")):
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    for suffix in ("ing", "ed"):
+        base = token[: -len(suffix)]
+        if token.endswith(suffix) and len(base) >= 3 and _VOWELS & set(base):
+            if base[-1] == base[-2] and base[-1] not in "lsz":
+                return base[:-1]
+            return base
+    return token
+
+
+def trigrams(keyword: str) -> Set[str]:
+    """
+    Word-padded character trigrams of a normalised keyword ("crm" ->
+    "  c", " cr", "crm", "rm "), so matches ignore word order and favour
+    shared word starts.
+    """
+    grams: Set[str] = set()
+    for word in keyword.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
@@ -0,0 +1,225 @@
+# backend_api/utils/rate_limiter.py
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Optional
+
+
+# ----------------------------------------------------
+# TOKEN BUCKET (queries per second)
+# ----------------------------------------------------
+class TokenBucket:
+    """
+    Classic token bucket. Callers reserve a token up front and sleep for
+    however long it takes to refill, so concurrent callers queue fairly
+    instead of spinning. Usable from threads and from the event loop.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1.0))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float = 1.0) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        wait = self._reserve(tokens)
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        wait = self._reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+
+
+# ----------------------------------------------------
+# CONCURRENCY LIMIT (one per process)
+# ----------------------------------------------------
+class _Waiter:
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(self, event: Optional[threading.Event] = None,
+                 loop: Optional[asyncio.AbstractEventLoop] = None, future: Any = None):
+        self.event = event
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+
+def _resolve(future: "asyncio.Future") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ConcurrencyLimiter:
+    """
+    Counting semaphore shared by threads and every event loop in the
+    process: asyncio.Semaphore is bound to one loop and
+    threading.Semaphore would block it, so neither can cap callers that
+    run on worker threads, job threads with their own loop, and the
+    server loop at once. Waiters are served in arrival order; a freed
+    slot passes straight to the next one. A limit <= 0 means unlimited.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._active = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    def _take(self) -> bool:
+        if self.limit <= 0:
+            return True
+        if not self._waiters and self._active < self.limit:
+            self._active += 1
+            return True
+        return False
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._take():
+                return
+            waiter = _Waiter(event=threading.Event())
+            self._waiters.append(waiter)
+        waiter.event.wait()
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._take():
+                return
+            waiter = _Waiter(loop=loop, future=loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted:
+                # the slot arrived together with the cancellation
+                self.release()
+            raise
+
+    def release(self) -> None:
+        if self.limit <= 0:
+            return
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                if waiter.event is not None:
+                    waiter.event.set()
+                    return
+                try:
+                    waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+                    return
+                except RuntimeError:
+                    # its loop is closed; hand the slot to the next waiter
+                    continue
+            self._active -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"limit": self.limit, "active": self._active, "waiting": len(self._waiters)}
+
+
+# ----------------------------------------------------
+# MONTHLY QUOTA (persisted across restarts)
+# ----------------------------------------------------
+class MonthlyQuota:
+    """
+    Calendar-month usage counter stored in SQLite. A limit <= 0 means
+    unlimited; the counter is still tracked for reporting.
+    """
+
+    def __init__(self, limit: int, path: Optional[str] = None):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._conn = None
+        self._memory_used = {}
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS quota (month TEXT PRIMARY KEY, used INTEGER NOT NULL)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def current_month() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m")
+
+    def used(self) -> int:
+        month = self.current_month()
+        with self._lock:
+            if self._conn is None:
+                return self._memory_used.get(month, 0)
+            row = self._conn.execute(
+                "SELECT used FROM quota WHERE month = ?", (month,)
+            ).fetchone()
+            return row[0] if row else 0
+
+    def remaining(self) -> Optional[int]:
+        if self.limit <= 0:
+            return None
+        return max(0, self.limit - self.used())
+
+    def available(self) -> bool:
+        remaining = self.remaining()
+        return remaining is None or remaining > 0
+
+    def reserve(self, count: int = 1) -> bool:
+        """
+        Take `count` units if the limit allows, in one step: the check
+        and the increment are a single UPDATE, so concurrent callers (or
+        processes sharing the file) cannot overshoot the limit.
+        """
+        month = self.current_month()
+        limit = self.limit if self.limit > 0 else None
+        with self._lock:
+            if self._conn is None:
+                used = self._memory_used.get(month, 0)
+                if limit is not None and used + count > limit:
+                    return False
+                self._memory_used[month] = used + count
+                return True
+            self._conn.execute("INSERT OR IGNORE INTO quota (month, used) VALUES (?, 0)", (month,))
+            cur = self._conn.execute(
+                "UPDATE quota SET used = used + ? WHERE month = ? AND (? IS NULL OR used + ? <= ?)",
+                (count, month, limit, count, limit),
+            )
+            self._conn.commit()
+            return cur.rowcount == 1
+
+    def release(self, count: int = 1) -> None:
+        """Give back a reservation whose call did not go through."""
+        month = self.current_month()
+        with self._lock:
+            if self._conn is None:
+                self._memory_used[month] = max(0, self._memory_used.get(month, 0) - count)
+                return
+            self._conn.execute(
+                "UPDATE quota SET used = MAX(used - ?, 0) WHERE month = ?", (count, month)
+            )
+            self._conn.commit()
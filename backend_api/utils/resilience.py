@@ -0,0 +1,142 @@
+# backend_api/utils/resilience.py
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+# HTTP-ish status codes worth retrying (google.api_core errors expose .code)
+TRANSIENT_CODES = {408, 429, 500, 502, 503, 504}
+TRANSIENT_GRPC = {"UNAVAILABLE", "DEADLINE_EXCEEDED", "RESOURCE_EXHAUSTED", "INTERNAL"}
+
+
+class CircuitOpen(RuntimeError):
+    """Raised when a breaker is refusing calls; `retry_after` is in seconds."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Timeouts, connection drops, throttling and 5xx are retryable; the rest are not."""
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    code = getattr(exc, "code", None)
+    if callable(code):  # grpc.RpcError exposes code() -> StatusCode
+        try:
+            return getattr(code(), "name", "") in TRANSIENT_GRPC
+        except Exception:
+            return False
+    return code in TRANSIENT_CODES
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 10.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+# ----------------------------------------------------
+# CIRCUIT BREAKER
+# ----------------------------------------------------
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker. After `failure_threshold` failures in a
+    row it opens for `cooldown` seconds, then lets a single trial call
+    through (half-open); success closes it, failure re-opens it. A trial
+    that ends any other way (a non-transient error, cancellation) must be
+    handed back with record_release() so the next call can try again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.rejections = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.cooldown:
+                return "half_open"
+            return "open"
+
+    def before_call(self) -> bool:
+        """
+        Raise CircuitOpen unless the call may proceed. Returns True when
+        the call is the half-open trial; the caller then owes exactly one
+        record_success(), record_failure() or record_release().
+        """
+        if self.failure_threshold <= 0:
+            return False
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            remaining = self.cooldown - (time.monotonic() - self._opened_at)
+            if remaining <= 0 and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejections += 1
+            raise CircuitOpen(self.name, max(remaining, 1.0))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    def record_release(self) -> None:
+        """The trial ended without a verdict; stay half-open and allow another."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self._failures,
+                "rejections": self.rejections}
+
+
+# ----------------------------------------------------
+# LATENCY WINDOW (hedging threshold)
+# ----------------------------------------------------
+class LatencyWindow:
+    """Rolling window of recent call durations (seconds)."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """None until `min_samples` calls have been observed."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def stats(self) -> Any:
+        return {
+            "samples": len(self._samples),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+        }
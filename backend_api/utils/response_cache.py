@@ -0,0 +1,239 @@
+# backend_api/utils/response_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+CACHE_DB_PATH = os.getenv("GEMINI_CACHE_PATH", ".cache/gemini_responses.sqlite3")
+CACHE_MEMORY_ENTRIES = int(os.getenv("GEMINI_CACHE_MEMORY_ENTRIES", "256"))
+CACHE_DISK_ENTRIES = int(os.getenv("GEMINI_CACHE_DISK_ENTRIES", "5000"))
+DEFAULT_TTL_SECONDS = int(os.getenv("GEMINI_CACHE_TTL", "86400"))
+
+# Per-endpoint freshness windows (seconds). Page audits go stale much faster
+# than a campaign brief, so they get the shortest window.
+ENDPOINT_TTLS: Dict[str, int] = {
+    "campaign": 6 * 3600,
+    "seo": 3600,
+    "keywords": 24 * 3600,
+    "forecast": 12 * 3600,
+    "calendar": 6 * 3600,
+}
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Content-addressed key: sha256 over the JSON encoding of every part
+    that influences the model output (rendered prompt, model, config).
+    """
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ----------------------------------------------------
+# IN-PROCESS LRU TIER
+# ----------------------------------------------------
+class MemoryLRU:
+    def __init__(self, max_entries: int = CACHE_MEMORY_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, expires_at: float) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ----------------------------------------------------
+# ON-DISK SQLITE TIER
+# ----------------------------------------------------
+class SQLiteStore:
+    def __init__(self, path: str = CACHE_DB_PATH, max_entries: int = CACHE_DISK_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[float, str]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at < now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return expires_at, value
+
+    def set(self, key: str, value: str, expires_at: float, endpoint: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, endpoint, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint, value, expires_at, now),
+            )
+            self._prune(now)
+            self._conn.commit()
+
+    def _prune(self, now: float) -> None:
+        cur = self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+        self.evictions += max(cur.rowcount, 0)
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            cur = self._conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += max(cur.rowcount, 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+            return count
+
+
+# ----------------------------------------------------
+# TWO-TIER CACHE
+# ----------------------------------------------------
+class ResponseCache:
+    """
+    Memory LRU in front of an optional SQLite store.
+    Any object exposing get(key) / set(key, value, endpoint) / stats()
+    can be swapped in through gemini_client.set_cache().
+    """
+
+    def __init__(
+        self,
+        memory_entries: int = CACHE_MEMORY_ENTRIES,
+        disk_path: Optional[str] = CACHE_DB_PATH,
+        disk_entries: int = CACHE_DISK_ENTRIES,
+        ttls: Optional[Dict[str, int]] = None,
+        default_ttl: int = DEFAULT_TTL_SECONDS,
+    ):
+        self.memory = MemoryLRU(memory_entries)
+        self.disk = SQLiteStore(disk_path, disk_entries) if disk_path else None
+        self.ttls = dict(ENDPOINT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def ttl_for(self, endpoint: str) -> int:
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return json.loads(value)
+
+        if self.disk is not None:
+            item = self.disk.get(key)
+            if item is not None:
+                expires_at, value = item
+                self.memory.set(key, value, expires_at)
+                self._count("disk_hits")
+                return json.loads(value)
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: Dict[str, Any], endpoint: str = "default") -> None:
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        encoded = json.dumps(value, ensure_ascii=False)
+        self.memory.set(key, encoded, expires_at)
+        if self.disk is not None:
+            self.disk.set(key, encoded, expires_at, endpoint)
+        self._count("writes")
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_evictions": self.memory.evictions,
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+            "disk_evictions": self.disk.evictions if self.disk is not None else 0,
+        }
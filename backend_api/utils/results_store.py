@@ -0,0 +1,660 @@
+# backend_api/utils/results_store.py
+
+import csv
+import io
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+RESULTS_STORE_PATH = os.getenv("RESULTS_STORE_PATH", ".cache/results")
+# Days of history, counted back from a client's latest row, that ground a forecast
+RESULTS_BENCHMARK_DAYS = int(os.getenv("RESULTS_BENCHMARK_DAYS", "180"))
+# Weeks with clicks a platform needs before its history replaces the priors
+RESULTS_MIN_WEEKS = int(os.getenv("RESULTS_MIN_WEEKS", "4"))
+# Memory-mapped month partitions kept open; the least recently used are closed first
+RESULTS_CACHED_PARTITIONS = int(os.getenv("RESULTS_CACHED_PARTITIONS", "256"))
+
+# column -> on-disk dtype; platform and campaign are codes into the client's dictionary
+COLUMNS = {
+    "date": np.int32,           # days since 1970-01-01
+    "platform": np.int16,
+    "campaign": np.int32,
+    "spend": np.float64,
+    "impressions": np.int64,
+    "clicks": np.int64,
+    "conversions": np.float64,  # attributed conversions can be fractional
+}
+METRICS = ("spend", "impressions", "clicks", "conversions")
+GROUP_KEYS = ("client", "month", "week", "date", "platform", "campaign")
+# export headers (lowercased, punctuation -> "_") that mean one of our columns
+COLUMN_ALIASES = {
+    "day": "date", "reporting_starts": "date",
+    "channel": "platform", "network": "platform", "source": "platform",
+    "campaign_name": "campaign",
+    "cost": "spend", "amount_spent": "spend", "amount_spent_usd": "spend",
+    "impr": "impressions", "link_clicks": "clicks",
+    "results": "conversions", "conv": "conversions", "purchases": "conversions",
+}
+# Pre-aggregated copies of every month partition, written at ingest; a query
+# reads the coarsest one that still has the keys it groups and filters on.
+#   daily      one row per date x platform (dashboards, rolling windows, forecasts)
+#   campaigns  one row per platform x campaign for the whole month
+ROLLUPS = {"daily": ("date", "platform"), "campaigns": ("platform", "campaign")}
+# past this many possible groups the dense bincount gives way to np.unique
+DENSE_GROUP_LIMIT = 5_000_000
+MONTH_PATTERN = re.compile(r"^\d{4}-\d{2}$")
+# letters, digits, spaces and . _ & ' - ; no slashes or control characters
+CLIENT_PATTERN = re.compile(r"^[\w][\w .&'-]{0,63}$")
+# keys that would shadow /api/results/<name> routes
+RESERVED_CLIENTS = {"aggregate", "rolling"}
+
+
+def client_key(client: str) -> str:
+    """Directory name for a client: lowercase letters, digits and dashes."""
+    if not CLIENT_PATTERN.match(client or ""):
+        raise ValueError("Client name must be 1-64 letters, digits, spaces or . _ & ' -")
+    key = re.sub(r"[^a-z0-9]+", "-", client.lower()).strip("-")
+    if not key:
+        raise ValueError("Client name must contain a letter or digit")
+    if key in RESERVED_CLIENTS:
+        raise ValueError(f"{key!r} is a reserved name")
+    return key
+
+
+# ----------------------------------------------------
+# PARSING
+# ----------------------------------------------------
+def _header(name: str) -> str:
+    key = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+    return COLUMN_ALIASES.get(key, key)
+
+
+def _numeric(values: List[Any], name: str) -> np.ndarray:
+    try:
+        column = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        # exports format numbers as "$1,204.50" or leave quiet days blank
+        cleaned = []
+        for value in values:
+            text = re.sub(r"[$€£,\s]", "", str(value if value is not None else ""))
+            try:
+                cleaned.append(float(text) if text else 0.0)
+            except ValueError:
+                raise ValueError(f"Column {name!r} has a non-numeric value: {value!r}") from None
+        column = np.asarray(cleaned, dtype=np.float64)
+    if (column < 0).any() or not np.isfinite(column).all():
+        raise ValueError(f"Column {name!r} must hold non-negative numbers")
+    return column
+
+
+def columns_from_rows(rows: Iterable[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Result rows (dicts of date, platform, spend, impressions, clicks,
+    conversions and an optional campaign) as column arrays. Headers are
+    matched loosely ("Amount spent (USD)", "Impr.", "Day" ...); metrics
+    left out count as zero.
+    """
+    collected: Dict[str, List[Any]] = {name: [] for name in COLUMNS}
+    count = 0
+    for row in rows:
+        fields = {_header(str(key)): value for key, value in row.items() if key is not None}
+        for name in COLUMNS:
+            collected[name].append(fields.get(name))
+        count += 1
+    if not count:
+        raise ValueError("No result rows to ingest")
+    if any(value in (None, "") for value in collected["date"]):
+        raise ValueError("Every row needs a date")
+    if any(value in (None, "") for value in collected["platform"]):
+        raise ValueError("Every row needs a platform")
+    try:
+        dates = np.asarray([str(value)[:10] for value in collected["date"]], dtype="datetime64[D]")
+    except ValueError as e:
+        raise ValueError(f"Dates must be YYYY-MM-DD: {e}") from None
+
+    columns = {
+        "date": dates,
+        "platform": np.asarray([str(value).strip() for value in collected["platform"]]),
+        "campaign": np.asarray([str(value or "").strip() for value in collected["campaign"]]),
+    }
+    for name in METRICS:
+        columns[name] = _numeric([0 if value is None else value for value in collected[name]], name)
+    return columns
+
+
+def parse_results(text: str) -> Dict[str, np.ndarray]:
+    """CSV export, or a JSON list of row objects, as column arrays."""
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        rows = json.loads(stripped)
+        if not all(isinstance(row, dict) for row in rows):
+            raise ValueError("JSON results must be a list of objects")
+        return columns_from_rows(rows)
+    return columns_from_rows(csv.DictReader(io.StringIO(stripped)))
+
+
+def _rates(sums: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    ctr, cpc, cvr and cpa from summed metrics; NaN where the denominator is
+    zero, and cpc/cpa are NaN for unpaid (zero-spend) groups.
+    """
+    def ratio(num, den, where):
+        return np.divide(num, den, out=np.full(len(num), np.nan), where=where & (den > 0))
+    paid = sums["spend"] > 0
+    return {
+        "ctr": ratio(sums["clicks"], sums["impressions"].astype(float), True),
+        "cpc": ratio(sums["spend"], sums["clicks"].astype(float), paid),
+        "cvr": ratio(sums["conversions"], sums["clicks"].astype(float), True),
+        "cpa": ratio(sums["spend"], sums["conversions"], paid),
+    }
+
+
+def _rollup(columns: Dict[str, np.ndarray], keys: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Metrics summed per distinct combination of `keys`, plus the row count."""
+    code = np.zeros(len(columns["date"]), dtype=np.int64)
+    for key in keys:
+        code = (code << 32) | np.asarray(columns[key], dtype=np.int64)
+    _, first, inverse = np.unique(code, return_index=True, return_inverse=True)
+    out = {key: np.asarray(columns[key])[first].astype(COLUMNS[key]) for key in keys}
+    out.update({name: np.bincount(inverse, weights=columns[name]) for name in METRICS})
+    out["rows"] = np.bincount(inverse)
+    return out
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else round(float(value), 4)
+    return int(value)
+
+
+def _column(values: np.ndarray) -> List[Any]:
+    """JSON-ready list: floats rounded, NaN as None, integer columns as ints."""
+    if values.dtype.kind in "iu":
+        return values.tolist()
+    out = np.round(values, 4).astype(object)
+    out[np.isnan(values)] = None
+    return out.tolist()
+
+
+def _dates(days: np.ndarray) -> List[str]:
+    return np.datetime_as_string(np.asarray(days, dtype="datetime64[D]")).tolist()
+
+
+def _day(value: Optional[str]) -> Optional[int]:
+    return None if not value else int(np.datetime64(value[:10], "D").astype(np.int64))
+
+
+def _iso(day: int) -> str:
+    return str(np.datetime64(int(day), "D"))
+
+
+def _month_span(month: str) -> Tuple[int, int]:
+    first = np.datetime64(month, "M")
+    return int(first.astype("datetime64[D]").astype(np.int64)), \
+        int((first + 1).astype("datetime64[D]").astype(np.int64)) - 1
+
+
+# ----------------------------------------------------
+# STORE
+# ----------------------------------------------------
+class ResultsStore:
+    """
+    Campaign results (one row per date x platform x campaign) as columnar
+    NumPy files, one directory per client and month:
+
+        <root>/<client>/dictionary.json    platform and campaign names
+        <root>/<client>/2024-05/spend.npy  one .npy per column
+
+    Partitions are memory-mapped read-only and kept in an LRU of
+    RESULTS_CACHED_PARTITIONS until rewritten, so a query only touches the
+    months in its range and never parses anything;
+    group-bys are np.bincount passes over the mapped columns, one partition
+    at a time. Re-ingesting a row for the same date, platform and campaign
+    replaces it, so overlapping exports can be loaded again safely.
+    """
+
+    def __init__(self, root: str = RESULTS_STORE_PATH, cached_partitions: int = RESULTS_CACHED_PARTITIONS):
+        self._root = root
+        self._lock = threading.Lock()
+        self._cached_partitions = max(1, cached_partitions)
+        self._partitions: "OrderedDict[Tuple[str, str], Dict[str, Dict[str, np.ndarray]]]" = OrderedDict()
+        self._dictionaries: Dict[str, Dict[str, List[str]]] = {}
+        # (client, month) -> rows, kept up to date by ingest; read once on first use
+        self._row_counts: Optional[Dict[Tuple[str, str], int]] = None
+        os.makedirs(root, exist_ok=True)
+
+    # -- files ---------------------------------------------------------
+    def _dictionary(self, client: str) -> Dict[str, List[str]]:
+        dictionary = self._dictionaries.get(client)
+        if dictionary is None:
+            path = os.path.join(self._root, client, "dictionary.json")
+            try:
+                with open(path, encoding="utf-8") as fh:
+                    dictionary = json.load(fh)
+            except FileNotFoundError:
+                dictionary = {"platform": [], "campaign": []}
+            self._dictionaries[client] = dictionary
+        return dictionary
+
+    def _months(self, client: str) -> List[str]:
+        try:
+            names = os.listdir(os.path.join(self._root, client))
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in names if MONTH_PATTERN.match(name))
+
+    def _partition(self, client: str, month: str) -> Dict[str, Dict[str, np.ndarray]]:
+        """{"raw": columns, "daily": columns, "campaigns": columns}, memory-mapped."""
+        partition = self._partitions.get((client, month))
+        if partition is not None:
+            self._partitions.move_to_end((client, month))
+        else:
+            directory = os.path.join(self._root, client, month)
+
+            def load(prefix, names):
+                return {name: np.load(os.path.join(directory, f"{prefix}{name}.npy"), mmap_mode="r")
+                        for name in names}
+            partition = {"raw": load("", COLUMNS)}
+            for rollup, keys in ROLLUPS.items():
+                partition[rollup] = load(f"{rollup}.", keys + METRICS + ("rows",))
+            self._partitions[(client, month)] = partition
+            while len(self._partitions) > self._cached_partitions:
+                # queries still holding an evicted map keep it alive until they finish
+                self._partitions.popitem(last=False)
+        return partition
+
+    def _counts(self) -> Dict[Tuple[str, str], int]:
+        """Rows per partition; the first call reads each date column's length once."""
+        if self._row_counts is None:
+            self._row_counts = {
+                (client, month): len(np.load(os.path.join(self._root, client, month, "date.npy"),
+                                             mmap_mode="r"))
+                for client in self.clients() for month in self._months(client)
+            }
+        return self._row_counts
+
+    def _write(self, path: str, write) -> None:
+        # write-then-rename: readers holding the old map keep a consistent file
+        with open(path + ".tmp", "wb" if path.endswith(".npy") else "w") as fh:
+            write(fh)
+        os.replace(path + ".tmp", path)
+
+    def _write_partition(self, client: str, month: str, columns: Dict[str, np.ndarray]) -> None:
+        directory = os.path.join(self._root, client, month)
+        os.makedirs(directory, exist_ok=True)
+        self._partitions.pop((client, month), None)
+        if self._row_counts is not None:
+            self._row_counts[(client, month)] = len(columns["date"])
+        files = {name: np.ascontiguousarray(columns[name], dtype=dtype) for name, dtype in COLUMNS.items()}
+        for rollup, keys in ROLLUPS.items():
+            files.update({f"{rollup}.{name}": values for name, values in _rollup(columns, keys).items()})
+        for name, array in files.items():
+            self._write(os.path.join(directory, f"{name}.npy"), lambda fh: np.save(fh, array))
+
+    # -- ingest --------------------------------------------------------
+    @staticmethod
+    def _encode(names: List[str], values: np.ndarray) -> np.ndarray:
+        """Codes for values in `names`, appending names not seen before."""
+        unique, inverse = np.unique(values, return_inverse=True)
+        codes = {name: code for code, name in enumerate(names)}
+        mapping = np.array([codes.setdefault(str(name), len(codes)) for name in unique.tolist()],
+                           dtype=np.int64)
+        names[:] = list(codes)
+        return mapping[inverse]
+
+    @staticmethod
+    def _keys(columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """One int64 per (date, platform, campaign): the row identity for upserts."""
+        return ((np.asarray(columns["date"], dtype=np.int64) << 40)
+                | (np.asarray(columns["platform"], dtype=np.int64) << 24)
+                | np.asarray(columns["campaign"], dtype=np.int64))
+
+    def ingest(self, client: str, columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        """Upsert parsed rows (see columns_from_rows) into the client's month partitions."""
+        started = time.perf_counter()
+        client = client_key(client)
+        with self._lock:
+            dictionary = self._dictionary(client)
+            platforms = list(dictionary["platform"])
+            campaigns = list(dictionary["campaign"])
+            rows = {
+                "date": columns["date"].astype(np.int64),
+                "platform": self._encode(platforms, columns["platform"]),
+                "campaign": self._encode(campaigns, columns["campaign"]),
+                **{name: columns[name] for name in METRICS},
+            }
+            if len(platforms) >= 2 ** 15 or len(campaigns) >= 2 ** 24:
+                raise ValueError("Too many distinct platforms or campaigns for one client")
+            os.makedirs(os.path.join(self._root, client), exist_ok=True)
+            self._write(os.path.join(self._root, client, "dictionary.json"),
+                        lambda fh: json.dump({"platform": platforms, "campaign": campaigns}, fh))
+            self._dictionaries[client] = {"platform": platforms, "campaign": campaigns}
+
+            # within one batch the last row for a key wins
+            keys = self._keys(rows)
+            _, last = np.unique(keys[::-1], return_index=True)
+            keep = np.sort(len(keys) - 1 - last)
+            rows = {name: values[keep] for name, values in rows.items()}
+            keys = keys[keep]
+
+            months = columns["date"][keep].astype("datetime64[M]")
+            written, replaced = [], 0
+            for month in np.unique(months):
+                label = str(month)
+                selected = months == month
+                batch = {name: values[selected] for name, values in rows.items()}
+                if label in self._months(client):
+                    existing = self._partition(client, label)["raw"]
+                    stale = np.isin(self._keys(existing), keys[selected])
+                    replaced += int(stale.sum())
+                    batch = {name: np.concatenate([np.asarray(existing[name])[~stale], batch[name]])
+                             for name in COLUMNS}
+                order = np.argsort(self._keys(batch), kind="stable")
+                self._write_partition(client, label, {name: values[order] for name, values in batch.items()})
+                written.append(label)
+        return {
+            "client": client,
+            "rows": int(len(keys)),
+            "replaced": replaced,
+            "months": written,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    # -- queries -------------------------------------------------------
+    def clients(self) -> List[str]:
+        try:
+            return sorted(name for name in os.listdir(self._root)
+                          if os.path.isdir(os.path.join(self._root, name)))
+        except FileNotFoundError:
+            return []
+
+    def _scan(self, clients: List[str], start: Optional[int], end: Optional[int]):
+        """(client, month, columns) for every partition overlapping [start, end]."""
+        parts = []
+        with self._lock:
+            for client in clients:
+                for month in self._months(client):
+                    first, last = _month_span(month)
+                    if (start is not None and last < start) or (end is not None and first > end):
+                        continue
+                    parts.append((client, month, self._partition(client, month)))
+            dictionaries = {client: self._dictionary(client) for client in clients}
+        return parts, dictionaries
+
+    def _group(self, client: Optional[str], group_by: Sequence[str],
+               start: Optional[str], end: Optional[str],
+               platforms: Optional[Sequence[str]]) -> Dict[str, Any]:
+        """
+        Summed metrics per group as arrays. Each group key becomes a dense
+        integer axis (days and weeks offset from the first day in range,
+        names mapped to one vocabulary across clients) and the axes are
+        combined into a single code per row, so every metric is one
+        np.bincount per partition. Only groupings by campaign and day/week,
+        or by campaign over part of a month, read the raw rows; everything
+        else reads a rollup (see ROLLUPS).
+        """
+        unknown = [key for key in group_by if key not in GROUP_KEYS]
+        if unknown:
+            raise ValueError(f"Unknown group_by {unknown}; use {', '.join(GROUP_KEYS)}")
+        clients = [client_key(client)] if client else self.clients()
+        start_day, end_day = _day(start), _day(end)
+        parts, dictionaries = self._scan(clients, start_day, end_day)
+
+        names = {key: sorted({name for d in dictionaries.values() for name in d[key]})
+                 for key in ("platform", "campaign")}
+        months = sorted({month for _, month, _ in parts})
+        spans = [_month_span(month) for month in months] or [(0, 0)]
+        day_lo = max(min(lo for lo, _ in spans), start_day if start_day is not None else -2 ** 31)
+        day_hi = min(max(hi for _, hi in spans), end_day if end_day is not None else 2 ** 31)
+        week_lo = (day_lo + 3) // 7  # weeks start on Monday; 1970-01-01 was a Thursday
+        sizes = {
+            "client": len(clients), "month": len(months),
+            "week": (day_hi + 3) // 7 - week_lo + 1, "date": day_hi - day_lo + 1,
+            "platform": len(names["platform"]), "campaign": len(names["campaign"]),
+        }
+        strides, total = {}, 1
+        for key in reversed(group_by):
+            strides[key] = total
+            total *= max(sizes[key], 1)
+        dense = total <= DENSE_GROUP_LIMIT
+
+        sums = {name: np.zeros(total if dense else 0) for name in METRICS + ("rows",)}
+        partials: List[Tuple[np.ndarray, Dict[str, np.ndarray]]] = []
+        lookups = {}
+        for client_name, dictionary in dictionaries.items():
+            local = {key: np.searchsorted(names[key], dictionary[key]) for key in ("platform", "campaign")}
+            allowed = np.isin(dictionary["platform"], list(platforms)) if platforms else None
+            lookups[client_name] = (local, allowed)
+        by_day = "date" in group_by or "week" in group_by
+        for client_name, month, partition in parts:
+            local, allowed = lookups[client_name]
+            first, last = _month_span(month)
+            clipped = (start_day is not None and first < start_day) or (end_day is not None and last > end_day)
+            if "campaign" not in group_by:
+                columns = partition["daily"]
+            elif by_day or clipped:
+                columns = partition["raw"]
+            else:
+                columns = partition["campaigns"]
+
+            mask = None
+            if clipped:
+                date = columns["date"]
+                if start_day is not None:
+                    mask = date >= start_day
+                if end_day is not None:
+                    mask = (date <= end_day) if mask is None else mask & (date <= end_day)
+            if allowed is not None:
+                keep = allowed[columns["platform"]]
+                mask = keep if mask is None else mask & keep
+            view = columns if mask is None else {name: values[mask] for name, values in columns.items()}
+            if not len(view["platform"]):
+                continue
+
+            code = np.zeros(len(view["platform"]), dtype=np.int64)
+            for key in group_by:
+                if key == "client":
+                    axis = clients.index(client_name)
+                elif key == "month":
+                    axis = months.index(month)
+                elif key == "date":
+                    axis = view["date"].astype(np.int64) - day_lo
+                elif key == "week":
+                    axis = (view["date"].astype(np.int64) + 3) // 7 - week_lo
+                else:
+                    axis = local[key][view[key]]
+                code += axis * strides[key]
+
+            # raw rows count one each; rollup rows carry how many they stand for
+            counts = view.get("rows")
+            if dense:
+                sums["rows"] += np.bincount(code, weights=counts, minlength=total)
+                for name in METRICS:
+                    sums[name] += np.bincount(code, weights=view[name], minlength=total)
+            else:
+                unique, inverse = np.unique(code, return_inverse=True)
+                partial = {name: np.bincount(inverse, weights=view[name]) for name in METRICS}
+                partial["rows"] = np.bincount(inverse, weights=counts).astype(float)
+                partials.append((unique, partial))
+
+        if dense:
+            codes = np.flatnonzero(sums["rows"])
+            sums = {name: values[codes] for name, values in sums.items()}
+        elif partials:
+            codes, inverse = np.unique(np.concatenate([u for u, _ in partials]), return_inverse=True)
+            sums = {name: np.bincount(inverse, weights=np.concatenate([p[name] for _, p in partials]))
+                    for name in METRICS + ("rows",)}
+        else:
+            codes = np.zeros(0, dtype=np.int64)
+        for name in ("impressions", "clicks", "rows"):
+            sums[name] = np.rint(sums[name]).astype(np.int64)
+
+        axes = {key: (codes // strides[key]) % max(sizes[key], 1) for key in group_by}
+        labels = {"client": clients, "month": months, **names}
+        return {"axes": axes, "sums": sums, "labels": labels, "day_lo": day_lo, "week_lo": week_lo,
+                "rows": int(sums["rows"].sum()), "partitions": len(parts)}
+
+    def aggregate(self, client: Optional[str] = None, group_by: Sequence[str] = ("platform",),
+                  start: Optional[str] = None, end: Optional[str] = None,
+                  platforms: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Totals and ctr/cpc/cvr/cpa per group over [start, end] (ISO dates,
+        inclusive), for one client or all of them. group_by is any of
+        GROUP_KEYS; an empty group_by gives one overall row.
+        """
+        started = time.perf_counter()
+        grouped = self._group(client, group_by, start, end, platforms)
+        axes, sums, labels = grouped["axes"], grouped["sums"], grouped["labels"]
+        columns: Dict[str, List[Any]] = {}
+        for key in group_by:
+            if key == "date":
+                columns[key] = _dates(grouped["day_lo"] + axes[key])
+            elif key == "week":
+                columns[key] = _dates((grouped["week_lo"] + axes[key]) * 7 - 3)
+            else:
+                columns[key] = np.asarray(labels[key], dtype=object)[axes[key]].tolist()
+        for name, values in {**sums, **_rates(sums)}.items():
+            columns[name] = _column(values)
+        groups = [dict(zip(columns, row)) for row in zip(*columns.values())]
+        return {
+            "client": client_key(client) if client else None,
+            "group_by": list(group_by),
+            "start": start,
+            "end": end,
+            "groups": groups,
+            "rows_matched": grouped["rows"],
+            "partitions": grouped["partitions"],
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def rolling(self, client: Optional[str] = None, window: int = 7,
+                start: Optional[str] = None, end: Optional[str] = None,
+                platforms: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Trailing `window`-day sums (and rates) for every day in range, from a
+        daily group-by and one cumulative sum per metric. Days before `start`
+        are scanned so the first windows are complete.
+        """
+        started = time.perf_counter()
+        window = max(1, int(window))
+        lead = _iso(_day(start) - window + 1) if start else None
+        grouped = self._group(client, ("date",), lead, end, platforms)
+        days = grouped["axes"]["date"]
+        series: Dict[str, List[Any]] = {"dates": []}
+        if len(days):
+            length = int(days.max()) + 1
+            rolled = {}
+            for name in METRICS:
+                daily = np.zeros(length)
+                daily[days] = grouped["sums"][name]
+                total = np.concatenate([[0.0], np.cumsum(daily)])
+                rolled[name] = total[1:] - total[np.maximum(np.arange(1, length + 1) - window, 0)]
+            first = max(0, _day(start) - grouped["day_lo"]) if start else int(days.min())
+            rolled = {name: values[first:] for name, values in rolled.items()}
+            rolled.update(_rates(rolled))
+            series["dates"] = _dates(grouped["day_lo"] + np.arange(first, length))
+            for name, values in rolled.items():
+                series[name] = _column(np.rint(values).astype(np.int64)
+                                       if name in ("impressions", "clicks") else values)
+        return {
+            "client": client_key(client) if client else None,
+            "window": window,
+            **series,
+            "rows_matched": grouped["rows"],
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def latest_day(self, client: str) -> Optional[str]:
+        client = client_key(client)
+        with self._lock:
+            months = self._months(client)
+            if not months:
+                return None
+            return _iso(int(self._partition(client, months[-1])["daily"]["date"][-1]))
+
+    def benchmarks(self, client: str, days: int = RESULTS_BENCHMARK_DAYS,
+                   min_weeks: int = RESULTS_MIN_WEEKS) -> Dict[str, Dict[str, Any]]:
+        """
+        Observed performance per platform over the client's last `days` of
+        results: totals, overall rates and, for platforms with at least
+        `min_weeks` weeks of clicks, the 5th-95th percentile of their weekly
+        ctr/cpc/cvr (the same [low, high] shape as the forecast priors).
+        Empty when the client has no results.
+        """
+        latest = self.latest_day(client)
+        if latest is None:
+            return {}
+        start = _iso(_day(latest) - days + 1)
+        weekly = self._group(client, ("platform", "week"), start, latest, None)
+        total = self._group(client, ("platform",), start, latest, None)
+        weekly_rates = _rates(weekly["sums"])
+        total_rates = _rates(total["sums"])
+        names = total["labels"]["platform"]
+
+        observed = {}
+        for index, code in enumerate(total["axes"]["platform"].tolist()):
+            sums = weekly["sums"]
+            active = (weekly["axes"]["platform"] == code) & (sums["clicks"] > 0)
+            weeks = {"ctr": active, "cvr": active, "cpc": active & (sums["spend"] > 0)}
+            ranges: Dict[str, Optional[List[float]]] = {}
+            for rate, selected in weeks.items():
+                # cpc stays None for organic-only platforms, like in the priors
+                if selected.sum() < min_weeks:
+                    ranges[rate] = None
+                    continue
+                low, high = (float(v) for v in np.percentile(weekly_rates[rate][selected], [5, 95]))
+                # quiet weeks pull the low end to zero; keep the log-normal centred on real rates
+                low = max(low, high / 10)
+                if high <= low * 1.05:
+                    low, high = low * 0.9, high * 1.1
+                ranges[rate] = [round(low, 6), round(high, 6)]
+            observed[names[code]] = {
+                "weeks": int(active.sum()),
+                **{name: _value(total["sums"][name][index]) for name in METRICS},
+                **{name: _value(values[index]) for name, values in total_rates.items()},
+                "ranges": ranges,
+            }
+        return observed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = self._counts()
+            return {"clients": len({client for client, _ in counts}), "partitions": len(counts),
+                    "rows": sum(counts.values()), "partitions_mapped": len(self._partitions)}
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per client: row count, date range and platforms."""
+        out = []
+        with self._lock:
+            for client in self.clients():
+                months = self._months(client)
+                if not months:
+                    continue
+                first = self._partition(client, months[0])["daily"]["date"]
+                last = self._partition(client, months[-1])["daily"]["date"]
+                out.append({
+                    "client": client,
+                    "rows": sum(self._counts().get((client, month), 0) for month in months),
+                    "first_date": _iso(int(first[0])),
+                    "last_date": _iso(int(last[-1])),
+                    "platforms": self._dictionary(client)["platform"],
+                })
+        return out
+
+
+_store: Optional[ResultsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultsStore()
+        return _store
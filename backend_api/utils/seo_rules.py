@@ -0,0 +1,243 @@
+# backend_api/utils/seo_rules.py
+
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# JSON file with a list of rule definitions replacing DEFAULT_RULES
+SEO_RULES_PATH = os.getenv("SEO_RULES_PATH", "")
+
+# check -> needs a "value"; string checks read the field's text, numeric
+# checks its number. A rule only fires for pages that carry its field.
+CHECKS = {
+    "empty": False,           # text is blank
+    "max_length": True,       # text longer than value
+    "min_length": True,       # text non-empty but shorter than value
+    "contains": True,         # text contains value (case-insensitive)
+    "missing_keyword": False, # none of the target keywords appear in the text
+    "greater_than": True,     # number > value
+    "less_than": True,        # number < value
+}
+NUMERIC_CHECKS = {"greater_than", "less_than"}
+
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {"id": "title_missing", "field": "title", "check": "empty", "weight": 20, "suggest": True,
+     "issue": "Missing <title>",
+     "recommendation": "Add a unique, descriptive <title> that leads with the main keyword."},
+    {"id": "title_too_long", "field": "title", "check": "max_length", "value": 60, "weight": 10,
+     "suggest": True, "issue": "Title longer than 60 characters",
+     "recommendation": "Shorten the title to 60 characters so it is not truncated in results."},
+    {"id": "title_too_short", "field": "title", "check": "min_length", "value": 15, "weight": 5,
+     "suggest": True, "issue": "Title shorter than 15 characters",
+     "recommendation": "Expand the title with the page's topic and a differentiator."},
+    {"id": "meta_missing", "field": "meta_description", "check": "empty", "weight": 15,
+     "suggest": True, "issue": "Missing meta description",
+     "recommendation": "Write a meta description summarising the page with a call to action."},
+    {"id": "meta_too_long", "field": "meta_description", "check": "max_length", "value": 160,
+     "weight": 5, "suggest": True, "issue": "Meta description longer than 160 characters",
+     "recommendation": "Trim the meta description to 160 characters."},
+    {"id": "meta_too_short", "field": "meta_description", "check": "min_length", "value": 50,
+     "weight": 5, "suggest": True, "issue": "Meta description shorter than 50 characters",
+     "recommendation": "Lengthen the meta description to 120-160 characters."},
+    {"id": "h1_missing", "field": "h1", "check": "empty", "weight": 15,
+     "issue": "Missing H1",
+     "recommendation": "Add a single H1 stating the page's main topic."},
+    {"id": "h1_multiple", "field": "h1_count", "check": "greater_than", "value": 1, "weight": 5,
+     "issue": "Multiple H1 tags",
+     "recommendation": "Keep one H1 and demote the others to H2."},
+    {"id": "images_missing_alt", "field": "images_missing_alt", "check": "greater_than",
+     "value": 0, "weight": 5, "issue": "Images missing alt text",
+     "recommendation": "Add descriptive alt text to every content image."},
+    {"id": "noindex", "field": "robots", "check": "contains", "value": "noindex", "weight": 30,
+     "issue": "Page is marked noindex",
+     "recommendation": "Remove noindex if the page should appear in search results."},
+    {"id": "thin_content", "field": "word_count", "check": "less_than", "value": 300,
+     "weight": 5, "issue": "Thin content (under 300 words)",
+     "recommendation": "Expand the body copy to cover the topic in more depth."},
+    {"id": "keyword_not_in_title", "field": "title", "check": "missing_keyword", "weight": 10,
+     "suggest": True, "issue": "No target keyword in the title",
+     "recommendation": "Work the primary target keyword into the title."},
+    {"id": "keyword_not_in_h1", "field": "h1", "check": "missing_keyword", "weight": 5,
+     "issue": "No target keyword in the H1",
+     "recommendation": "Use the primary target keyword (or a close variant) in the H1."},
+]
+
+
+def validate_rules(rules: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    checked = []
+    for rule in rules:
+        for key in ("id", "field", "check", "issue"):
+            if key not in rule:
+                raise ValueError(f"SEO rule {rule!r} is missing {key!r}")
+        if rule["check"] not in CHECKS:
+            raise ValueError(f"SEO rule {rule['id']!r}: unknown check {rule['check']!r}")
+        if CHECKS[rule["check"]] and "value" not in rule:
+            raise ValueError(f"SEO rule {rule['id']!r}: check {rule['check']!r} needs a value")
+        checked.append({"weight": 0, "suggest": False, "recommendation": "", **rule})
+    return checked
+
+
+_rules: Optional[List[Dict[str, Any]]] = None
+_rules_lock = threading.Lock()
+
+
+def load_rules() -> List[Dict[str, Any]]:
+    """Rules from SEO_RULES_PATH if set, otherwise DEFAULT_RULES (loaded once)."""
+    global _rules
+    with _rules_lock:
+        if _rules is None:
+            if SEO_RULES_PATH:
+                with open(SEO_RULES_PATH, encoding="utf-8") as fh:
+                    _rules = validate_rules(json.load(fh))
+            else:
+                _rules = validate_rules(DEFAULT_RULES)
+        return _rules
+
+
+# ----------------------------------------------------
+# VECTORISED EVALUATION
+# ----------------------------------------------------
+class _Columns:
+    """Per-field arrays over the pages, built once per field."""
+
+    def __init__(self, pages: Sequence[Dict[str, Any]]):
+        self.pages = pages
+        self._text: Dict[str, np.ndarray] = {}
+        self._number: Dict[str, np.ndarray] = {}
+        self._length: Dict[str, np.ndarray] = {}
+        self._present: Dict[str, np.ndarray] = {}
+
+    def present(self, field: str) -> np.ndarray:
+        if field not in self._present:
+            self._present[field] = np.fromiter((field in p for p in self.pages),
+                                               dtype=bool, count=len(self.pages))
+        return self._present[field]
+
+    def text(self, field: str) -> np.ndarray:
+        if field not in self._text:
+            values = [str(p.get(field) or "").strip().lower() for p in self.pages]
+            self._text[field] = np.array(values, dtype=str) if values else np.array([], dtype=str)
+        return self._text[field]
+
+    def length(self, field: str) -> np.ndarray:
+        if field not in self._length:
+            self._length[field] = np.char.str_len(self.text(field))
+        return self._length[field]
+
+    def number(self, field: str) -> np.ndarray:
+        if field not in self._number:
+            self._number[field] = np.fromiter((float(p.get(field) or 0) for p in self.pages),
+                                              dtype=float, count=len(self.pages))
+        return self._number[field]
+
+
+def _mask(rule: Dict[str, Any], columns: _Columns, keywords: List[str]) -> np.ndarray:
+    check = rule["check"]
+    if check in NUMERIC_CHECKS:
+        values = columns.number(rule["field"])
+        if check == "greater_than":
+            return values > rule["value"]
+        return values < rule["value"]
+
+    text = columns.text(rule["field"])
+    lengths = columns.length(rule["field"])
+    if check == "empty":
+        return lengths == 0
+    if check == "max_length":
+        return lengths > rule["value"]
+    if check == "min_length":
+        return (lengths > 0) & (lengths < rule["value"])
+    if check == "contains":
+        return np.char.find(text, str(rule["value"]).lower()) >= 0
+    # missing_keyword: only meaningful when keywords were given
+    if not keywords:
+        return np.zeros(len(text), dtype=bool)
+    found = np.zeros(len(text), dtype=bool)
+    for keyword in keywords:
+        found |= np.char.find(text, keyword) >= 0
+    return (lengths > 0) & ~found
+
+
+def evaluate_pages(pages: Sequence[Dict[str, Any]],
+                   target_keywords: Optional[List[str]] = None,
+                   rules: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Score every page against the rules in one pass: each rule is a boolean
+    mask over all pages, the score is 100 minus the weights of the rules a
+    page fails (floored at 0). Pages flagged `has_html: False` score 0.
+
+    Returns per page: score, issues, recommendations, failed_rules and
+    needs_llm (a failed rule asks for rewritten copy).
+    """
+    rules = load_rules() if rules is None else rules
+    if not pages:
+        return []
+    keywords = [k.strip().lower() for k in target_keywords or [] if k.strip()]
+    columns = _Columns(pages)
+
+    failed = np.zeros((len(rules), len(pages)), dtype=bool)
+    for index, rule in enumerate(rules):
+        failed[index] = _mask(rule, columns, keywords) & columns.present(rule["field"])
+
+    fetched = np.fromiter((p.get("has_html", True) is not False for p in pages),
+                          dtype=bool, count=len(pages))
+    failed &= fetched
+
+    weights = np.array([rule["weight"] for rule in rules], dtype=float)
+    suggest = np.array([bool(rule["suggest"]) for rule in rules], dtype=bool)
+    scores = np.clip(100.0 - weights @ failed, 0, 100)
+    scores[~fetched] = 0
+    needs_llm = (suggest @ failed) > 0
+
+    # (page, rule) pairs ordered by page; bounds[i]:bounds[i+1] are page i's
+    page_idx, rule_idx = np.nonzero(failed.T)
+    bounds = np.searchsorted(page_idx, np.arange(len(pages) + 1)).tolist()
+    rule_idx = rule_idx.tolist()
+    scores = np.rint(scores).astype(int).tolist()
+    needs_llm = needs_llm.tolist()
+    fetched = fetched.tolist()
+
+    results = []
+    for col in range(len(pages)):
+        if not fetched[col]:
+            results.append({"score": 0, "issues": ["Page could not be fetched"],
+                            "recommendations": [], "failed_rules": [], "needs_llm": False})
+            continue
+        hit = [rules[i] for i in rule_idx[bounds[col]:bounds[col + 1]]]
+        results.append({
+            "score": scores[col],
+            "issues": [rule["issue"] for rule in hit],
+            "recommendations": [rule["recommendation"] for rule in hit if rule["recommendation"]],
+            "failed_rules": [rule["id"] for rule in hit],
+            "needs_llm": needs_llm[col],
+        })
+    return results
+
+
+def evaluate_page(page: Dict[str, Any],
+                  target_keywords: Optional[List[str]] = None) -> Dict[str, Any]:
+    return evaluate_pages([page], target_keywords)[0]
+
+
+def rules_analysis(result: Dict[str, Any]) -> Dict[str, Any]:
+    """An ai_analysis-shaped dict built from a rules result alone."""
+    return {
+        "high_level_score": result["score"],
+        "issues": result["issues"],
+        "recommendations": result["recommendations"],
+        "suggested_title": "",
+        "suggested_meta_description": "",
+        "source": "rules",
+    }
+
+
+def wants_llm(result: Dict[str, Any], llm: str) -> bool:
+    """llm: "always", "never" or "auto" (only when a failed rule asks for new copy)."""
+    if llm == "always":
+        return True
+    if llm == "never":
+        return False
+    return result["needs_llm"]
@@ -1,34 +1,277 @@
 # backend_api/utils/serp_client.py
 
+import asyncio
 import os
-from typing import List, Dict, Any
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional
 
-import requests
+import httpx
+
+from .http_client import fetch, fetch_async
+from .rate_limiter import MonthlyQuota, TokenBucket
+from .response_cache import ResponseCache, make_cache_key
+from .telemetry import SERP_CALL_SECONDS, SERP_EVENTS
 
 SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY")
 SERPAPI_URL = "https://serpapi.com/search.json"
+SERPAPI_ENGINE = "google"
+SERPAPI_TIMEOUT = 15
+
+# Scheduler / cache knobs (match these to the SerpAPI plan)
+SERPAPI_QPS = float(os.getenv("SERPAPI_QPS", "5"))
+SERPAPI_MONTHLY_QUOTA = int(os.getenv("SERPAPI_MONTHLY_QUOTA", "0"))
+SERPAPI_MAX_RETRIES = int(os.getenv("SERPAPI_MAX_RETRIES", "3"))
+SERPAPI_BACKOFF_BASE = 0.5
+# a Retry-After header never holds a request longer than this
+SERPAPI_MAX_RETRY_AFTER = float(os.getenv("SERPAPI_MAX_RETRY_AFTER", "30"))
+SERP_CACHE_PATH = os.getenv("SERP_CACHE_PATH", ".cache/serp_results.sqlite3")
+SERP_CACHE_TTL = int(os.getenv("SERP_CACHE_TTL", str(3 * 24 * 3600)))
+SERP_QUOTA_PATH = os.getenv("SERP_QUOTA_PATH", ".cache/serp_quota.sqlite3")
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+_cache = ResponseCache(
+    memory_entries=512,
+    disk_path=SERP_CACHE_PATH,
+    ttls={},
+    default_ttl=SERP_CACHE_TTL,
+)
+_bucket = TokenBucket(SERPAPI_QPS)
+_quota = MonthlyQuota(SERPAPI_MONTHLY_QUOTA, SERP_QUOTA_PATH)
+
+_metrics_lock = threading.Lock()
+_metrics = {
+    "requests": 0,
+    "api_calls": 0,
+    "coalesced": 0,
+    "throttled_retries": 0,
+    "quota_rejections": 0,
+    "errors": 0,
+}
+
+# In-flight request coalescing: identical queries share one API call.
+# asyncio futures belong to one loop, so async callers coalesce per loop.
+_inflight_sync: Dict[str, Future] = {}
+_inflight_async: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = \
+    weakref.WeakKeyDictionary()
+_inflight_lock = threading.Lock()
+
+
+class _Throttled(Exception):
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__("SerpAPI throttled the request")
+        self.retry_after = retry_after
+
+
+def _count(name: str, value: int = 1) -> None:
+    with _metrics_lock:
+        _metrics[name] += value
+    SERP_EVENTS.inc(value, event=name)
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _cache_key(query: str, num_results: int, gl: Optional[str], hl: Optional[str]) -> str:
+    return make_cache_key("serp", SERPAPI_ENGINE, _normalize_query(query), num_results, gl, hl)
+
+
+def _build_params(query: str,
+                  num_results: int,
+                  gl: Optional[str] = None,
+                  hl: Optional[str] = None) -> Dict[str, Any]:
+    params = {
+        "engine": SERPAPI_ENGINE,
+        "q": query,
+        "api_key": SERPAPI_API_KEY,
+        "num": num_results,
+    }
+    if gl:
+        params["gl"] = gl
+    if hl:
+        params["hl"] = hl
+    return params
+
+
+def _backoff_delay(attempt: int, retry_after: Optional[float]) -> float:
+    if retry_after is not None:
+        return min(max(retry_after, 0.0), SERPAPI_MAX_RETRY_AFTER)
+    return SERPAPI_BACKOFF_BASE * (2 ** attempt) * (0.5 + random.random())
+
+
+def _retry_after(headers: Any) -> Optional[float]:
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
 
 
-def google_search_news(query: str, num_results: int = 5) -> List[Dict[str, Any]]:
+def _handle_status(status_code: int, headers: Any) -> None:
+    if status_code in RETRYABLE_STATUS:
+        raise _Throttled(_retry_after(headers))
+
+
+def serp_stats() -> Dict[str, Any]:
+    with _metrics_lock:
+        counters = dict(_metrics)
+    return {
+        **counters,
+        "cache": _cache.stats(),
+        "quota_month": MonthlyQuota.current_month(),
+        "quota_used": _quota.used(),
+        "quota_limit": _quota.limit or None,
+        "quota_remaining": _quota.remaining(),
+    }
+
+
+# ----------------------------------------------------
+# SYNC PATH
+# ----------------------------------------------------
+def _fetch(params: Dict[str, Any], num_results: int) -> List[Dict[str, Any]]:
+    for attempt in range(SERPAPI_MAX_RETRIES + 1):
+        if not _quota.reserve():
+            _count("quota_rejections")
+            return []
+        _bucket.acquire()
+        _count("api_calls")
+        try:
+            with SERP_CALL_SECONDS.time():
+                res = fetch(SERPAPI_URL, params=params, timeout=SERPAPI_TIMEOUT, max_bytes=None)
+            _handle_status(res.status_code, res.headers)
+            res.raise_for_status()
+            return res.json().get("organic_results", [])[:num_results]
+        except (_Throttled, httpx.TransportError) as exc:
+            _quota.release()
+            if attempt == SERPAPI_MAX_RETRIES:
+                break
+            _count("throttled_retries")
+            time.sleep(_backoff_delay(attempt, getattr(exc, "retry_after", None)))
+        except Exception:
+            _quota.release()
+            break
+    _count("errors")
+    return []
+
+
+def google_search_news(query: str,
+                       num_results: int = 5,
+                       gl: Optional[str] = None,
+                       hl: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     Simple Google search using SerpAPI.
     If SERPAPI_API_KEY is missing, returns an empty list instead of crashing.
+
+    Results are cached per (engine, normalized query, num, locale), calls go
+    through the QPS bucket and monthly quota (reserved before each call and
+    given back if it fails), and throttled calls are retried with backoff,
+    honouring Retry-After up to SERPAPI_MAX_RETRY_AFTER. Failures still
+    degrade to an empty list.
     """
     if not SERPAPI_API_KEY:
         # Graceful fallback
         return []
 
-    params = {
-        "engine": "google",
-        "q": query,
-        "api_key": SERPAPI_API_KEY,
-        "num": num_results,
-    }
+    _count("requests")
+    key = _cache_key(query, num_results, gl, hl)
+    cached = _cache.get(key)
+    if cached is not None:
+        SERP_EVENTS.inc(event="cache_hits")
+        return cached["results"]
+
+    with _inflight_lock:
+        future = _inflight_sync.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight_sync[key] = Future()
+    if not owner:
+        _count("coalesced")
+        return future.result()
 
     try:
-        res = requests.get(SERPAPI_URL, params=params, timeout=15)
-        res.raise_for_status()
-        data = res.json()
-        return data.get("organic_results", [])[:num_results]
-    except Exception:
+        results = _fetch(_build_params(query, num_results, gl, hl), num_results)
+        if results:
+            _cache.set(key, {"results": results})
+        future.set_result(results)
+        return results
+    finally:
+        if not future.done():
+            future.set_result([])
+        with _inflight_lock:
+            _inflight_sync.pop(key, None)
+
+
+# ----------------------------------------------------
+# ASYNC PATH
+# ----------------------------------------------------
+async def _fetch_async(params: Dict[str, Any], num_results: int) -> List[Dict[str, Any]]:
+    # quota reservations and cache reads/writes commit to SQLite, so they
+    # run on worker threads
+    for attempt in range(SERPAPI_MAX_RETRIES + 1):
+        if not await asyncio.to_thread(_quota.reserve):
+            _count("quota_rejections")
+            return []
+        await _bucket.acquire_async()
+        _count("api_calls")
+        try:
+            with SERP_CALL_SECONDS.time():
+                res = await fetch_async(SERPAPI_URL, params=params, timeout=SERPAPI_TIMEOUT,
+                                        max_bytes=None)
+            _handle_status(res.status_code, res.headers)
+            res.raise_for_status()
+            return res.json().get("organic_results", [])[:num_results]
+        except (_Throttled, httpx.TransportError) as exc:
+            await asyncio.to_thread(_quota.release)
+            if attempt == SERPAPI_MAX_RETRIES:
+                break
+            _count("throttled_retries")
+            await asyncio.sleep(_backoff_delay(attempt, getattr(exc, "retry_after", None)))
+        except Exception:
+            await asyncio.to_thread(_quota.release)
+            break
+    _count("errors")
+    return []
+
+
+async def google_search_news_async(query: str,
+                                   num_results: int = 5,
+                                   gl: Optional[str] = None,
+                                   hl: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Async variant of google_search_news() with the same cache, scheduling
+    and fallbacks.
+    """
+    if not SERPAPI_API_KEY:
         return []
+
+    _count("requests")
+    key = _cache_key(query, num_results, gl, hl)
+    cached = await asyncio.to_thread(_cache.get, key)
+    if cached is not None:
+        SERP_EVENTS.inc(event="cache_hits")
+        return cached["results"]
+
+    loop = asyncio.get_running_loop()
+    with _inflight_lock:
+        inflight = _inflight_async.setdefault(loop, {})
+    pending = inflight.get(key)
+    if pending is not None:
+        _count("coalesced")
+        return await asyncio.shield(pending)
+
+    future = loop.create_future()
+    inflight[key] = future
+    try:
+        results = await _fetch_async(_build_params(query, num_results, gl, hl), num_results)
+        if results:
+            await asyncio.to_thread(_cache.set, key, {"results": results})
+        future.set_result(results)
+        return results
+    finally:
+        if not future.done():
+            future.set_result([])
+        inflight.pop(key, None)
@@ -0,0 +1,103 @@
+# backend_api/utils/sitemap.py
+
+import os
+import xml.etree.ElementTree as ET
+import zlib
+from typing import Dict, List, Set, Tuple
+
+import httpx
+
+from .http_client import fetch_async
+
+SITEMAP_MAX_CHILDREN = 50
+SITEMAP_READ_TIMEOUT = 15.0
+# Decompressed size cap; the sitemap protocol itself allows at most 50 MB
+SITEMAP_MAX_BYTES = int(os.getenv("SITEMAP_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+class SitemapError(ValueError):
+    """A sitemap body that cannot be read (not XML, or truncated, corrupt or oversized gzip)."""
+
+
+def _gunzip(body: bytes, max_bytes: int) -> bytes:
+    """Incremental gunzip that stops at `max_bytes` of output instead of exhausting memory."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        data = decompressor.decompress(body, max_bytes)
+    except zlib.error as exc:
+        raise SitemapError(f"corrupt gzip: {exc}") from None
+    if decompressor.unconsumed_tail:
+        raise SitemapError(f"decompresses to more than {max_bytes} bytes")
+    if not decompressor.eof:
+        raise SitemapError("truncated gzip (body cut off or incomplete)")
+    return data
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_sitemap(body: bytes, max_bytes: int = SITEMAP_MAX_BYTES) -> Tuple[List[str], List[str]]:
+    """
+    (page urls, child sitemap urls) from a <urlset> or <sitemapindex>.
+    Gzipped bodies are accepted. Unparsable XML, another root element, or
+    a gzip body that is truncated, corrupt or larger than `max_bytes`
+    raises SitemapError.
+    """
+    if body[:2] == b"\x1f\x8b":
+        body = _gunzip(body, max_bytes)
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError as exc:
+        raise SitemapError(f"not valid XML: {exc}") from None
+    if _local(root.tag) not in ("urlset", "sitemapindex"):
+        raise SitemapError(f"not a sitemap (root element <{_local(root.tag)}>)")
+
+    locs = [
+        (el.text or "").strip()
+        for entry in root
+        for el in entry
+        if _local(el.tag) == "loc" and (el.text or "").strip()
+    ]
+    if _local(root.tag) == "sitemapindex":
+        return [], locs
+    return locs, []
+
+
+async def load_sitemap(url: str, limit: int) -> Tuple[List[str], List[Dict[str, str]]]:
+    """
+    Page URLs listed by the sitemap at `url`, following a sitemap index
+    (up to SITEMAP_MAX_CHILDREN children) until `limit` URLs are found,
+    plus {"url", "error"} for every sitemap that could not be read. A bad
+    sitemap never raises; its siblings are still followed.
+    """
+    urls: List[str] = []
+    failed: List[Dict[str, str]] = []
+    seen: Set[str] = set()
+    queue = [url]
+    visited = 0
+    while queue and len(urls) < limit and visited <= SITEMAP_MAX_CHILDREN:
+        current = queue.pop(0)
+        visited += 1
+        try:
+            res = await fetch_async(current, timeout=SITEMAP_READ_TIMEOUT, max_bytes=SITEMAP_MAX_BYTES)
+        except (httpx.HTTPError, httpx.InvalidURL, ValueError) as exc:
+            failed.append({"url": current, "error": str(exc) or type(exc).__name__})
+            continue
+        if not res.ok:
+            failed.append({"url": current, "error": f"HTTP {res.status_code}"})
+            continue
+        if res.truncated:
+            failed.append({"url": current, "error": f"larger than {SITEMAP_MAX_BYTES} bytes"})
+            continue
+        try:
+            pages, children = parse_sitemap(res.content)
+        except SitemapError as exc:
+            failed.append({"url": current, "error": str(exc)})
+            continue
+        queue.extend(children)
+        for page in pages:
+            if page not in seen:
+                seen.add(page)
+                urls.append(page)
+    return urls[:limit], failed
@@ -0,0 +1,145 @@
+# backend_api/utils/task_graph.py
+
+import asyncio
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+# name -> (dependency names, fn(dep_results) -> result)
+AsyncTasks = Dict[str, Tuple[Sequence[str], Callable[[Dict[str, Any]], Awaitable[Any]]]]
+SyncTasks = Dict[str, Tuple[Sequence[str], Callable[[Dict[str, Any]], Any]]]
+
+
+class TaskFailed(Exception):
+    def __init__(self, name: str, reason: Any):
+        if isinstance(reason, dict) and "error" in reason:
+            reason = reason["error"]
+        super().__init__(f"{name} failed: {reason}")
+        self.name = name
+        self.reason = reason
+
+
+def topological_order(tasks: Dict[str, Tuple[Sequence[str], Any]]) -> List[str]:
+    """
+    Kahn's algorithm; raises ValueError on unknown dependencies or cycles.
+    Ties keep the declaration order of `tasks`.
+    """
+    for name, (deps, _) in tasks.items():
+        missing = [d for d in deps if d not in tasks]
+        if missing:
+            raise ValueError(f"{name} depends on unknown task(s): {missing}")
+
+    remaining = {name: set(deps) for name, (deps, _) in tasks.items()}
+    order: List[str] = []
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"dependency cycle among: {sorted(remaining)}")
+        for name in ready:
+            order.append(name)
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return order
+
+
+def _never_fails(_: Any) -> bool:
+    return False
+
+
+def _split(outcomes: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    results, errors = {}, {}
+    for name, outcome in outcomes.items():
+        if isinstance(outcome, BaseException):
+            errors[name] = str(outcome)
+        else:
+            results[name] = outcome
+    return results, errors
+
+
+async def run_dag_async(tasks: AsyncTasks,
+                        max_concurrency: int = 4,
+                        retries: int = 1,
+                        is_failure: Callable[[Any], bool] = _never_fails) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Start every task as soon as its dependencies finish, with at most
+    `max_concurrency` task bodies running at once. A task whose result
+    `is_failure` (or that raises) is retried up to `retries` times on its
+    own; dependents of a task that still fails are skipped.
+
+    Returns (results, errors) keyed by task name.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    futures: Dict[str, "asyncio.Task[Any]"] = {}
+
+    async def _run(name: str) -> Any:
+        deps, fn = tasks[name]
+        dep_results = {}
+        for dep in deps:
+            try:
+                dep_results[dep] = await futures[dep]
+            except Exception as exc:
+                raise TaskFailed(name, f"dependency {dep} failed") from exc
+
+        reason: Any = None
+        for _ in range(retries + 1):
+            try:
+                async with semaphore:
+                    result = await fn(dep_results)
+            except Exception as exc:
+                reason = exc
+                continue
+            if not is_failure(result):
+                return result
+            reason = result
+        raise TaskFailed(name, reason)
+
+    for name in topological_order(tasks):
+        futures[name] = asyncio.ensure_future(_run(name))
+
+    outcomes = await asyncio.gather(*futures.values(), return_exceptions=True)
+    return _split(dict(zip(futures.keys(), outcomes)))
+
+
+def run_dag(tasks: SyncTasks,
+            max_concurrency: int = 4,
+            retries: int = 1,
+            is_failure: Callable[[Any], bool] = _never_fails) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Thread-pool counterpart of run_dag_async() for blocking task bodies.
+    Tasks are submitted in topological order, so by the time a worker
+    picks a task its dependencies are already running or done. Each task
+    runs in a copy of the caller's context (e.g. gemini_client.track_usage).
+    """
+    futures: Dict[str, Future] = {}
+
+    def _run(name: str) -> Any:
+        deps, fn = tasks[name]
+        dep_results = {}
+        for dep in deps:
+            try:
+                dep_results[dep] = futures[dep].result()
+            except Exception as exc:
+                raise TaskFailed(name, f"dependency {dep} failed") from exc
+
+        reason: Any = None
+        for _ in range(retries + 1):
+            try:
+                result = fn(dep_results)
+            except Exception as exc:
+                reason = exc
+                continue
+            if not is_failure(result):
+                return result
+            reason = result
+        raise TaskFailed(name, reason)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        for name in topological_order(tasks):
+            futures[name] = pool.submit(contextvars.copy_context().run, _run, name)
+
+    outcomes = {}
+    for name, future in futures.items():
+        exc = future.exception()
+        outcomes[name] = exc if exc is not None else future.result()
+    return _split(outcomes)
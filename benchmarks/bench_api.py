@@ -0,0 +1,231 @@
+# benchmarks/bench_api.py
+"""
+Offline load test of every FastAPI endpoint against local fakes.
+
+    python benchmarks/bench_api.py
+    python benchmarks/bench_api.py --requests 200 --concurrency 32 --gemini-latency 0.8:2.5
+    python benchmarks/bench_api.py --scenarios seo,seo_crawl --json results.json
+
+Gemini is replaced by FakeGeminiModel, SerpAPI by a local FakeSerpServer and
+the SEO target by a generated StaticSite, so no network or credentials are
+needed. Requests go through httpx's ASGI transport (no sockets to the app).
+Reports throughput, p50/p95/p99 latency and memory per scenario; --json
+writes the same numbers for comparing runs.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fakes import (FakeGeminiModel, FakeSerpServer, LatencyDist, StaticSite,  # noqa: E402
+                   configure_offline_env)
+
+Payload = Callable[[int], Dict[str, Any]]
+
+
+def _campaign(i: int) -> Dict[str, Any]:
+    return {
+        "business_info": f"Bench bakery #{i}",
+        "campaign_goal": "Grow weekday orders",
+        "product_info": "Sourdough subscriptions",
+        "audience": "Office workers nearby",
+        "platforms": ["Instagram", "Email", "LinkedIn"],
+        "duration_weeks": 4,
+        "posts_per_week": 3,
+    }
+
+
+def _keywords(i: int) -> Dict[str, Any]:
+    return {
+        "business_info": f"Bench bakery #{i}",
+        "product_info": "Sourdough subscriptions",
+        "audience": "Office workers nearby",
+        "seed_keywords": [f"sourdough delivery {i}", "bakery subscription"],
+        "competitor_domains": ["example0.com", "example1.com"],
+        "fan_out": True,
+    }
+
+
+def _forecast(i: int) -> Dict[str, Any]:
+    return {"business_info": f"Bench bakery #{i}", "campaign_goal": "Grow weekday orders",
+            "platforms": ["Instagram", "Email"], "budget": 500 + i}
+
+
+def scenarios(site_url: str) -> Dict[str, Tuple[str, str, Payload]]:
+    """name -> (kind, path, payload(i)); kind is json, stream or job."""
+    return {
+        "health": ("get", "/api/health", lambda i: {}),
+        "campaign": ("json", "/api/generate_campaign", _campaign),
+        "campaign_sectioned": ("json", "/api/generate_campaign",
+                               lambda i: {**_campaign(i), "sectioned": True}),
+        "campaign_stream": ("stream", "/api/generate_campaign/stream", _campaign),
+        "campaign_batch": ("stream", "/api/generate_campaign/batch",
+                           lambda i: {"briefs": [_campaign(i * 5 + k) for k in range(5)]}),
+        "seo": ("json", "/api/seo_analyze",
+                lambda i: {"url": f"{site_url}/page-{i % 50 + 1}.html",
+                           "target_keywords": ["sourdough"]}),
+        "seo_crawl": ("json", "/api/seo_analyze",
+                      lambda i: {"url": f"{site_url}/index.html", "depth": 2, "max_pages": 30,
+                                 "target_keywords": [f"bread {i}"]}),
+        "seo_bulk": ("stream", "/api/seo_analyze/bulk",
+                     lambda i: {"urls": [f"{site_url}/page-{(i * 25 + k) % 59 + 1}.html"
+                                         for k in range(25)],
+                                "target_keywords": [f"bread {i}"]}),
+        "keywords": ("json", "/api/keyword_research", _keywords),
+        "forecast": ("json", "/api/performance_forecast", _forecast),
+        "calendar": ("json", "/api/content_calendar", _campaign),
+        "calendar_stream": ("stream", "/api/content_calendar/stream", _campaign),
+        "forecast_job": ("job", "/api/performance_forecast", _forecast),
+    }
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+async def _one(client: Any, kind: str, path: str, body: Dict[str, Any]) -> bool:
+    if kind == "get":
+        res = await client.get(path)
+    elif kind == "job":
+        res = await client.post(path, params={"async": "true"}, json=body)
+        if res.status_code != 202:
+            return False
+        job_id = res.json()["job_id"]
+        while True:
+            res = await client.get(f"/api/jobs/{job_id}", params={"wait": 10})
+            if res.json()["status"] in ("done", "failed", "cancelled"):
+                return res.json()["status"] == "done"
+    else:
+        res = await client.post(path, json=body)
+        if kind == "stream":
+            lines = [json.loads(line) for line in res.text.splitlines() if line]
+            return res.status_code == 200 and not any(e["event"] == "error" for e in lines)
+    return res.status_code < 400 and "error" not in res.text[:200]
+
+
+async def run_scenario(client: Any, kind: str, path: str, payload: Payload,
+                       requests: int, concurrency: int) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def _task(i: int) -> None:
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                ok = await _one(client, kind, path, payload(i))
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            failures += not ok
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    await asyncio.gather(*(_task(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    result = {
+        "requests": requests,
+        "failures": failures,
+        "seconds": round(elapsed, 3),
+        "rps": round(requests / elapsed, 2),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 1),
+        "max_rss_mb": round(rss_after / 1024, 1),
+        "rss_growth_mb": round((rss_after - rss_before) / 1024, 1),
+    }
+    if tracemalloc.is_tracing():
+        result["py_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        tracemalloc.reset_peak()
+    return result
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    tmp = tempfile.TemporaryDirectory(prefix="bench-api-")
+    configure_offline_env(tmp.name)
+
+    import httpx
+    from backend_api.main import app
+    from backend_api.utils import gemini_client, serp_client
+    from backend_api.utils.rate_limiter import TokenBucket
+
+    model = FakeGeminiModel(LatencyDist.parse(args.gemini_latency, seed=args.seed),
+                            error_rate=args.gemini_error_rate, seed=args.seed)
+    gemini_client.set_model(model)
+    if not args.cache:
+        gemini_client.set_cache(None)
+
+    results: Dict[str, Any] = {}
+    with FakeSerpServer(LatencyDist.parse(args.serp_latency, seed=args.seed)) as serp, \
+            StaticSite(pages=args.site_pages,
+                       latency=LatencyDist.parse(args.site_latency, seed=args.seed)) as site:
+        serp_client.SERPAPI_URL = serp.search_url
+        serp_client.SERPAPI_API_KEY = "offline-benchmark"
+        serp_client._bucket = TokenBucket(0)
+
+        all_scenarios = scenarios(site.base_url)
+        names = args.scenarios.split(",") if args.scenarios else list(all_scenarios)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                     timeout=300) as client:
+            print(f"{'scenario':<20}{'req':>6}{'fail':>6}{'rps':>9}{'p50':>9}{'p95':>9}"
+                  f"{'p99':>9}{'rss MB':>9}")
+            for name in names:
+                kind, path, payload = all_scenarios[name]
+                calls_before = model.calls
+                result = await run_scenario(client, kind, path, payload,
+                                            args.requests, args.concurrency)
+                result["gemini_calls"] = model.calls - calls_before
+                results[name] = result
+                print(f"{name:<20}{result['requests']:>6}{result['failures']:>6}"
+                      f"{result['rps']:>9.1f}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}"
+                      f"{result['p99_ms']:>9.1f}{result['max_rss_mb']:>9.1f}")
+        print(f"fake SerpAPI requests: {serp.requests}")
+
+    tmp.cleanup()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=40, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenarios", help="comma-separated subset (default: all)")
+    parser.add_argument("--gemini-latency", default="0.05:0.2",
+                        help="seconds, 'median' or 'median:p95' (log-normal)")
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--serp-latency", default="0.02:0.08")
+    parser.add_argument("--site-latency", default="0.005:0.02")
+    parser.add_argument("--site-pages", type=int, default=60)
+    parser.add_argument("--cache", action="store_true", help="keep the Gemini response cache on")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="also report Python heap peak (slower)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    results = asyncio.run(main_async(args))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"args": vars(args), "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
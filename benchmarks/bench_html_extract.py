@@ -0,0 +1,148 @@
+# benchmarks/bench_html_extract.py
+"""
+Compare the streaming extractor against the old BeautifulSoup path.
+
+    python benchmarks/bench_html_extract.py --corpus saved_pages/
+    python benchmarks/bench_html_extract.py --synthetic 200
+
+--corpus reads every *.html / *.htm file under the directory (saved pages);
+without it a synthetic corpus of realistic-looking pages is generated.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from backend_api.utils.html_extract import extract_seo_signals  # noqa: E402
+
+
+def bs4_page_info(html: str) -> Dict[str, str]:
+    """The pre-extractor implementation of seo_analyzer._extract_page_info."""
+    title = ""
+    meta_desc = ""
+    h1 = ""
+    soup = BeautifulSoup(html, "html.parser")
+    if soup.title and soup.title.string:
+        title = soup.title.string.strip()
+    desc_tag = soup.find("meta", attrs={"name": "description"})
+    if desc_tag and desc_tag.get("content"):
+        meta_desc = desc_tag["content"].strip()
+    h1_tag = soup.find("h1")
+    if h1_tag:
+        h1 = h1_tag.get_text(strip=True)
+    return {"title": title, "meta_description": meta_desc, "h1": h1}
+
+
+def bs4_full(html: str) -> Dict[str, object]:
+    soup = BeautifulSoup(html, "html.parser")
+    return {
+        "title": soup.title.string if soup.title else "",
+        "meta": {m.get("name"): m.get("content") for m in soup.find_all("meta") if m.get("name")},
+        "headings": [h.get_text(strip=True) for h in soup.find_all(["h1", "h2", "h3"])],
+        "links": [a["href"] for a in soup.find_all("a", href=True)],
+        "images": [img.get("alt") for img in soup.find_all("img")],
+        "word_count": len(soup.get_text(" ").split()),
+    }
+
+
+def synthetic_page(rng: random.Random, paragraphs: int) -> str:
+    words = ["marketing", "seo", "campaign", "growth", "content", "brand", "audience",
+             "conversion", "traffic", "search", "ranking", "keyword", "social", "email"]
+
+    def sentence() -> str:
+        return " ".join(rng.choice(words) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+    head = (
+        "<head><meta charset='utf-8'><title>" + sentence()[:55] + "</title>"
+        "<meta name='description' content='" + sentence() + "'>"
+        "<link rel='canonical' href='/page'>"
+        "<link rel='stylesheet' href='/s.css'>"
+        "<script>var x = {a: 1, b: [1,2,3]};</script>"
+        "<script type='application/ld+json'>{\"@type\": \"Article\"}</script></head>"
+    )
+    body = ["<body><nav>" + "".join(f"<a href='/n{i}'>Nav {i}</a>" for i in range(30)) + "</nav>",
+            "<h1>" + sentence() + "</h1>"]
+    for i in range(paragraphs):
+        if i % 5 == 0:
+            body.append("<h2>" + sentence() + "</h2>")
+        body.append("<p>" + " ".join(sentence() for _ in range(5))
+                    + f" <a href='/p{i}'>more</a> <img src='/i{i}.png' alt='img {i}'></p>")
+    body.append("</body>")
+    return "<!doctype html><html>" + head + "".join(body) + "</html>"
+
+
+def load_corpus(args: argparse.Namespace) -> List[str]:
+    if args.corpus:
+        root = Path(args.corpus)
+        files = sorted(p for p in root.rglob("*") if p.suffix.lower() in (".html", ".htm"))
+        return [p.read_text(encoding="utf-8", errors="replace") for p in files]
+    rng = random.Random(42)
+    return [synthetic_page(rng, rng.choice([20, 80, 300])) for _ in range(args.synthetic)]
+
+
+def run(name: str, fn: Callable[[str], object], pages: List[str], repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        for html in pages:
+            t0 = time.perf_counter()
+            fn(html)
+            timings.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    for html in pages:
+        fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "name": name,
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p95_ms": sorted(timings)[int(len(timings) * 0.95) - 1] * 1000,
+        "total_s": sum(timings) / repeat,
+        "peak_kb": peak / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", help="directory of saved HTML pages")
+    parser.add_argument("--synthetic", type=int, default=100, help="synthetic pages if no corpus")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_corpus(args)
+    if not pages:
+        sys.exit("no pages found")
+    size_kb = sum(len(p) for p in pages) / 1024
+    print(f"{len(pages)} pages, {size_kb:.0f} KiB total, repeat={args.repeat}\n")
+
+    full_fields = ("title", "meta", "canonical", "hreflang", "headings", "links",
+                   "images", "word_count", "structured_data")
+    results = [
+        run("bs4 title/meta/h1", bs4_page_info, pages, args.repeat),
+        run("stream title/meta/h1", lambda h: extract_seo_signals(h, fields=("title", "meta", "h1")),
+            pages, args.repeat),
+        run("bs4 full", bs4_full, pages, args.repeat),
+        run("stream full", lambda h: extract_seo_signals(h, fields=full_fields), pages, args.repeat),
+    ]
+
+    print(f"{'path':<22}{'mean ms':>10}{'p95 ms':>10}{'total s':>10}{'peak KiB':>11}")
+    for r in results:
+        print(f"{r['name']:<22}{r['mean_ms']:>10.3f}{r['p95_ms']:>10.3f}"
+              f"{r['total_s']:>10.3f}{r['peak_kb']:>11.0f}")
+
+    print(f"\nspeedup title/meta/h1: {results[0]['mean_ms'] / results[1]['mean_ms']:.1f}x")
+    print(f"speedup full:          {results[2]['mean_ms'] / results[3]['mean_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/bench_keyword_clusters.py
+"""
+Keyword clustering throughput on synthetic keyword sets.
+
+    python benchmarks/bench_keyword_clusters.py
+    python benchmarks/bench_keyword_clusters.py --sizes 1000,20000,50000 --repeat 5
+
+Each set is built from topic head terms combined with modifiers, then
+inflected, reordered and punctuated, so the ground-truth topic of every
+keyword is known. Reports wall time (best of --repeat), keywords per second,
+duplicates folded, cluster count and purity (share of keywords whose
+cluster's majority topic is their own topic).
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend_api.utils.keyword_clusters import cluster_keywords, normalize_keyword  # noqa: E402
+
+NOUNS = ("crm software lead tracker email campaign payroll tool invoice app project board "
+         "sourdough bread coffee grinder standing desk yoga mat running shoe office chair "
+         "seo audit backlink checker landing page builder webinar platform budget planner "
+         "meal kit dog food bike helmet tax filing vpn service password manager").split()
+QUALIFIERS = ("best cheap free top affordable enterprise small business online local "
+              "open source premium simple fast secure").split()
+INTENTS = ("for startups for teams for beginners near me reviews pricing alternatives "
+           "vs competitors how to choose comparison 2024 guide tutorial discount").split(" ")
+
+
+def synthetic_keywords(size: int, topics: int, seed: int = 0) -> Tuple[List[str], List[int]]:
+    """(keywords, topic id per keyword)."""
+    rng = random.Random(seed)
+    heads = []
+    while len(heads) < topics:
+        head = " ".join(rng.sample(NOUNS, 2))
+        if head not in heads:
+            heads.append(head)
+    keywords, labels = [], []
+    while len(keywords) < size:
+        topic = rng.randrange(topics)
+        words = heads[topic].split()
+        if rng.random() < 0.5:
+            words = [rng.choice(QUALIFIERS)] + words
+        if rng.random() < 0.5:
+            words = words + rng.choice(INTENTS).split()
+        if rng.random() < 0.3:
+            words = [w + "s" if not w.endswith("s") else w for w in words]
+        if rng.random() < 0.1:
+            words = list(reversed(words))
+        keyword = " ".join(words)
+        if rng.random() < 0.2:
+            keyword = keyword.title()
+        if rng.random() < 0.1:
+            keyword += "?"
+        keywords.append(keyword)
+        labels.append(topic)
+    return keywords, labels
+
+
+def purity(result: Dict, keywords: List[str], labels: List[int]) -> float:
+    topic_of: Dict[str, Counter] = {}
+    for keyword, label in zip(keywords, labels):
+        topic_of.setdefault(normalize_keyword(keyword), Counter())[label] += 1
+    correct = total = 0
+    for cluster in result["clusters"]:
+        counts = Counter()
+        for member in cluster["keywords"]:
+            counts.update(topic_of.get(member, Counter()))
+        if counts:
+            correct += counts.most_common(1)[0][1]
+            total += sum(counts.values())
+    return correct / total if total else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--topics", type=int, default=0,
+                        help="topics per set (default: size / 100)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'keywords':>9}{'topics':>8}{'best ms':>10}{'median ms':>11}{'kw/s':>11}"
+          f"{'unique':>8}{'clusters':>10}{'purity':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        topics = args.topics or max(5, size // 100)
+        keywords, labels = synthetic_keywords(size, topics, args.seed)
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = cluster_keywords(keywords)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        row = {
+            "topics": topics,
+            "best_ms": round(best * 1000, 1),
+            "median_ms": round(statistics.median(timings) * 1000, 1),
+            "keywords_per_second": round(size / best),
+            "unique_keywords": result["stats"]["unique_keywords"],
+            "clusters": result["stats"]["clusters"],
+            "purity": round(purity(result, keywords, labels), 3),
+        }
+        results[size] = row
+        print(f"{size:>9}{topics:>8}{row['best_ms']:>10.1f}{row['median_ms']:>11.1f}"
+              f"{row['keywords_per_second']:>11}{row['unique_keywords']:>8}"
+              f"{row['clusters']:>10}{row['purity']:>8.3f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"args": vars(args), "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
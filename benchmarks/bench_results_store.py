@@ -0,0 +1,111 @@
+# benchmarks/bench_results_store.py
+"""
+Campaign results store: ingest and query latency on synthetic history.
+
+    python benchmarks/bench_results_store.py
+    python benchmarks/bench_results_store.py --rows 5000000 --clients 5 --repeat 10
+
+Builds --clients clients with two years of daily rows across six platforms
+and enough campaigns to reach --rows in total, ingests them month by month
+into a temporary store, then times the queries the API and the forecast
+run (best and median of --repeat, caches warm): overall totals, group-bys by
+platform, month x platform, week x platform and campaign, a 7-day rolling
+series and the per-platform forecast benchmarks.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend_api.utils.results_store import ResultsStore  # noqa: E402
+
+PLATFORMS = np.array(["Facebook", "Instagram", "LinkedIn", "Google Ads", "TikTok", "Email"])
+DAYS = 730
+
+
+def synthetic_client(rows: int, seed: int):
+    """Column arrays for one client: DAYS days x platforms x campaigns."""
+    rng = np.random.default_rng(seed)
+    campaigns = max(1, rows // (DAYS * len(PLATFORMS)))
+    day = np.repeat(np.arange(DAYS), len(PLATFORMS) * campaigns)
+    platform = np.tile(np.repeat(np.arange(len(PLATFORMS)), campaigns), DAYS)
+    campaign = np.tile(np.arange(campaigns), DAYS * len(PLATFORMS))
+    n = len(day)
+    impressions = rng.integers(100, 5000, n)
+    clicks = rng.binomial(impressions, 0.004 + 0.002 * platform)
+    return {
+        "date": np.datetime64("2023-01-01") + day,
+        "platform": PLATFORMS[platform],
+        "campaign": np.char.add("campaign-", campaign.astype(str)),
+        "spend": clicks * rng.uniform(0.5, 3.0, n),
+        "impressions": impressions,
+        "clicks": clicks,
+        "conversions": rng.binomial(clicks, 0.03).astype(float),
+    }
+
+
+def timed(fn, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, min(timings), statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000, help="rows across all clients")
+    parser.add_argument("--clients", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        store = ResultsStore(root)
+        started = time.perf_counter()
+        for index in range(args.clients):
+            columns = synthetic_client(args.rows // args.clients, seed=index)
+            store.ingest(f"client-{index}", columns)
+        ingest_s = time.perf_counter() - started
+        total = store.stats()["rows"]
+        print(f"ingested {total:,} rows for {args.clients} clients in {ingest_s:.1f}s "
+              f"({total / ingest_s:,.0f} rows/s)")
+
+        client = "client-0"
+        queries = {
+            "totals (all clients)": lambda: store.aggregate(None, ()),
+            "by platform": lambda: store.aggregate(client, ("platform",)),
+            "by month x platform": lambda: store.aggregate(client, ("month", "platform")),
+            "by week x platform": lambda: store.aggregate(client, ("week", "platform")),
+            "by campaign": lambda: store.aggregate(client, ("campaign",)),
+            "last 90 days by platform": lambda: store.aggregate(
+                client, ("platform",), start="2024-10-02", end="2024-12-30"),
+            "7-day rolling": lambda: store.rolling(client, window=7),
+            "forecast benchmarks": lambda: store.benchmarks(client),
+        }
+        results = {"rows": total, "ingest_s": round(ingest_s, 2), "queries": {}}
+        print(f"{'query':<28}{'rows':>11}{'groups':>8}{'best ms':>10}{'median ms':>11}")
+        for name, query in queries.items():
+            result, best, median = timed(query, args.repeat)
+            groups = len(result.get("groups", result.get("dates", result)))
+            scanned = result.get("rows_matched", 0)
+            results["queries"][name] = {"rows_matched": scanned, "groups": groups,
+                                        "best_ms": round(best, 2), "median_ms": round(median, 2)}
+            print(f"{name:<28}{scanned:>11,}{groups:>8}{best:>10.2f}{median:>11.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"args": vars(args), "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/bench_startup.py
+"""
+Measure cold start of the API: `import backend_api.main` and the first requests.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --eager   # also import google.generativeai up front
+
+Each run is a fresh interpreter, so module caches start cold (the OS page
+cache does not). --eager approximates the old import-time model setup for
+comparison.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Runs inside the child interpreter; prints one JSON line of timings (ms).
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+if {eager}:
+    import google.generativeai  # noqa: F401
+import backend_api.main as main
+t_import = time.perf_counter()
+
+from fastapi.testclient import TestClient
+client = TestClient(main.app)
+t1 = time.perf_counter()
+assert client.get("/api/health").status_code == 200
+t_health = time.perf_counter()
+client.get("/api/health")
+t_health2 = time.perf_counter()
+client.get("/api/stats")
+t_stats = time.perf_counter()
+
+print(json.dumps({{
+    "import_ms": (t_import - t0) * 1000,
+    "first_health_ms": (t_health - t1) * 1000,
+    "warm_health_ms": (t_health2 - t_health) * 1000,
+    "first_stats_ms": (t_stats - t_health2) * 1000,
+    "genai_loaded": "google.generativeai" in sys.modules,
+}}))
+"""
+
+
+def run_once(eager: bool) -> dict:
+    env = dict(os.environ)
+    env.setdefault("PYTHONWARNINGS", "ignore")
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD.format(eager=eager)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--eager", action="store_true",
+                        help="import google.generativeai before backend_api.main")
+    args = parser.parse_args()
+
+    runs = [run_once(args.eager) for _ in range(args.runs)]
+    print(f"{args.runs} cold starts{' (eager genai import)' if args.eager else ''}")
+    for key in ("import_ms", "first_health_ms", "warm_health_ms", "first_stats_ms"):
+        values = [r[key] for r in runs]
+        print(f"  {key:<16} median {statistics.median(values):8.1f}   "
+              f"min {min(values):8.1f}   max {max(values):8.1f}")
+    print(f"  google.generativeai loaded at startup: {runs[-1]['genai_loaded']}")
+
+
+if __name__ == "__main__":
+    main()
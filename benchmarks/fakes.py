@@ -0,0 +1,298 @@
+# benchmarks/fakes.py
+"""
+Offline stand-ins for the external services, used by the benchmarks.
+
+  FakeGeminiModel  drop-in for genai.GenerativeModel (plug in with
+                   gemini_client.set_model); answers with the prompt's own
+                   JSON template filled with filler text.
+  FakeSerpServer   local HTTP server speaking the subset of SerpAPI's
+                   search.json that serp_client reads.
+  StaticSite       local HTTP server over a generated site for the SEO
+                   fetcher and crawler.
+
+All latencies are drawn from seeded distributions, so runs are repeatable.
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+import types
+from http.server import SimpleHTTPRequestHandler, BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+FILLER = ("reach engaged buyers with clear messaging and measurable weekly goals "
+          "across search social and email channels").split()
+
+
+class LatencyDist:
+    """
+    Log-normal latency given a median and p95 (seconds); p95 <= median
+    gives a fixed latency. Thread-safe and seeded.
+    """
+
+    def __init__(self, median: float = 0.0, p95: Optional[float] = None, seed: int = 0):
+        self.median = median
+        self.sigma = math.log(p95 / median) / 1.645 if p95 and median and p95 > median else 0.0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec: str, seed: int = 0) -> "LatencyDist":
+        """'0.8' (fixed) or '0.8:2.5' (median:p95), in seconds."""
+        median, _, p95 = spec.partition(":")
+        return cls(float(median), float(p95) if p95 else None, seed)
+
+    def sample(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        if not self.sigma:
+            return self.median
+        with self._lock:
+            return self.median * math.exp(self._rng.gauss(0, self.sigma))
+
+
+# ----------------------------------------------------
+# GEMINI
+# ----------------------------------------------------
+def _fill(template: Any, rng: random.Random, depth: int = 0) -> Any:
+    if isinstance(template, dict):
+        return {key: _fill(value, rng, depth + 1) for key, value in template.items()}
+    if isinstance(template, list):
+        if template:
+            return [_fill(template[0], rng, depth + 1) for _ in range(3)]
+        return [" ".join(rng.sample(FILLER, 4)) for _ in range(3)]
+    if isinstance(template, bool):
+        return True
+    if isinstance(template, (int, float)):
+        return template
+    return " ".join(rng.sample(FILLER, 6))
+
+
+def template_from_prompt(prompt: str) -> Any:
+    """Pull the JSON structure gemini_client rendered into the prompt."""
+    marker = prompt.find("structure:")
+    start = prompt.find("{", marker if marker != -1 else 0)
+    if start == -1:
+        return {}
+    try:
+        value, _ = json.JSONDecoder().raw_decode(prompt[start:])
+        return value
+    except ValueError:
+        return {}
+
+
+class _Response:
+    def __init__(self, text: str, prompt: str):
+        self.text = text
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(text) // 4
+        self.usage_metadata = types.SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=completion_tokens,
+            total_token_count=prompt_tokens + completion_tokens,
+        )
+
+
+class _Stream:
+    def __init__(self, text: str, prompt: str, latency: float, chunk_size: int = 64):
+        self._parts = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)] or [""]
+        self._delay = latency / len(self._parts)
+        self._final = _Response(text, prompt)
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        for index, part in enumerate(self._parts):
+            await asyncio.sleep(self._delay)
+            chunk = types.SimpleNamespace(text=part, usage_metadata=None)
+            if index == len(self._parts) - 1:
+                chunk.usage_metadata = self._final.usage_metadata
+            yield chunk
+
+
+class FakeGeminiModel:
+    """
+    Answers every prompt with its template filled in, after a latency
+    drawn from `latency`. `responder(prompt) -> dict` overrides the reply;
+    `error_rate` makes a fraction of calls raise a 503-style error.
+    """
+
+    def __init__(self, latency: Optional[LatencyDist] = None,
+                 responder: Optional[Callable[[str], Any]] = None,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency or LatencyDist()
+        self.responder = responder
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _reply(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+            fail = self.error_rate and self._rng.random() < self.error_rate
+            seed = self._rng.random()
+        if fail:
+            raise FakeUnavailable("fake upstream unavailable")
+        if self.responder is not None:
+            return json.dumps(self.responder(prompt))
+        return json.dumps(_fill(template_from_prompt(prompt), random.Random(seed)))
+
+    def generate_content(self, prompt: str, **kwargs: Any) -> _Response:
+        time.sleep(self.latency.sample())
+        return _Response(self._reply(prompt), prompt)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, **kwargs: Any):
+        latency = self.latency.sample()
+        text = self._reply(prompt)
+        if stream:
+            return _Stream(text, prompt, latency)
+        await asyncio.sleep(latency)
+        return _Response(text, prompt)
+
+
+class FakeUnavailable(Exception):
+    code = 503
+
+
+# ----------------------------------------------------
+# LOCAL HTTP SERVERS
+# ----------------------------------------------------
+class _Server:
+    def __init__(self, handler: type):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FakeSerpServer(_Server):
+    """Serves /search.json with `num` deterministic organic results per query."""
+
+    def __init__(self, latency: Optional[LatencyDist] = None):
+        dist = latency or LatencyDist()
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                server.requests += 1
+                query = parse_qs(urlsplit(self.path).query)
+                q = query.get("q", [""])[0]
+                num = int(query.get("num", ["5"])[0])
+                time.sleep(dist.sample())
+                slug = "-".join(q.lower().split()) or "query"
+                body = json.dumps({"organic_results": [
+                    {
+                        "position": i + 1,
+                        "title": f"{q.title()} guide part {i + 1}",
+                        "link": f"https://example{i % 3}.com/{slug}/{i}",
+                        "snippet": f"Everything about {q} ({i + 1}).",
+                    }
+                    for i in range(num)
+                ]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        super().__init__(Handler)
+
+    @property
+    def search_url(self) -> str:
+        return self.base_url + "/search.json"
+
+
+def build_site(root: str, pages: int = 60, links_per_page: int = 5, seed: int = 0) -> List[str]:
+    """Write a linked static site of `pages` HTML files; returns their paths."""
+    rng = random.Random(seed)
+    paths = ["index.html"] + [f"page-{i}.html" for i in range(1, pages)]
+    for index, path in enumerate(paths):
+        links = rng.sample(paths, min(links_per_page, len(paths)))
+        paragraphs = "".join(f"<p>{' '.join(rng.choices(FILLER, k=60))}</p>" for _ in range(8))
+        html = (
+            "<!doctype html><html lang='en'><head>"
+            f"<title>Page {index} | Bench Site</title>"
+            f"<meta name='description' content='Benchmark page {index}'>"
+            f"<link rel='canonical' href='/{path}'>"
+            "</head><body>"
+            f"<h1>Benchmark page {index}</h1>{paragraphs}"
+            + "".join(f"<a href='/{link}'>{link}</a> " for link in links)
+            + ("<img src='/x.png'>" if index % 4 == 0 else "")
+            + "</body></html>"
+        )
+        with open(os.path.join(root, path), "w", encoding="utf-8") as fh:
+            fh.write(html)
+    return paths
+
+
+class StaticSite(_Server):
+    """A generated site served from a temp dir (Last-Modified / 304 via http.server)."""
+
+    def __init__(self, pages: int = 60, latency: Optional[LatencyDist] = None):
+        self._tmp = tempfile.TemporaryDirectory(prefix="bench-site-")
+        build_site(self._tmp.name, pages)
+        dist = latency or LatencyDist()
+        root = self._tmp.name
+
+        class Handler(SimpleHTTPRequestHandler):
+            def __init__(self, *args: Any, **kwargs: Any):
+                super().__init__(*args, directory=root, **kwargs)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def send_head(self):
+                time.sleep(dist.sample())
+                return super().send_head()
+
+        super().__init__(Handler)
+
+    def __exit__(self, *exc: Any) -> None:
+        super().__exit__(*exc)
+        self._tmp.cleanup()
+
+
+def configure_offline_env(tmpdir: str) -> Dict[str, str]:
+    """
+    Point every on-disk store at `tmpdir` and provide dummy credentials.
+    Call before importing backend_api.
+    """
+    env = {
+        "GEMINI_API_KEY": "offline-benchmark",
+        "SERPAPI_API_KEY": "offline-benchmark",
+        "SERPAPI_QPS": "0",
+        "GEMINI_CACHE_PATH": os.path.join(tmpdir, "gemini.sqlite3"),
+        "SERP_CACHE_PATH": os.path.join(tmpdir, "serp.sqlite3"),
+        "SERP_QUOTA_PATH": os.path.join(tmpdir, "quota.sqlite3"),
+        "HTTP_VALIDATOR_PATH": os.path.join(tmpdir, "validators.sqlite3"),
+        "JOB_DB_PATH": os.path.join(tmpdir, "jobs.sqlite3"),
+        "AUDIT_DB_PATH": os.path.join(tmpdir, "audits.sqlite3"),
+        "KEYWORD_INDEX_PATH": os.path.join(tmpdir, "keyword_index.sqlite3"),
+        "RESULTS_STORE_PATH": os.path.join(tmpdir, "results"),
+    }
+    os.environ.update(env)
+    return env
@@ -0,0 +1,17 @@
+# tests/conftest.py
+"""
+Shared test setup: the repo root and benchmarks/ (for the offline fakes)
+go on sys.path, and every on-disk store points at a temporary directory
+before backend_api is imported.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "benchmarks")]
+
+from fakes import configure_offline_env  # noqa: E402
+
+configure_offline_env(tempfile.mkdtemp(prefix="seo-agent-tests-"))
@@ -0,0 +1,111 @@
+# tests/test_concurrency_limiter.py
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fakes import FakeGeminiModel, LatencyDist
+from backend_api import batch
+from backend_api.utils import gemini_client
+from backend_api.utils.rate_limiter import ConcurrencyLimiter
+
+
+class Peak:
+    def __init__(self):
+        self.current = self.peak = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def leave(self):
+        with self._lock:
+            self.current -= 1
+
+
+def test_one_limit_across_threads_and_event_loops():
+    limiter = ConcurrencyLimiter(3)
+    peak = Peak()
+
+    def sync_caller():
+        limiter.acquire()
+        peak.enter()
+        time.sleep(0.02)
+        peak.leave()
+        limiter.release()
+
+    async def async_caller():
+        await limiter.acquire_async()
+        peak.enter()
+        await asyncio.sleep(0.02)
+        peak.leave()
+        limiter.release()
+
+    def loop_thread():
+        async def many():
+            await asyncio.gather(*(async_caller() for _ in range(6)))
+        asyncio.run(many())
+
+    threads = [threading.Thread(target=sync_caller) for _ in range(6)]
+    threads += [threading.Thread(target=loop_thread) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert peak.peak == 3
+    assert limiter.stats() == {"limit": 3, "active": 0, "waiting": 0}
+
+
+def test_cancelled_waiters_give_up_their_place():
+    limiter = ConcurrencyLimiter(1)
+
+    async def scenario():
+        await limiter.acquire_async()
+        waiter = asyncio.create_task(limiter.acquire_async())
+        await asyncio.sleep(0.01)
+        assert limiter.stats()["waiting"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release()
+
+    asyncio.run(scenario())
+    assert limiter.stats() == {"limit": 1, "active": 0, "waiting": 0}
+    limiter.acquire()
+    limiter.release()
+
+
+def test_zero_limit_is_unlimited():
+    limiter = ConcurrencyLimiter(0)
+    for _ in range(5):
+        limiter.acquire()
+    assert limiter.stats()["active"] == 0
+
+
+def test_closing_a_batch_stream_cancels_unfinished_briefs(tmp_path, monkeypatch):
+    model = FakeGeminiModel(latency=LatencyDist(0.3))
+    gemini_client.set_model(model)
+    monkeypatch.setattr(gemini_client, "_cache", None)
+    brief = {"business_info": "Shop", "campaign_goal": "Sales", "product_info": "Tea",
+             "audience": "Students", "platforms": ["Instagram"]}
+    briefs = [dict(brief, business_info=f"Shop {n}") for n in range(8)]
+
+    async def scenario():
+        stream = batch.stream_campaign_batch(briefs, max_concurrency=2)
+        first = await stream.__anext__()
+        await stream.aclose()
+        calls = model.calls
+        await asyncio.sleep(0.5)
+        return first, calls
+
+    try:
+        first, calls = asyncio.run(scenario())
+    finally:
+        gemini_client.set_model(None)
+    assert first["event"] == "item"
+    assert model.calls == calls < len(briefs)
+    assert gemini_client._slots.stats()["active"] == 0
@@ -0,0 +1,51 @@
+# tests/test_crawler.py
+
+import asyncio
+import os
+
+from fakes import StaticSite
+from backend_api.utils import crawler
+from backend_api.utils.crawler import canonicalize_url, crawl_site
+
+
+def _write(site: StaticSite, name: str, body: str) -> None:
+    with open(os.path.join(site._tmp.name, name), "w", encoding="utf-8") as fh:
+        fh.write(body)
+
+
+def test_canonicalize_url():
+    assert canonicalize_url("HTTP://Example.com:80/a?b=2&a=1#top") == "http://example.com/a?a=1&b=2"
+    assert canonicalize_url("../c", base="https://example.com/a/b") == "https://example.com/c"
+    assert canonicalize_url("mailto:team@example.com") is None
+
+
+def test_canonicalize_rejects_malformed_urls():
+    assert canonicalize_url("http://[::1/broken") is None
+    assert canonicalize_url("http://example.com:99999/") is None
+
+
+def test_crawl_survives_malformed_links():
+    with StaticSite(pages=3) as site:
+        _write(site, "index.html", "<html><head><title>Home</title></head><body>"
+                                   "<a href='http://[::1/x'>bad</a><a href='http://localhost:99999/'>port</a>"
+                                   "<a href='/page-1.html'>ok</a></body></html>")
+        result = asyncio.run(crawl_site(site.base_url + "/", depth=2, max_pages=10))
+    assert [p["url"].rsplit("/", 1)[-1] for p in result["pages"]] == ["", "page-1.html"]
+
+
+def test_robots_disallowed_start_url_is_not_fetched():
+    with StaticSite(pages=3) as site:
+        _write(site, "robots.txt", "User-agent: *\nDisallow: /private/\n")
+        os.makedirs(os.path.join(site._tmp.name, "private"))
+        _write(site, "private/index.html", "<html><title>Secret</title></html>")
+        result = asyncio.run(crawl_site(site.base_url + "/private/", depth=2, previous={}))
+    assert result["pages"] == []
+    assert result["stats"]["start_blocked"] is True
+    assert result["snapshots"] == {}
+
+
+def test_max_pages_is_capped_server_side(monkeypatch):
+    monkeypatch.setattr(crawler, "CRAWL_MAX_PAGES", 4)
+    with StaticSite(pages=30) as site:
+        result = asyncio.run(crawl_site(site.base_url + "/", depth=5, max_pages=10_000))
+    assert len(result["pages"]) <= 4
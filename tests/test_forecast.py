@@ -0,0 +1,104 @@
+# tests/test_forecast.py
+
+import numpy as np
+import pytest
+
+from backend_api.performance_predictor import run_forecast_grid
+from backend_api.utils import forecast
+from backend_api.utils.forecast import (
+    DEFAULT_PRIORS, FORECAST_MAX_DRAWS, FORECAST_MAX_SCENARIOS, MIN_SIMULATIONS, METRICS,
+    draw_count, percentile_bands, prior_for, simulate, stable_seed, summarise, validate_priors,
+)
+
+PLATFORMS = ["Facebook Ads", "LinkedIn", "Newsletter"]
+
+
+def _simulate(scenarios: int = 2, simulations: int = 500, seed: int = 7):
+    budgets = np.linspace(1000, 5000, scenarios)
+    mixes = np.tile(np.full(len(PLATFORMS), 1 / len(PLATFORMS)), (scenarios, 1))
+    weeks = np.full(scenarios, 4.0)
+    posts = np.full(scenarios, 3.0)
+    return simulate(PLATFORMS, budgets, mixes, weeks, posts, simulations, seed)
+
+
+def test_draw_count_floor_and_cap():
+    assert draw_count(1, rows=3) == MIN_SIMULATIONS
+    assert draw_count(500, rows=3) == 500
+    rows = FORECAST_MAX_DRAWS // 1000
+    assert draw_count(10 ** 9, rows=rows) == 1000
+
+
+def test_draw_count_raises_when_rows_cannot_fit():
+    with pytest.raises(ValueError):
+        draw_count(1000, rows=FORECAST_MAX_DRAWS // MIN_SIMULATIONS + 1)
+
+
+def test_grid_rejects_too_many_scenarios():
+    payload = {"platforms": ["Facebook"], "budgets": list(range(1, FORECAST_MAX_SCENARIOS + 2))}
+    with pytest.raises(ValueError, match="scenarios"):
+        run_forecast_grid(payload)
+
+
+def test_validate_priors():
+    assert validate_priors(DEFAULT_PRIORS)["default"]["delivery"]
+    with pytest.raises(ValueError, match="default"):
+        validate_priors({"x": DEFAULT_PRIORS["default"]})
+    with pytest.raises(ValueError, match="missing 'cvr'"):
+        validate_priors({"default": {"ctr": [0.01, 0.02], "reach_per_post": [0, 0]}})
+    bad = dict(DEFAULT_PRIORS["default"], ctr=[0.05, 0.01])
+    with pytest.raises(ValueError, match="low, high"):
+        validate_priors({"default": bad})
+
+
+def test_prior_for_uses_words_and_aliases():
+    priors = forecast.load_priors()
+    assert prior_for("Facebook Ads", priors) == "facebook"
+    assert prior_for("IG stories", priors) == "instagram"
+    assert prior_for("Carrier pigeon", priors) is None
+
+
+def test_stable_seed_is_deterministic():
+    assert stable_seed(["a"], 1.0) == stable_seed(["a"], 1.0)
+    assert stable_seed(["a"], 1.0) != stable_seed(["a"], 2.0)
+
+
+def test_simulate_shapes_and_determinism():
+    draws = _simulate(scenarios=2, simulations=500)
+    assert set(draws) == set(METRICS)
+    for values in draws.values():
+        assert values.shape == (2, 500, len(PLATFORMS))
+        assert np.all(values >= 0)
+    again = _simulate(scenarios=2, simulations=500)
+    for metric in METRICS:
+        np.testing.assert_array_equal(draws[metric], again[metric])
+    other = _simulate(scenarios=2, simulations=500, seed=8)
+    assert not np.array_equal(draws["clicks"], other["clicks"])
+
+
+def test_spend_follows_budget():
+    draws = _simulate(scenarios=2)
+    spend = draws["spend"].sum(axis=2).mean(axis=1)
+    assert spend[1] > spend[0] * 4
+
+
+def test_percentile_bands_match_numpy():
+    rng = np.random.default_rng(0)
+    series = rng.random((3, 1001))
+    qs, means = percentile_bands(series)
+    assert qs.shape == (len(forecast.PERCENTILES), 3)
+    np.testing.assert_allclose(qs, np.percentile(series, forecast.PERCENTILES, axis=1), rtol=1e-5)
+    np.testing.assert_allclose(means, series.mean(axis=1))
+
+
+def test_percentile_bands_ignore_infinite_draws_in_the_mean():
+    qs, means = percentile_bands(np.array([[1.0, 3.0, np.inf]]))
+    assert means[0] == 2.0
+    assert np.isinf(qs[-1, 0])
+
+
+def test_summarise_reports_totals_and_platforms():
+    summary = summarise(_simulate(), 0, PLATFORMS)
+    assert set(summary["platforms"]) == set(PLATFORMS)
+    assert {"spend", "clicks", "ctr", "cpc", "cpa"} <= set(summary["totals"])
+    band = summary["totals"]["clicks"]
+    assert band["p10"] <= band["p50"] <= band["p90"]
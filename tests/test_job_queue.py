@@ -0,0 +1,181 @@
+# tests/test_job_queue.py
+
+import threading
+import time
+
+import pytest
+
+from backend_api.utils.job_queue import (
+    CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue, JobStore, scoped_key,
+)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite3")), workers=1)
+    queue.register("echo", lambda payload: {"echo": payload})
+    yield queue
+    queue.shutdown()
+
+
+def _settle(queue: JobQueue, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while queue._futures and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_submit_runs_the_handler(queue):
+    job, created = queue.submit("echo", {"n": 1})
+    assert created
+    done = queue.wait(job["job_id"], timeout=5)
+    assert done["status"] == DONE
+    assert done["result"] == {"echo": {"n": 1}}
+
+
+def test_handler_errors_fail_the_job(queue):
+    queue.register("boom", lambda payload: 1 / 0)
+    job, _ = queue.submit("boom", {})
+    failed = queue.wait(job["job_id"], timeout=5)
+    assert failed["status"] == FAILED
+    assert "division by zero" in failed["error"]
+
+
+def test_unknown_kind_is_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.submit("nope", {})
+
+
+def test_idempotency_key_is_scoped_to_kind_and_payload(queue):
+    queue.register("other", lambda payload: None)
+    first, created = queue.submit("echo", {"n": 1}, "key-1")
+    again, created_again = queue.submit("echo", {"n": 1}, "key-1")
+    assert created and not created_again
+    assert again["job_id"] == first["job_id"]
+
+    changed, created = queue.submit("echo", {"n": 2}, "key-1")
+    assert created and changed["job_id"] != first["job_id"]
+    other_kind, created = queue.submit("other", {"n": 1}, "key-1")
+    assert created and other_kind["job_id"] != first["job_id"]
+
+
+def test_scoped_key_ignores_payload_key_order():
+    assert scoped_key("echo", {"a": 1, "b": 2}, "k") == scoped_key("echo", {"b": 2, "a": 1}, "k")
+    assert scoped_key("echo", {"a": 1}, None) is None
+
+
+def test_cancelled_queued_job_never_runs(queue):
+    release = threading.Event()
+    ran = []
+    queue.register("block", lambda payload: release.wait(5))
+    queue.register("record", lambda payload: ran.append(payload))
+    blocker, _ = queue.submit("block", {})
+    waiting, _ = queue.submit("record", {"n": 1})
+
+    assert queue.cancel(waiting["job_id"])["status"] == CANCELLED
+    release.set()
+    assert queue.wait(blocker["job_id"], timeout=5)["status"] == DONE
+    _settle(queue)
+    assert ran == []
+    assert queue.get(waiting["job_id"])["status"] == CANCELLED
+
+
+def test_finished_jobs_release_their_futures(queue):
+    jobs = [queue.submit("echo", {"n": n})[0] for n in range(5)]
+    for job in jobs:
+        queue.wait(job["job_id"], timeout=5)
+    _settle(queue)
+    assert queue._futures == {}
+    assert queue._events == {}
+
+
+def test_start_resumes_pending_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job, _ = store.create("echo", {"n": 1})
+    assert job["status"] == QUEUED
+
+    queue = JobQueue(store, workers=1)
+    queue.register("echo", lambda payload: payload)
+    try:
+        assert queue.start() == 1
+        assert queue.wait(job["job_id"], timeout=5)["result"] == {"n": 1}
+    finally:
+        queue.shutdown()
+
+
+def test_finished_jobs_are_purged_after_retention(tmp_path):
+    queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite3")), workers=1, retention_seconds=0)
+    queue.register("echo", lambda payload: payload)
+    try:
+        old, _ = queue.submit("echo", {"n": 1})
+        queue.wait(old["job_id"], timeout=5)
+        time.sleep(0.01)
+        queue.submit("echo", {"n": 2})
+        assert queue.get(old["job_id"]) is None
+    finally:
+        queue.shutdown()
+
+
+def test_store_is_opened_on_first_use():
+    # conftest points JOB_DB_PATH at a temporary directory
+    queue = JobQueue(workers=1)
+    queue.register("echo", lambda payload: payload)
+    assert queue._store is None
+    try:
+        job, _ = queue.submit("echo", {"n": 1})
+        assert isinstance(queue._store, JobStore)
+        assert queue.wait(job["job_id"], timeout=5)["status"] == DONE
+    finally:
+        queue.shutdown()
+
+
+def test_running_jobs_of_a_live_owner_are_not_taken_over(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    release = threading.Event()
+    first = JobQueue(JobStore(path), workers=1, lease_seconds=30)
+    first.register("block", lambda payload: release.wait(5))
+    second = JobQueue(JobStore(path), workers=1, lease_seconds=30)
+    second.register("block", lambda payload: pytest.fail("ran twice"))
+    try:
+        job, _ = first.submit("block", {})
+        deadline = time.monotonic() + 2
+        while first.get(job["job_id"])["status"] != RUNNING and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert second.start() == 0
+        assert not second.store.mark_running(job["job_id"], second.owner)
+        release.set()
+        done = first.wait(job["job_id"], timeout=5)
+        assert (done["status"], done["owner"]) == (DONE, first.owner)
+    finally:
+        release.set()
+        first.shutdown()
+        second.shutdown()
+
+
+def test_expired_leases_are_reclaimed(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job, _ = store.create("echo", {"n": 1})
+    assert store.mark_running(job["job_id"], "dead-worker", lease_seconds=-1)
+
+    queue = JobQueue(store, workers=1)
+    queue.register("echo", lambda payload: payload)
+    try:
+        assert queue.start() == 1
+        done = queue.wait(job["job_id"], timeout=5)
+        assert (done["status"], done["owner"]) == (DONE, queue.owner)
+        # the old owner's late result is discarded
+        assert not store.finish(job["job_id"], FAILED, error="late", owner="dead-worker")
+    finally:
+        queue.shutdown()
+
+
+def test_heartbeat_renews_the_lease_of_long_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    queue = JobQueue(store, workers=1, lease_seconds=0.3)
+    queue.register("slow", lambda payload: time.sleep(0.8))
+    try:
+        job, _ = queue.submit("slow", {})
+        time.sleep(0.5)
+        assert not store.mark_running(job["job_id"], "other-worker")
+        assert queue.wait(job["job_id"], timeout=5)["status"] == DONE
+    finally:
+        queue.shutdown()
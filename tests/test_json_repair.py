@@ -0,0 +1,51 @@
+# tests/test_json_repair.py
+
+from backend_api.utils.json_repair import continuation_prompt, missing_keys, repair, repair_json
+
+
+def test_strict_json_round_trips():
+    assert repair('{"a": [1, 2], "b": {"c": "d"}}') == ({"a": [1, 2], "b": {"c": "d"}}, False)
+
+
+def test_code_fences_and_prose_are_stripped():
+    text = 'Here is the plan:\n```json\n{"a": 1, "b": "x}"}\n```\nHope this helps!'
+    assert repair_json(text) == {"a": 1, "b": "x}"}
+
+
+def test_trailing_commas_are_dropped():
+    assert repair('{"a": [1, 2,], "b": {"c": 3,},}') == ({"a": [1, 2], "b": {"c": 3}}, False)
+
+
+def test_truncated_output_is_closed():
+    value, truncated = repair('{"a": 1, "b": [{"x": 1}, {"x": 2}, {"x": "cut sho')
+    assert truncated is True
+    assert value["a"] == 1
+    assert value["b"][:2] == [{"x": 1}, {"x": 2}]
+
+
+def test_truncated_key_is_cut_back_to_the_last_complete_value():
+    value, truncated = repair('{"a": 1, "b": [{"x": 1}, {"x": 2}, {"x')
+    assert (value, truncated) == ({"a": 1, "b": [{"x": 1}, {"x": 2}, {}]}, True)
+
+
+def test_truncated_after_a_key_drops_the_key():
+    value, truncated = repair('{"a": 1, "b":')
+    assert (value, truncated) == ({"a": 1}, True)
+
+
+def test_no_json_at_all():
+    assert repair("I can't help with that.") == (None, False)
+
+
+def test_missing_keys_checks_presence_and_container_type():
+    template = {"plan": {}, "posts": [], "notes": ""}
+    assert missing_keys({"plan": {}, "posts": [], "notes": "ok"}, template) == []
+    assert missing_keys({"plan": [], "notes": "ok"}, template) == ["plan", "posts"]
+    assert missing_keys(None, template) == ["plan", "posts", "notes"]
+
+
+def test_continuation_prompt_names_only_the_missing_keys():
+    prompt = continuation_prompt("Plan a campaign.", ["plan"], ["posts", "notes"])
+    assert prompt.startswith("Plan a campaign.")
+    assert "already covered these keys: plan." in prompt
+    assert "(posts, notes)" in prompt
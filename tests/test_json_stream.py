@@ -0,0 +1,48 @@
+# tests/test_json_stream.py
+
+import json
+
+import pytest
+
+from backend_api.utils.json_stream import IncrementalJSONParser, events_from_result
+
+RESULT = {
+    "summary": "Launch plan with \"quotes\", {braces} and [brackets]",
+    "posts": [{"day": 1, "text": "a, b"}, {"day": 2, "tags": ["x", "y"]}],
+    "budget": {"total": 1000, "split": [0.5, 0.5]},
+    "empty": [],
+}
+
+
+def _feed(text: str, size: int, item_keys=("posts",)):
+    parser = IncrementalJSONParser(item_keys)
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return parser, events
+
+
+@pytest.mark.parametrize("size", [1, 7, 10_000])
+def test_chunked_feed_matches_replayed_events(size):
+    text = "```json\n" + json.dumps(RESULT, indent=2) + "\n```"
+    parser, events = _feed(text, size)
+    assert parser.done
+    assert events == list(events_from_result(RESULT, ["posts"]))
+
+
+def test_items_arrive_before_the_array_closes():
+    parser = IncrementalJSONParser(["posts"])
+    events = parser.feed('{"posts": [{"day": 1}, {"day"')
+    assert events == [{"event": "item", "key": "posts", "index": 0, "value": {"day": 1}}]
+    events = parser.feed(': 2}]')
+    assert [e["event"] for e in events] == ["item", "section"]
+    assert events[-1]["value"] == [{"day": 1}, {"day": 2}]
+    assert not parser.done
+    parser.feed("}")
+    assert parser.done
+
+
+def test_arrays_not_in_item_keys_only_emit_sections():
+    _, events = _feed(json.dumps(RESULT), 5, item_keys=())
+    assert [e["key"] for e in events] == list(RESULT)
+    assert all(e["event"] == "section" for e in events)
@@ -0,0 +1,138 @@
+# tests/test_resilience.py
+
+import asyncio
+import time
+
+import pytest
+
+from backend_api.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpen,
+    LatencyWindow,
+    backoff_delay,
+    is_transient,
+)
+
+
+class _Coded(Exception):
+    def __init__(self, code):
+        super().__init__(f"code {code}")
+        self.code = code
+
+
+class _Status:
+    def __init__(self, name):
+        self.name = name
+
+
+class _RpcError(Exception):
+    def __init__(self, name):
+        super().__init__(name)
+        self._name = name
+
+    def code(self):
+        return _Status(self._name)
+
+
+def _open(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+@pytest.mark.parametrize("exc, expected", [
+    (TimeoutError(), True),
+    (asyncio.TimeoutError(), True),
+    (ConnectionResetError(), True),
+    (_Coded(503), True),
+    (_Coded(429), True),
+    (_Coded(400), False),
+    (_RpcError("UNAVAILABLE"), True),
+    (_RpcError("INVALID_ARGUMENT"), False),
+    (ValueError("bad prompt"), False),
+])
+def test_is_transient(exc, expected):
+    assert is_transient(exc) is expected
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    for attempt in range(8):
+        delay = backoff_delay(attempt, base=0.5, cap=3.0)
+        assert 0 <= delay <= min(3.0, 0.5 * 2 ** attempt)
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("m", failure_threshold=3, cooldown=60)
+    for _ in range(2):
+        assert breaker.before_call() is False
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpen) as info:
+        breaker.before_call()
+    assert info.value.retry_after > 1
+    assert breaker.stats()["rejections"] == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker("m", failure_threshold=2, cooldown=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_allows_a_single_trial():
+    breaker = CircuitBreaker("m", failure_threshold=1, cooldown=0.02)
+    _open(breaker)
+    time.sleep(0.03)
+    assert breaker.state == "half_open"
+    assert breaker.before_call() is True
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.before_call() is False
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker("m", failure_threshold=1, cooldown=0.02)
+    _open(breaker)
+    time.sleep(0.03)
+    assert breaker.before_call() is True
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_released_trial_lets_the_next_call_try():
+    # a trial that ends without a verdict (non-transient error, cancellation)
+    # must not leave the breaker rejecting every call forever
+    breaker = CircuitBreaker("m", failure_threshold=1, cooldown=0.02)
+    _open(breaker)
+    time.sleep(0.03)
+    assert breaker.before_call() is True
+    breaker.record_release()
+    assert breaker.state == "half_open"
+    assert breaker.before_call() is True
+
+
+def test_zero_threshold_disables_the_breaker():
+    breaker = CircuitBreaker("m", failure_threshold=0)
+    for _ in range(10):
+        assert breaker.before_call() is False
+        breaker.record_failure()
+
+
+def test_latency_window_needs_min_samples():
+    window = LatencyWindow(size=10, min_samples=5)
+    for value in (0.1, 0.2, 0.3, 0.4):
+        window.add(value)
+    assert window.percentile(95) is None
+    window.add(0.5)
+    assert window.percentile(50) == 0.3
+    assert window.percentile(95) == 0.5
+    for _ in range(10):
+        window.add(1.0)
+    assert window.stats() == {"samples": 10, "p50": 1.0, "p95": 1.0}
@@ -0,0 +1,142 @@
+# tests/test_response_cache.py
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from fakes import FakeGeminiModel
+from backend_api.utils import gemini_client, response_cache
+from backend_api.utils.response_cache import MemoryLRU, ResponseCache, SQLiteStore, make_cache_key
+
+TEMPLATE = {"title": "", "points": []}
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def gemini(tmp_path):
+    """A fake model and a fresh two-tier cache, restored afterwards."""
+    previous = gemini_client.get_cache()
+    model = FakeGeminiModel(responder=lambda prompt: {"title": "t", "points": [1, 2]})
+    cache = ResponseCache(disk_path=str(tmp_path / "gemini.sqlite3"))
+    gemini_client.set_model(model)
+    gemini_client.set_cache(cache)
+    yield SimpleNamespace(model=model, cache=cache)
+    gemini_client.set_model(None)
+    gemini_client.set_cache(previous)
+
+
+def _generate(**kwargs):
+    return asyncio.run(gemini_client.generate_json_async(
+        "Write a post.", json_template=TEMPLATE, endpoint="campaign", **kwargs))
+
+
+def test_cache_key_covers_every_part():
+    assert make_cache_key("m", "prompt", 0.4) == make_cache_key("m", "prompt", 0.4)
+    assert make_cache_key("m", "prompt", 0.4) != make_cache_key("m", "prompt", 0.5)
+
+
+def test_entries_expire_after_their_endpoint_ttl(tmp_path, clock):
+    cache = ResponseCache(disk_path=str(tmp_path / "c.sqlite3"), ttls={"seo": 60}, default_ttl=600)
+    cache.set("audit", {"score": 1}, "seo")
+    cache.set("brief", {"plan": 1}, "campaign")
+    clock.now += 61
+    assert cache.get("audit") is None
+    assert cache.get("brief") == {"plan": 1}
+    clock.now += 600
+    assert cache.get("brief") is None
+
+
+def test_zero_ttl_is_not_stored(tmp_path):
+    cache = ResponseCache(disk_path=str(tmp_path / "c.sqlite3"), ttls={"seo": 0})
+    cache.set("audit", {"score": 1}, "seo")
+    assert cache.get("audit") is None
+    assert cache.stats()["writes"] == 0
+
+
+def test_memory_tier_evicts_least_recently_used():
+    lru = MemoryLRU(max_entries=2)
+    for key in ("a", "b"):
+        lru.set(key, key, expires_at=float("inf"))
+    assert lru.get("a") == "a"
+    lru.set("c", "c", expires_at=float("inf"))
+    assert lru.get("b") is None
+    assert (lru.get("a"), lru.get("c")) == ("a", "c")
+    assert lru.evictions == 1
+
+
+def test_disk_tier_prunes_least_recently_accessed(tmp_path, clock):
+    store = SQLiteStore(str(tmp_path / "c.sqlite3"), max_entries=2)
+    for key in ("a", "b"):
+        clock.now += 1
+        store.set(key, '"v"', clock.now + 3600, "default")
+    clock.now += 1
+    assert store.get("a") is not None
+    clock.now += 1
+    store.set("c", '"v"', clock.now + 3600, "default")
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
+    assert len(store) == 2
+
+
+def test_disk_hit_after_memory_miss_refills_memory(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    ResponseCache(disk_path=path).set("k", {"v": 1}, "campaign")
+
+    fresh = ResponseCache(disk_path=path)
+    assert fresh.get("k") == {"v": 1}
+    assert fresh.get("k") == {"v": 1}
+    stats = fresh.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+
+
+def test_generate_json_async_serves_repeats_from_cache(gemini):
+    assert _generate() == {"title": "t", "points": [1, 2]}
+    assert _generate() == {"title": "t", "points": [1, 2]}
+    assert gemini.model.calls == 1
+    assert gemini.cache.stats()["writes"] == 1
+
+
+def test_bypass_cache_skips_the_lookup_but_stores(gemini):
+    _generate()
+    gemini.model.responder = lambda prompt: {"title": "fresh", "points": []}
+    assert _generate(bypass_cache=True)["title"] == "fresh"
+    assert gemini.model.calls == 2
+    assert _generate()["title"] == "fresh"
+    assert gemini.model.calls == 2
+
+
+def test_incomplete_replies_are_not_cached(gemini, monkeypatch):
+    monkeypatch.setattr(gemini_client, "GEMINI_JSON_CONTINUATION", False)
+    gemini.model.responder = lambda prompt: {"title": "only"}
+    assert _generate() == {"title": "only"}
+    _generate()
+    assert gemini.model.calls == 2
+    assert gemini.cache.stats()["writes"] == 0
+
+
+def test_stream_replays_cached_results(gemini):
+    async def collect():
+        return [event async for event in gemini_client.stream_json_async(
+            "Write a post.", json_template=TEMPLATE, endpoint="campaign", item_keys=["points"])]
+
+    first = asyncio.run(collect())
+    second = asyncio.run(collect())
+    assert gemini.model.calls == 1
+    assert first[-1] == {"event": "done", "result": {"title": "t", "points": [1, 2]}, "cached": False}
+    assert second[-1]["cached"] is True
+    assert second[:-1] == first[:-1]
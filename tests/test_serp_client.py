@@ -0,0 +1,82 @@
+# tests/test_serp_client.py
+
+import asyncio
+import threading
+
+import pytest
+
+from fakes import FakeSerpServer, LatencyDist
+from backend_api.utils import serp_client
+from backend_api.utils.rate_limiter import MonthlyQuota
+from backend_api.utils.response_cache import ResponseCache
+
+
+@pytest.fixture
+def serp(tmp_path, monkeypatch):
+    with FakeSerpServer(LatencyDist(0.05)) as server:
+        monkeypatch.setattr(serp_client, "SERPAPI_URL", server.search_url)
+        monkeypatch.setattr(serp_client, "_cache", ResponseCache(disk_path=str(tmp_path / "serp.sqlite3")))
+        monkeypatch.setattr(serp_client, "_quota", MonthlyQuota(0, str(tmp_path / "quota.sqlite3")))
+        yield server
+
+
+@pytest.mark.parametrize("path", [None, "quota.sqlite3"])
+def test_quota_reservations_never_overshoot(tmp_path, path):
+    quota = MonthlyQuota(5, str(tmp_path / path) if path else None)
+    granted = []
+    threads = [threading.Thread(target=lambda: granted.append(quota.reserve())) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert granted.count(True) == 5
+    assert quota.used() == 5 and not quota.available()
+    quota.release()
+    assert quota.remaining() == 1
+    assert quota.reserve() and not quota.reserve()
+
+
+def test_unlimited_quota_still_counts(tmp_path):
+    quota = MonthlyQuota(0, str(tmp_path / "quota.sqlite3"))
+    assert all(quota.reserve() for _ in range(3))
+    assert quota.used() == 3 and quota.remaining() is None
+
+
+def test_retry_after_is_capped():
+    assert serp_client._backoff_delay(0, 3600) == serp_client.SERPAPI_MAX_RETRY_AFTER
+    assert serp_client._backoff_delay(0, -5) == 0
+    assert serp_client._backoff_delay(0, 2) == 2
+
+
+def test_identical_async_queries_share_one_call(serp):
+    async def fan_out():
+        return await asyncio.gather(*(serp_client.google_search_news_async("CRM Software") for _ in range(5)))
+
+    results = asyncio.run(fan_out())
+    assert serp.requests == 1
+    assert all(r == results[0] and len(r) == 5 for r in results)
+    assert serp_client._quota.used() == 1
+    # the next lookup is a cache hit
+    asyncio.run(serp_client.google_search_news_async("crm   software"))
+    assert serp.requests == 1
+
+
+def test_coalescing_is_per_event_loop(serp):
+    results = []
+
+    def in_own_loop():
+        results.append(asyncio.run(serp_client.google_search_news_async("helpdesk tools")))
+
+    threads = [threading.Thread(target=in_own_loop) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert len(results) == 3 and all(len(r) == 5 for r in results)
+
+
+def test_exhausted_quota_returns_no_results(serp, tmp_path, monkeypatch):
+    monkeypatch.setattr(serp_client, "_quota", MonthlyQuota(1, str(tmp_path / "full.sqlite3")))
+    assert serp_client._quota.reserve()
+    assert asyncio.run(serp_client.google_search_news_async("anything")) == []
+    assert serp.requests == 0
@@ -0,0 +1,101 @@
+# tests/test_sitemap.py
+
+import asyncio
+import gzip
+import os
+
+import pytest
+
+from fakes import StaticSite
+from backend_api.utils import sitemap
+from backend_api.utils.http_client import HTTP_MAX_BODY_BYTES
+from backend_api.utils.sitemap import SitemapError, load_sitemap, parse_sitemap
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def _urlset(*urls: str) -> bytes:
+    entries = "".join(f"<url><loc> {url} </loc></url>" for url in urls)
+    return f'<?xml version="1.0"?><urlset {NS}>{entries}</urlset>'.encode()
+
+
+def _index(*urls: str) -> bytes:
+    entries = "".join(f"<sitemap><loc>{url}</loc></sitemap>" for url in urls)
+    return f'<?xml version="1.0"?><sitemapindex {NS}>{entries}</sitemapindex>'.encode()
+
+
+def test_urlset_lists_pages():
+    assert parse_sitemap(_urlset("https://a.test/", "https://a.test/b")) == (
+        ["https://a.test/", "https://a.test/b"], [])
+
+
+def test_index_lists_children():
+    assert parse_sitemap(_index("https://a.test/s1.xml")) == ([], ["https://a.test/s1.xml"])
+
+
+def test_gzipped_body_is_accepted():
+    assert parse_sitemap(gzip.compress(_urlset("https://a.test/"))) == (["https://a.test/"], [])
+
+
+@pytest.mark.parametrize("body, message", [
+    (b"<html><body>cut off", "not valid XML"),
+    (b"<html><body>a page</body></html>", "not a sitemap"),
+])
+def test_unparsable_or_foreign_xml_raises(body, message):
+    with pytest.raises(SitemapError, match=message):
+        parse_sitemap(body)
+
+
+@pytest.mark.parametrize("body, max_bytes, message", [
+    (gzip.compress(_urlset("https://a.test/"))[:-12], 1 << 20, "truncated"),
+    (b"\x1f\x8b" + os.urandom(64), 1 << 20, "corrupt"),
+    (gzip.compress(b" " * 10_000 + _urlset("https://a.test/")), 1_000, "more than 1000 bytes"),
+])
+def test_bad_gzip_raises(body, max_bytes, message):
+    with pytest.raises(SitemapError, match=message):
+        parse_sitemap(body, max_bytes)
+
+
+def test_load_sitemap_follows_the_index_past_bad_children():
+    with StaticSite(pages=1) as site:
+        base = site.base_url
+        files = {
+            "sitemap.xml": _index(f"{base}/broken.xml.gz", f"{base}/missing.xml",
+                                  f"{base}/cut.xml", f"{base}/pages.xml.gz"),
+            "broken.xml.gz": gzip.compress(_urlset(f"{base}/x"))[:-12],
+            "cut.xml": _urlset(f"{base}/y")[:-20],
+            "pages.xml.gz": gzip.compress(_urlset(f"{base}/a", f"{base}/b", f"{base}/a")),
+        }
+        for name, body in files.items():
+            with open(os.path.join(site._tmp.name, name), "wb") as fh:
+                fh.write(body)
+        urls, failed = asyncio.run(load_sitemap(f"{base}/sitemap.xml", limit=10))
+
+    assert urls == [f"{base}/a", f"{base}/b"]
+    assert [f["url"] for f in failed] == [f"{base}/broken.xml.gz", f"{base}/missing.xml", f"{base}/cut.xml"]
+    assert "truncated" in failed[0]["error"]
+    assert failed[1]["error"] == "HTTP 404"
+    assert "not valid XML" in failed[2]["error"]
+
+
+def test_load_sitemap_reads_past_the_generic_body_cap(monkeypatch):
+    with StaticSite(pages=1) as site:
+        base = site.base_url
+        pages = [f"{base}/products/item-{n:06d}" for n in range(HTTP_MAX_BODY_BYTES // 50)]
+        body = _urlset(*pages)
+        assert len(body) > HTTP_MAX_BODY_BYTES
+        with open(os.path.join(site._tmp.name, "sitemap.xml"), "wb") as fh:
+            fh.write(body)
+        urls, failed = asyncio.run(load_sitemap(f"{base}/sitemap.xml", limit=len(pages)))
+        assert (len(urls), failed) == (len(pages), [])
+
+        monkeypatch.setattr(sitemap, "SITEMAP_MAX_BYTES", 1024)
+        urls, failed = asyncio.run(load_sitemap(f"{base}/sitemap.xml", limit=10))
+        assert urls == []
+        assert failed == [{"url": f"{base}/sitemap.xml", "error": "larger than 1024 bytes"}]
+
+
+def test_load_sitemap_reports_malformed_urls():
+    urls, failed = asyncio.run(load_sitemap("http://[::1/sitemap.xml", limit=10))
+    assert urls == []
+    assert failed[0]["url"] == "http://[::1/sitemap.xml"